@@ -1,19 +1,68 @@
-from fastapi import APIRouter, HTTPException
+import json
+from typing import Literal, Optional
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.services.bundle_cache import bundle_etag, etag_matches
 from app.services.bundling_service import BundleService
-from app.services.redis_service import RedisService
 
 router = APIRouter()
 
 @router.get("/generate-bundle/{file_path}")
-def generate_bundle(file_path: str, repo_id: str):
+async def generate_bundle(
+    file_path: str,
+    repo_id: str,
+    request: Request,
+    response: Response,
+    direction: Literal["both", "dependencies", "dependents"] = "both",
+    max_depth: Optional[int] = Query(None, ge=0),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Return a bundle with an ETag tied to the repository's graph version; a
+    request whose If-None-Match still matches gets 304 without the bundle being built.
+    """
     try:
-        redis_service = RedisService()
-        bundling_service = BundleService(repo_id, redis_service.redis_client)
+        bundling_service = BundleService(repo_id, request.app.state.storage, request.app.state.bundle_cache)
+        etag = bundle_etag(await bundling_service.bundle_key(file_path, direction, max_depth))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
 
         # Generate bundle
-        bundle_metadata = bundling_service.generate_bundle_for_ui(file_path)
+        bundle_metadata = await bundling_service.generate_bundle_for_ui(file_path, direction, max_depth)
+        response.headers["ETag"] = etag
         return {"bundle": bundle_metadata}
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/stream-bundle/{file_path}")
+async def stream_bundle(
+    file_path: str,
+    repo_id: str,
+    request: Request,
+    direction: Literal["both", "dependencies", "dependents"] = "both",
+    max_depth: Optional[int] = Query(None, ge=0),
+    offset: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1),
+    max_bytes: Optional[int] = Query(None, ge=0),
+):
+    """
+    Stream a bundle as newline-delimited JSON: a metadata record, one record
+    per file as its content is read from Redis, and an end record carrying the
+    `next_offset` of the following page when `limit` or `max_bytes` cut it short.
+    """
+    try:
+        bundling_service = BundleService(repo_id, request.app.state.storage)
+        records = await bundling_service.stream_bundle(file_path, direction, max_depth, offset, limit, max_bytes)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    async def lines():
+        async for record in records:
+            yield json.dumps(record, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, HTTPException, Request
+from app.services.graph_query_service import GraphQueryService
+
+router = APIRouter()
+
+
+@router.get("/dependents/{file_path}")
+async def get_dependents(file_path: str, repo_id: str, request: Request):
+    """
+    List every file depending on a file, directly or transitively: what may break if it changes.
+    """
+    try:
+        dependents = await GraphQueryService(repo_id, request.app.state.storage).dependents(file_path)
+        return {"target_file": file_path, "dependents": dependents, "count": len(dependents)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/dependencies/{file_path}")
+async def get_dependencies(file_path: str, repo_id: str, request: Request):
+    """
+    List every file a file depends on, directly or transitively.
+    """
+    try:
+        dependencies = await GraphQueryService(repo_id, request.app.state.storage).dependencies(file_path)
+        return {"target_file": file_path, "dependencies": dependencies, "count": len(dependencies)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/cycles")
+async def get_cycles(repo_id: str, request: Request):
+    """
+    List the circular dependencies of a repository, largest first.
+    """
+    try:
+        cycles = await GraphQueryService(repo_id, request.app.state.storage).cycles()
+        return {"cycles": cycles, "count": len(cycles)}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/shortest-path")
+async def get_shortest_path(source: str, target: str, repo_id: str, request: Request):
+    """
+    Find a shortest chain of "Depends On" edges from `source` to `target`;
+    `path` is null when `source` does not depend on `target` at all.
+    """
+    try:
+        path = await GraphQueryService(repo_id, request.app.state.storage).shortest_path(source, target)
+        return {"source": source, "target": target, "path": path, "length": len(path) - 1 if path else None}
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
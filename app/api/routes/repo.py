@@ -1,73 +1,79 @@
+from typing import List, Literal, Optional
 from fastapi import APIRouter, HTTPException, Request
-from pydantic import BaseModel, HttpUrl
-from app.services.github_service import GitHubService
-from app.services.redis_service import RedisService
-from app.services.dependency_analysis_service import analyze_and_export_dependencies
-from app.utils.filtering import filter_source_files
+from pydantic import BaseModel, Field, HttpUrl
+from app.utils.filtering import TreeFilter
 from app.utils.git_utils import parse_git_url
-from app.config.settings import SOURCE_EXTENSIONS
 
 router = APIRouter()
 
 
 class RepoRequest(BaseModel):
     repo_url: HttpUrl
+    ingestion_mode: Literal["raw", "archive"] = "raw"
+    include: Optional[List[str]] = None
+    exclude: Optional[List[str]] = None
+    default_excludes: bool = True
+    max_blob_size: Optional[int] = Field(None, ge=0)
 
 
-@router.post("/load-repo")
+@router.post("/load-repo", status_code=202)
 async def load_repository(repo_request: RepoRequest, request: Request):
     """
-    Load a repository, fetch its data, analyze dependencies, and save them to Redis.
+    Enqueue a repository load and return its job ID immediately.
+
+    The load (fetch, store, parse, analyze) runs on the background job queue;
+    poll `/jobs/{job_id}` for its status and progress. Submitting a repository
+    whose load for the same branch is still queued or running returns that job.
+
+    Only source files are downloaded; `include`/`exclude` globs, the default
+    excludes (node_modules, vendor, dist...) and `max_blob_size` (bytes, 0 for
+    no limit) narrow the selection further using the tree metadata alone.
 
     Args:
         repo_request (RepoRequest): The request body containing the repository URL.
         request (Request): The request object to access app state.
 
     Returns:
-        dict: A message indicating success or an error.
+        dict: The job status, and whether an already active job was reused.
     """
     try:
-        # Extract the repository URL
-        repo_url = str(repo_request.repo_url)
-
         # Parse repository details
-        repo_info = parse_git_url(repo_url)
+        repo_info = parse_git_url(str(repo_request.repo_url))
         owner, repo, branch = repo_info["owner"], repo_info["repo"], repo_info["branch"]
         repo_id = f"{owner}_{repo}"
 
-        # Access shared clients from app state
-        github_client = request.app.state.github_client
-        redis_client = request.app.state.redis_client
-
-        # Initialize services using shared clients
-        github_service = GitHubService(github_client)
-        redis_service = RedisService(redis_client)
-
-        # Fetch repository data
-        print("Fetching repository tree...")
-        repo_tree = await github_service.fetch_repo_tree(owner, repo, branch)
-        valid_files = [item["path"] for item in repo_tree if item["type"] == "blob"]
-        print(f"Valid files identified: {len(valid_files)}")
-
-        print("Fetching file contents...")
-        files = await github_service.fetch_all_file_contents(owner, repo, valid_files, branch)
-        print(f"Fetched contents for {len(files)} files.")
+        tree_filter = TreeFilter(
+            include=repo_request.include,
+            exclude=repo_request.exclude,
+            default_excludes=repo_request.default_excludes,
+            max_blob_size=repo_request.max_blob_size,
+        )
+        job, created = request.app.state.load_queue.submit(
+            repo_id, owner, repo, branch, repo_request.ingestion_mode, tree_filter
+        )
+        return {**job.to_dict(), "deduplicated": not created}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
 
-        # Save file content to Redis
-        print("Saving file content to Redis...")
-        for file_path, content in files.items():
-            redis_service.save_file_content(repo_id, file_path, content)
 
-        # Filter source files
-        print("Filtering source files...")
-        filtered_files, filtered_valid_files = filter_source_files(files, valid_files, SOURCE_EXTENSIONS)
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, request: Request):
+    """
+    Return the status, progress, failed files and error of a load job.
+    """
+    try:
+        return request.app.state.load_queue.get(job_id).to_dict()
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
 
-        # Analyze and save dependency map
-        print("Analyzing dependencies...")
-        dependency_graph = await analyze_and_export_dependencies(filtered_files, filtered_valid_files, repo_id)
-        print("Saving dependency map to Redis...")
-        redis_service.save_dependency_map(repo_id, dependency_graph)
 
-        return {"message": "Repository loaded and dependency map generated successfully."}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.get("/jobs/{job_id}/progress")
+async def get_job_progress(job_id: str, request: Request):
+    """
+    Return only the status and file counts of a load job, for frequent polling.
+    """
+    try:
+        job = request.app.state.load_queue.get(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"job_id": job.job_id, "status": job.status, **job.progress}
@@ -1,2 +1,98 @@
+import os
+
+# Log level; per-file messages (skipped, unparsable, unresolved) are logged at DEBUG
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
 # Supported source file extensions
 SOURCE_EXTENSIONS = [".cs", ".py", ".js", ".ts", ".tsx", ".cpp", ".h", ".java"]
+
+# Tree filtering before download: globs skipped unless a load opts out
+# (comma-separated, gitignore-style), and the largest blob fetched in bytes (0 for no limit)
+DEFAULT_EXCLUDE_GLOBS = [
+    glob for glob in os.getenv("DEFAULT_EXCLUDE_GLOBS", "node_modules/,vendor/,dist/,*.min.js").split(",") if glob
+]
+MAX_BLOB_SIZE = int(os.getenv("MAX_BLOB_SIZE", 1024 * 1024))
+
+# Parallel parsing: worker processes, file count below which parsing stays serial,
+# and number of files shipped to a worker per task
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", os.cpu_count() or 1))
+PARSE_PARALLEL_THRESHOLD = int(os.getenv("PARSE_PARALLEL_THRESHOLD", 200))
+PARSE_CHUNK_SIZE = int(os.getenv("PARSE_CHUNK_SIZE", 64))
+
+# C++ include resolution: repository directories searched for #include paths after
+# the including file's own directory (comma-separated)
+CPP_INCLUDE_DIRS = [path for path in os.getenv("CPP_INCLUDE_DIRS", "include,src").split(",") if path]
+
+# Load pipeline: concurrent file fetches and fetched files buffered ahead of the
+# store/parse stage
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", 32))
+PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", 256))
+
+# Load jobs: loads run concurrently and finished jobs kept for status queries
+LOAD_WORKERS = int(os.getenv("LOAD_WORKERS", 2))
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", 1000))
+
+# GitHub client: requests in flight, connection pool, timeouts and retry policy
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", 32))
+GITHUB_CONNECTION_LIMIT = int(os.getenv("GITHUB_CONNECTION_LIMIT", 64))
+GITHUB_CONNECTION_LIMIT_PER_HOST = int(os.getenv("GITHUB_CONNECTION_LIMIT_PER_HOST", 32))
+GITHUB_DNS_CACHE_TTL = int(os.getenv("GITHUB_DNS_CACHE_TTL", 300))
+GITHUB_KEEPALIVE_TIMEOUT = float(os.getenv("GITHUB_KEEPALIVE_TIMEOUT", 30))
+GITHUB_REQUEST_TIMEOUT = float(os.getenv("GITHUB_REQUEST_TIMEOUT", 60))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", 5))
+GITHUB_BACKOFF_BASE = float(os.getenv("GITHUB_BACKOFF_BASE", 0.5))
+GITHUB_BACKOFF_MAX = float(os.getenv("GITHUB_BACKOFF_MAX", 60))
+
+# Archive ingestion: bytes per streamed read and chunks buffered ahead of extraction
+GITHUB_STREAM_CHUNK_SIZE = int(os.getenv("GITHUB_STREAM_CHUNK_SIZE", 64 * 1024))
+ARCHIVE_BUFFER_CHUNKS = int(os.getenv("ARCHIVE_BUFFER_CHUNKS", 16))
+
+# Storage backend: "redis", or "mmap" for an embedded append-only segment file in
+# STORAGE_PATH read through mmap (one process only, no network hop)
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "redis")
+STORAGE_PATH = os.getenv("STORAGE_PATH", "data/store")
+# Seconds a storage lock (held e.g. while a manifest and its blob reference counts
+# are updated) is kept at most, so a crashed holder cannot block others for good
+STORAGE_LOCK_TIMEOUT = float(os.getenv("STORAGE_LOCK_TIMEOUT", 60))
+
+# Redis: connection, shared pool size and timeouts, and keys per MSET/MGET/DEL
+# command in bulk operations
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+REDIS_DB = int(os.getenv("REDIS_DB", 0))
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 10))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 5))
+REDIS_BATCH_SIZE = int(os.getenv("REDIS_BATCH_SIZE", 1000))
+
+# Blob store: seconds an unreferenced file content is kept before garbage collection,
+# which must exceed the duration of a load (a load writing or reusing the blob restarts it)
+BLOB_GC_GRACE_SECONDS = int(os.getenv("BLOB_GC_GRACE_SECONDS", 24 * 3600))
+
+# File content compression: "zstd" (requires zstandard; checked at startup), "zlib" or
+# "none", with a dictionary of up to BLOB_DICTIONARY_SIZE bytes trained per repository
+# from its first stored files, once there are at least BLOB_DICTIONARY_MIN_SAMPLES of them
+BLOB_COMPRESSION = os.getenv("BLOB_COMPRESSION", "zstd")
+BLOB_DICTIONARY_SIZE = int(os.getenv("BLOB_DICTIONARY_SIZE", 64 * 1024))
+BLOB_DICTIONARY_MIN_SAMPLES = int(os.getenv("BLOB_DICTIONARY_MIN_SAMPLES", 16))
+
+# Streamed bundles: files read from Redis per round trip, and content bytes sent per
+# page unless a request sets its own budget (0 for no budget)
+BUNDLE_STREAM_BATCH_SIZE = int(os.getenv("BUNDLE_STREAM_BATCH_SIZE", 100))
+BUNDLE_STREAM_MAX_BYTES = int(os.getenv("BUNDLE_STREAM_MAX_BYTES", 32 * 1024 * 1024))
+
+# Bundle cache: size of the in-process LRU in bytes (0 disables it), seconds bundles
+# stay cached (0 disables the shared Redis tier) and the largest bundle cached
+BUNDLE_CACHE_MAX_BYTES = int(os.getenv("BUNDLE_CACHE_MAX_BYTES", 256 * 1024 * 1024))
+BUNDLE_CACHE_TTL = int(os.getenv("BUNDLE_CACHE_TTL", 3600))
+BUNDLE_CACHE_MAX_ENTRY_BYTES = int(os.getenv("BUNDLE_CACHE_MAX_ENTRY_BYTES", 16 * 1024 * 1024))
+
+# Graph queries: repositories whose strongly connected component index is kept
+# decoded in each process
+GRAPH_INDEX_CACHE_SIZE = int(os.getenv("GRAPH_INDEX_CACHE_SIZE", 16))
+
+# Dependency map storage: "binary" (path table + delta-encoded edge arrays) or
+# "json", and the compression applied to binary maps and graph indexes ("zstd", "lz4",
+# "zlib" or "none"; the library of the one picked must be installed)
+DEPENDENCY_MAP_FORMAT = os.getenv("DEPENDENCY_MAP_FORMAT", "binary")
+DEPENDENCY_MAP_COMPRESSION = os.getenv("DEPENDENCY_MAP_COMPRESSION", "zstd")
@@ -1,35 +1,181 @@
+import asyncio
+import json
+import random
+import time
+from typing import AsyncIterator, Optional
 import aiohttp
+from app.config.settings import (
+    GITHUB_BACKOFF_BASE,
+    GITHUB_BACKOFF_MAX,
+    GITHUB_CONNECTION_LIMIT,
+    GITHUB_CONNECTION_LIMIT_PER_HOST,
+    GITHUB_DNS_CACHE_TTL,
+    GITHUB_KEEPALIVE_TIMEOUT,
+    GITHUB_MAX_CONCURRENCY,
+    GITHUB_MAX_RETRIES,
+    GITHUB_REQUEST_TIMEOUT,
+    GITHUB_STREAM_CHUNK_SIZE,
+)
+from app.utils.metrics import FETCHED_BYTES
 
 
 class GitHubClient:
     """
     A client to manage the connection with GitHub's API.
+
+    All requests share one pooled session, are capped at `max_concurrency` in
+    flight, and are retried with exponential backoff on rate limits, server
+    errors and connection failures.
     """
 
     BASE_URL = "https://api.github.com"
+    RAW_BASE_URL = "https://raw.githubusercontent.com"
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
 
-    def __init__(self, token: str):
+    def __init__(
+        self,
+        token: str,
+        max_concurrency: int = GITHUB_MAX_CONCURRENCY,
+        max_retries: int = GITHUB_MAX_RETRIES,
+        backoff_base: float = GITHUB_BACKOFF_BASE,
+        backoff_max: float = GITHUB_BACKOFF_MAX,
+    ):
         """
         Initialize the GitHubClient with a personal access token.
         """
         self.headers = {"Authorization": f"token {token}"} if token else {}
-        self.session = aiohttp.ClientSession(headers=self.headers)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+        connector = aiohttp.TCPConnector(
+            limit=GITHUB_CONNECTION_LIMIT,
+            limit_per_host=GITHUB_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=GITHUB_DNS_CACHE_TTL,
+            keepalive_timeout=GITHUB_KEEPALIVE_TIMEOUT,
+        )
+        self.session = aiohttp.ClientSession(
+            headers=self.headers,
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=GITHUB_REQUEST_TIMEOUT),
+        )
 
     async def get(self, url: str):
         """
         Perform a GET request to the given URL.
         """
-        async with self.session.get(url) as response:
-            response.raise_for_status()
-            return await response.json()
+        return await self._request(url, self._read_json)
 
     async def fetch_raw(self, url: str):
         """
         Perform a GET request to fetch raw file content.
         """
-        async with self.session.get(url) as response:
-            response.raise_for_status()
-            return await response.text()
+        return await self._request(url, self._read_text)
+
+    async def stream(self, url: str, chunk_size: int = GITHUB_STREAM_CHUNK_SIZE) -> AsyncIterator[bytes]:
+        """
+        Perform a GET request and yield the response body in chunks.
+
+        Retries, including of connection failures and timeouts, apply until the
+        response starts; the body itself is never buffered whole, and only the
+        per-read timeout applies to it.
+        """
+        timeout = aiohttp.ClientTimeout(total=None, sock_read=GITHUB_REQUEST_TIMEOUT)
+        attempt = 0
+        started = False
+        while True:
+            async with self._semaphore:
+                try:
+                    async with self.session.get(url, timeout=timeout) as response:
+                        delay = self._retry_delay(response, attempt)
+                        if delay is None:
+                            response.raise_for_status()
+                            started = True
+                            async for chunk in response.content.iter_chunked(chunk_size):
+                                FETCHED_BYTES.inc(len(chunk))
+                                yield chunk
+                            return
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if started or attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @staticmethod
+    async def _read_body(response: aiohttp.ClientResponse) -> bytes:
+        body = await response.read()
+        FETCHED_BYTES.inc(len(body))
+        return body
+
+    async def _read_json(self, response: aiohttp.ClientResponse):
+        return json.loads(await self._read_body(response))
+
+    async def _read_text(self, response: aiohttp.ClientResponse) -> str:
+        body = await self._read_body(response)
+        return body.decode(response.get_encoding())
+
+    async def _request(self, url: str, read):
+        """
+        Perform a GET request with bounded concurrency and retries.
+
+        Args:
+            url (str): The URL to fetch.
+            read (Callable): Coroutine factory reading the body from a successful response.
+
+        Raises:
+            aiohttp.ClientResponseError: If the request still fails after all retries.
+        """
+        attempt = 0
+        while True:
+            async with self._semaphore:
+                try:
+                    async with self.session.get(url) as response:
+                        delay = self._retry_delay(response, attempt)
+                        if delay is None:
+                            response.raise_for_status()
+                            return await read(response)
+                except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = self._backoff(attempt)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _retry_delay(self, response: aiohttp.ClientResponse, attempt: int) -> Optional[float]:
+        """
+        Decide whether a response should be retried and how long to wait first.
+
+        Returns:
+            Optional[float]: Seconds to wait, or None if the response should be returned as is.
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        rate_limited = response.status == 403 and (
+            response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+        )
+        if response.status not in self.RETRY_STATUSES and not rate_limited:
+            return None
+
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+
+        reset = response.headers.get("X-RateLimit-Reset")
+        if reset and reset.isdigit() and response.headers.get("X-RateLimit-Remaining") == "0":
+            return min(max(float(reset) - time.time(), 0.0), self.backoff_max)
+
+        return self._backoff(attempt)
+
+    def _backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter.
+        """
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
 
     async def close(self):
         """
@@ -0,0 +1,412 @@
+import asyncio
+import fcntl
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from app.config.settings import STORAGE_LOCK_TIMEOUT, STORAGE_PATH
+from app.infrastructure.storage import Storage
+
+logger = logging.getLogger(__name__)
+
+# The segment is a log of records, replayed on open to rebuild the in-memory index:
+#   op (u8) | key length (u32) | value length (u32) | expiry (f64, 0 for none) | CRC32 (u32)
+#   key (UTF-8) | value
+# SET values are the raw string or bytes; HASH holds the whole hash as JSON, ZADD
+# and ZREM the members they change. A torn record at the end is truncated on open.
+_RECORD = struct.Struct("<BIIdI")
+_SET, _DELETE, _HASH, _ZADD, _ZREM = range(1, 6)
+# Approximate bytes per member of a compacted scored set: quotes, score and separators
+_SCORED_MEMBER_OVERHEAD = 28
+
+
+class MmapStore(Storage):
+    """
+    Embedded storage in a single append-only segment file.
+
+    Strings and bytes are located through an in-memory offset index and read
+    from a read-only mmap of the segment, so bundle reads involve neither a
+    network round trip nor a copy: `get_many_bytes` returns memoryviews of the
+    mapping. Hashes, counters and scored sets are small and kept in memory;
+    every change is appended to the log.
+
+    Every operation runs on a single I/O thread, so page faults and writes
+    never block the event loop and the index needs no locking.
+
+    Writes reach the OS page cache immediately, so the store survives a crash
+    of the process but is not fsynced per write. The size of the live records
+    is tracked as they are written, and the segment is compacted as soon as
+    more than half of it is overwritten or deleted records.
+
+    A mapped segment is never truncated: compaction and flush_db write a new
+    file and swap it in, so memoryviews handed out earlier keep reading the
+    previous mapping, which is released once the last one is. One process at
+    a time may open a store; a second one fails on the lock.
+    """
+
+    SEGMENT_NAME = "segment.log"
+    LOCK_NAME = "LOCK"
+    COMPACT_MIN_BYTES = 1024 * 1024
+
+    def __init__(self, path: str = STORAGE_PATH):
+        """
+        Open or create the store in a directory.
+
+        Raises:
+            RuntimeError: If another process has the store open.
+        """
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self._lock = open(os.path.join(path, self.LOCK_NAME), "a")
+        try:
+            fcntl.flock(self._lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            self._lock.close()
+            raise RuntimeError(f"Storage at {path} is already open in another process.")
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mmap-store")
+        self._open()
+        self._maybe_compact()
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._io, partial(function, *args))
+
+    def _open(self):
+        self._segment = os.path.join(self.path, self.SEGMENT_NAME)
+        self._file = open(self._segment, "a+b")
+        self._size = self._file.seek(0, os.SEEK_END)
+        self._map: Optional[mmap.mmap] = None
+        # key -> (value offset, value length, expiry or 0)
+        self._values: Dict[str, Tuple[int, int, float]] = {}
+        self._hashes: Dict[str, Dict[str, str]] = {}
+        self._sorted: Dict[str, Dict[str, float]] = {}
+        # key -> bytes its record(s) would take in a compacted segment, and their total
+        self._sizes: Dict[str, int] = {}
+        self._live = 0
+        self._replay()
+
+    # -- log --------------------------------------------------------------
+
+    def _replay(self):
+        """
+        Rebuild the index from the segment, dropping a torn or corrupt tail.
+        """
+        if not self._size:
+            return
+        self._remap()
+        data = self._map
+        position = 0
+        while position + _RECORD.size <= self._size:
+            op, key_length, value_length, expires_at, checksum = _RECORD.unpack_from(data, position)
+            start = position + _RECORD.size
+            end = start + key_length + value_length
+            if end > self._size or zlib.crc32(data[start:end]) != checksum:
+                break
+            key = data[start:start + key_length].decode("utf-8")
+            self._apply(op, key, start + key_length, value_length, expires_at)
+            position = end
+
+        if position < self._size:
+            # Nothing has read the new mapping yet, so it can be closed and the file cut
+            logger.warning("Truncating %d bytes of incomplete records in %s.", self._size - position, self._segment)
+            self._map.close()
+            self._map = None
+            self._file.truncate(position)
+            self._size = position
+
+    def _apply(self, op: int, key: str, offset: int, length: int, expires_at: float):
+        if op == _SET:
+            self._drop(key)
+            self._values[key] = (offset, length, expires_at)
+            self._set_size(key, length)
+        elif op == _DELETE:
+            self._drop(key)
+        elif op == _HASH:
+            self._drop(key)
+            self._hashes[key] = json.loads(self._map[offset:offset + length])
+            self._set_size(key, length)
+        elif op == _ZADD:
+            self._add_members(key, json.loads(self._map[offset:offset + length]))
+        elif op == _ZREM:
+            self._remove_members(key, json.loads(self._map[offset:offset + length]))
+
+    def _set_size(self, key: str, value_length: int):
+        size = _RECORD.size + len(key) + value_length
+        self._live += size - self._sizes.get(key, 0)
+        self._sizes[key] = size
+
+    def _drop(self, key: str):
+        self._values.pop(key, None)
+        self._hashes.pop(key, None)
+        self._sorted.pop(key, None)
+        self._live -= self._sizes.pop(key, 0)
+
+    def _add_members(self, key: str, scores: Dict[str, float]):
+        members = self._sorted.setdefault(key, {})
+        added = sum(len(member) + _SCORED_MEMBER_OVERHEAD for member in scores if member not in members)
+        members.update(scores)
+        self._set_size(key, self._sizes.get(key, _RECORD.size + len(key)) - _RECORD.size - len(key) + added)
+
+    def _remove_members(self, key: str, removed: List[str]):
+        members = self._sorted.get(key, {})
+        freed = sum(len(member) + _SCORED_MEMBER_OVERHEAD for member in removed if members.pop(member, None) is not None)
+        if not members:
+            self._drop(key)
+        elif freed:
+            self._set_size(key, self._sizes[key] - _RECORD.size - len(key) - freed)
+
+    def _append(self, records: Iterable[Tuple[int, str, bytes, float]]) -> List[int]:
+        """
+        Append records in one write and return the offset of each value.
+        """
+        chunks, offsets = [], []
+        position = self._size
+        for op, key, value, expires_at in records:
+            encoded_key = key.encode("utf-8")
+            body = encoded_key + value
+            chunks.append(_RECORD.pack(op, len(encoded_key), len(value), expires_at, zlib.crc32(body)))
+            chunks.append(body)
+            offsets.append(position + _RECORD.size + len(encoded_key))
+            position += _RECORD.size + len(body)
+        self._file.write(b"".join(chunks))
+        self._file.flush()
+        self._size = position
+        return offsets
+
+    def _remap(self):
+        """
+        Map the whole segment again after it grew. The previous mapping is not
+        closed: views of it stay valid, and it is released once the last one is.
+        """
+        self._map = mmap.mmap(self._file.fileno(), self._size, access=mmap.ACCESS_READ)
+
+    def _view(self, key: str) -> Optional[memoryview]:
+        entry = self._values.get(key)
+        if entry is None:
+            return None
+        offset, length, expires_at = entry
+        if expires_at and expires_at <= time.time():
+            return None
+        if self._map is None or offset + length > len(self._map):
+            self._remap()
+        return memoryview(self._map)[offset:offset + length]
+
+    def _maybe_compact(self):
+        if self._size > self.COMPACT_MIN_BYTES and self._size > 2 * self._live:
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrite the segment with only the live records, then swap it in.
+        """
+        now = time.time()
+        temporary = self._segment + ".tmp"
+        with open(temporary, "wb") as file:
+            for key in list(self._values):
+                view = self._view(key)
+                if view is None:
+                    continue
+                encoded_key = key.encode("utf-8")
+                body = encoded_key + view.tobytes()
+                expires_at = self._values[key][2]
+                file.write(_RECORD.pack(_SET, len(encoded_key), len(view), expires_at, zlib.crc32(body)) + body)
+            for op, collection in ((_HASH, self._hashes), (_ZADD, self._sorted)):
+                for key, value in collection.items():
+                    encoded_key, encoded = key.encode("utf-8"), json.dumps(value).encode("utf-8")
+                    body = encoded_key + encoded
+                    file.write(_RECORD.pack(op, len(encoded_key), len(encoded), 0.0, zlib.crc32(body)) + body)
+            file.flush()
+            os.fsync(file.fileno())
+        self._swap(temporary)
+        logger.info("Compacted %s to %d bytes in %.2fs.", self._segment, self._size, time.time() - now)
+
+    def _swap(self, replacement: str):
+        """
+        Replace the segment with another file and reopen it. The old file is
+        unlinked, not truncated, so existing views of its mapping stay readable.
+        """
+        os.replace(replacement, self._segment)
+        self._file.close()
+        self._open()
+
+    # -- strings ----------------------------------------------------------
+
+    def _set_many(self, items: Dict[str, bytes], expires_at: float = 0.0):
+        keys = list(items)
+        offsets = self._append((_SET, key, items[key], expires_at) for key in keys)
+        for key, offset in zip(keys, offsets):
+            self._drop(key)
+            self._values[key] = (offset, len(items[key]), expires_at)
+            self._set_size(key, len(items[key]))
+        self._maybe_compact()
+
+    def _get_many_views(self, keys: List[str]) -> List[Optional[memoryview]]:
+        return [self._view(key) for key in keys]
+
+    def _get_many_text(self, keys: List[str]) -> List[Optional[str]]:
+        return [None if view is None else str(view, "utf-8") for view in self._get_many_views(keys)]
+
+    async def set_text(self, key: str, value: str, ttl: Optional[int] = None):
+        await self._run(self._set_many, {key: value.encode("utf-8")}, time.time() + ttl if ttl else 0.0)
+
+    async def get_text(self, key: str) -> Optional[str]:
+        return (await self._run(self._get_many_text, [key]))[0]
+
+    async def set_bytes(self, key: str, value: bytes):
+        await self._run(self._set_many, {key: bytes(value)})
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        [view] = await self._run(self._get_many_views, [key])
+        return None if view is None else view.tobytes()
+
+    async def set_many_text(self, items: Dict[str, str]):
+        await self._run(self._set_many, {key: value.encode("utf-8") for key, value in items.items()})
+
+    async def get_many_text(self, keys: List[str]) -> List[Optional[str]]:
+        return await self._run(self._get_many_text, keys)
+
+    async def set_many_bytes(self, items: Dict[str, bytes]):
+        await self._run(self._set_many, {key: bytes(value) for key, value in items.items()})
+
+    async def get_many_bytes(self, keys: List[str]) -> List[Optional[memoryview]]:
+        """
+        Return memoryviews of the mapped segment, without copying the values.
+        """
+        return await self._run(self._get_many_views, keys)
+
+    # -- hashes and counters ----------------------------------------------
+
+    def _replace_hash(self, key: str, fields: Dict[str, Any]):
+        if not fields:
+            self._delete_many([key])
+            return
+        encoded = {field: json.dumps(value) for field, value in fields.items()}
+        value = json.dumps(encoded).encode("utf-8")
+        self._append([(_HASH, key, value, 0.0)])
+        self._drop(key)
+        self._hashes[key] = encoded
+        self._set_size(key, len(value))
+        self._maybe_compact()
+
+    def _get_hash_fields(self, key: str, fields: List[str]) -> List[Any]:
+        values = self._hashes.get(key, {})
+        return [json.loads(values[field]) if field in values else None for field in fields]
+
+    def _get_hash(self, key: str) -> Dict[str, Any]:
+        return {field: json.loads(data) for field, data in self._hashes.get(key, {}).items()}
+
+    def _increment_many(self, deltas: Dict[str, int]) -> List[int]:
+        counts = []
+        for key, delta in deltas.items():
+            view = self._view(key)
+            counts.append((int(str(view, "utf-8")) if view is not None else 0) + delta)
+        self._set_many({key: str(count).encode() for key, count in zip(deltas, counts)})
+        return counts
+
+    async def replace_hash(self, key: str, fields: Dict[str, Any]):
+        await self._run(self._replace_hash, key, fields)
+
+    async def get_hash_fields(self, key: str, fields: List[str]) -> List[Any]:
+        return await self._run(self._get_hash_fields, key, fields)
+
+    async def get_hash(self, key: str) -> Dict[str, Any]:
+        return await self._run(self._get_hash, key)
+
+    async def increment(self, key: str) -> int:
+        return (await self.increment_many({key: 1}))[0]
+
+    async def increment_many(self, deltas: Dict[str, int]) -> List[int]:
+        return await self._run(self._increment_many, deltas)
+
+    # -- scored sets ------------------------------------------------------
+
+    def _add_scored(self, key: str, scores: Dict[str, float], only_existing: bool):
+        members = self._sorted.get(key, {})
+        if only_existing:
+            scores = {member: score for member, score in scores.items() if member in members}
+        if not scores:
+            return
+        self._append([(_ZADD, key, json.dumps(scores).encode("utf-8"), 0.0)])
+        self._add_members(key, scores)
+        self._maybe_compact()
+
+    def _get_scored_below(self, key: str, max_score: float) -> List[str]:
+        members = self._sorted.get(key, {})
+        return [member for member, score in sorted(members.items(), key=lambda item: (item[1], item[0])) if score <= max_score]
+
+    def _remove_scored(self, key: str, members: List[str]):
+        present = [member for member in members if member in self._sorted.get(key, {})]
+        if not present:
+            return
+        self._append([(_ZREM, key, json.dumps(present).encode("utf-8"), 0.0)])
+        self._remove_members(key, present)
+        self._maybe_compact()
+
+    async def add_scored(self, key: str, scores: Dict[str, float], only_existing: bool = False):
+        await self._run(self._add_scored, key, scores, only_existing)
+
+    async def get_scored_below(self, key: str, max_score: float) -> List[str]:
+        return await self._run(self._get_scored_below, key, max_score)
+
+    async def remove_scored(self, key: str, members: List[str]):
+        await self._run(self._remove_scored, key, members)
+
+    # -- keys -------------------------------------------------------------
+
+    def _exists_many(self, keys: List[str]) -> List[bool]:
+        return [self._view(key) is not None or key in self._hashes or key in self._sorted for key in keys]
+
+    def _delete_many(self, keys: List[str]):
+        present = [key for key in keys if key in self._values or key in self._hashes or key in self._sorted]
+        if not present:
+            return
+        self._append((_DELETE, key, b"", 0.0) for key in present)
+        for key in present:
+            self._drop(key)
+        self._maybe_compact()
+
+    async def exists_many(self, keys: List[str]) -> List[bool]:
+        return await self._run(self._exists_many, keys)
+
+    async def exists(self, key: str) -> bool:
+        return (await self.exists_many([key]))[0]
+
+    async def delete_data(self, key: str):
+        await self.delete_many([key])
+
+    async def delete_many(self, keys: List[str]):
+        await self._run(self._delete_many, keys)
+
+    @asynccontextmanager
+    async def lock(self, name: str, timeout: float = STORAGE_LOCK_TIMEOUT):
+        """
+        Only this process uses the store, so an asyncio lock per name suffices
+        and `timeout` is not needed.
+        """
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            yield
+
+    def _flush(self):
+        empty = self._segment + ".tmp"
+        open(empty, "wb").close()
+        self._swap(empty)
+
+    async def flush_db(self):
+        await self._run(self._flush)
+
+    def _close(self):
+        self._map = None
+        self._file.close()
+        fcntl.flock(self._lock, fcntl.LOCK_UN)
+        self._lock.close()
+
+    async def close(self):
+        await self._run(self._close)
+        self._io.shutdown()
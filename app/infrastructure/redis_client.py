@@ -1,38 +1,258 @@
-import redis
+import asyncio
+import redis.asyncio as redis
 import json
-import os
+import uuid
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import Any, Dict, Iterable, List, Optional
+from redis.exceptions import WatchError
+from app.infrastructure.storage import Storage
+from app.config.settings import (
+    REDIS_BATCH_SIZE,
+    REDIS_CONNECT_TIMEOUT,
+    REDIS_DB,
+    REDIS_HOST,
+    REDIS_MAX_CONNECTIONS,
+    REDIS_PORT,
+    REDIS_SOCKET_TIMEOUT,
+    STORAGE_LOCK_TIMEOUT,
+)
 
-class RedisClient:
-    def __init__(self, host="localhost", port=6379, db=0):
+
+def _batches(items: Iterable, size: int):
+    iterator = iter(items)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class RedisClient(Storage):
+    """
+    Asyncio Redis client backed by a single connection pool.
+
+    One instance is created in the app lifespan and shared by every service, so
+    Redis calls never block the event loop and connections are reused.
+    """
+
+    def __init__(
+        self,
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        db=REDIS_DB,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+        batch_size=REDIS_BATCH_SIZE,
+    ):
         """
-        Initialize the Redis client.
+        Initialize the Redis client and its connection pool.
         """
-        self.client = redis.StrictRedis(
-            host=host, port=port, db=db, decode_responses=True
+        pool_options = dict(
+            host=host,
+            port=port,
+            db=db,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=socket_connect_timeout,
         )
+        self.pool = redis.ConnectionPool(decode_responses=True, **pool_options)
+        self.client = redis.Redis(connection_pool=self.pool)
+        # Binary values (e.g. encoded dependency maps) must bypass response decoding
+        self.binary_pool = redis.ConnectionPool(decode_responses=False, **pool_options)
+        self.binary_client = redis.Redis(connection_pool=self.binary_pool)
+        self.batch_size = batch_size
+
+    async def set_text(self, key: str, value: str, ttl: Optional[int] = None):
+        """
+        Store a string in Redis as is, without JSON encoding, expiring after `ttl` seconds if given.
+        """
+        await self.client.set(key, value, ex=ttl)
+
+    async def get_text(self, key: str) -> Optional[str]:
+        """
+        Retrieve a string stored with set_text.
+        """
+        return await self.client.get(key)
+
+    async def set_bytes(self, key: str, value: bytes):
+        """
+        Store raw bytes.
+        """
+        await self.binary_client.set(key, value)
+
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Retrieve a value as raw bytes, whatever it was stored with.
+        """
+        return await self.binary_client.get(key)
+
+    async def set_many_text(self, items: Dict[str, str]):
+        """
+        Store many strings as is, one pipelined MSET per batch.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(items.items(), self.batch_size):
+            pipeline.mset(dict(batch))
+        await pipeline.execute()
+
+    async def get_many_text(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Retrieve many strings with batched MGETs. Missing keys come back as None.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(keys, self.batch_size):
+            pipeline.mget(batch)
+        return [value for values in await pipeline.execute() for value in values]
+
+    async def set_many_bytes(self, items: Dict[str, bytes]):
+        """
+        Store many raw byte values, one pipelined MSET per batch.
+        """
+        pipeline = self.binary_client.pipeline(transaction=False)
+        for batch in _batches(items.items(), self.batch_size):
+            pipeline.mset(dict(batch))
+        await pipeline.execute()
+
+    async def get_many_bytes(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Retrieve many values as raw bytes with batched MGETs. Missing keys come back as None.
+        """
+        pipeline = self.binary_client.pipeline(transaction=False)
+        for batch in _batches(keys, self.batch_size):
+            pipeline.mget(batch)
+        return [value for values in await pipeline.execute() for value in values]
+
+    async def replace_hash(self, key: str, fields: Dict[str, Any]):
+        """
+        Atomically replace a hash with JSON-encoded fields, one HSET per batch.
+        Large hashes (manifests, component indexes) are encoded in a worker thread.
+        """
+        encoded = await asyncio.to_thread(lambda: {field: json.dumps(value) for field, value in fields.items()})
+        pipeline = self.client.pipeline(transaction=True)
+        pipeline.delete(key)
+        for batch in _batches(encoded.items(), self.batch_size):
+            pipeline.hset(key, mapping=dict(batch))
+        await pipeline.execute()
+
+    async def get_hash_fields(self, key: str, fields: List[str]) -> List[Any]:
+        """
+        Retrieve JSON-encoded hash fields with batched HMGETs. Missing fields come back as None.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(fields, self.batch_size):
+            pipeline.hmget(key, batch)
+        return [json.loads(data) if data else None for values in await pipeline.execute() for data in values]
+
+    async def increment(self, key: str) -> int:
+        """
+        Atomically increment an integer counter and return its new value.
+        """
+        return await self.client.incr(key)
+
+    async def increment_many(self, deltas: Dict[str, int]) -> List[int]:
+        """
+        Add to many integer counters in one pipeline and return their new values.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for key, delta in deltas.items():
+            pipeline.incrby(key, delta)
+        return await pipeline.execute()
+
+    async def get_hash(self, key: str) -> Dict[str, Any]:
+        """
+        Retrieve every JSON-encoded field of a hash.
+        """
+        return {field: json.loads(data) for field, data in (await self.client.hgetall(key)).items()}
+
+    async def add_scored(self, key: str, scores: Dict[str, float], only_existing: bool = False):
+        """
+        Add members to a sorted set, or only update the scores of members already in it.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(scores.items(), self.batch_size):
+            pipeline.zadd(key, dict(batch), xx=only_existing)
+        await pipeline.execute()
 
-    def set_data(self, key: str, value: dict):
+    async def get_scored_below(self, key: str, max_score: float) -> List[str]:
         """
-        Store data in Redis as JSON.
+        Return the members of a sorted set whose score is at most `max_score`.
         """
-        self.client.set(key, json.dumps(value))
+        return await self.client.zrangebyscore(key, "-inf", max_score)
 
-    def get_data(self, key: str):
+    async def remove_scored(self, key: str, members: List[str]):
         """
-        Retrieve data from Redis and parse it as JSON.
+        Remove members from a sorted set, one ZREM per batch.
         """
-        data = self.client.get(key)
-        return json.loads(data) if data else None
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(members, self.batch_size):
+            pipeline.zrem(key, *batch)
+        await pipeline.execute()
 
-    def delete_data(self, key: str):
+    async def exists_many(self, keys: List[str]) -> List[bool]:
+        """
+        Check which of many keys exist, in one pipeline.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipeline.exists(key)
+        return [bool(found) for found in await pipeline.execute()]
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check whether a key exists.
+        """
+        return bool(await self.client.exists(key))
+
+    async def delete_data(self, key: str):
         """
         Delete data from Redis by key.
         """
-        self.client.delete(key)
+        await self.client.delete(key)
 
-    def flush_db(self):
+    async def delete_many(self, keys: List[str]):
+        """
+        Delete many keys, one pipelined DEL per batch.
+        """
+        pipeline = self.client.pipeline(transaction=False)
+        for batch in _batches(keys, self.batch_size):
+            pipeline.delete(*batch)
+        await pipeline.execute()
+
+    @asynccontextmanager
+    async def lock(self, name: str, timeout: float = STORAGE_LOCK_TIMEOUT):
+        """
+        Hold a lock shared by every process using the server: a SET NX that
+        expires after `timeout` seconds, released by a transactional
+        check-and-delete so a holder whose lock expired cannot release another's.
+        """
+        key = f"lock:{name}"
+        token = uuid.uuid4().hex
+        while not await self.client.set(key, token, nx=True, px=int(timeout * 1000)):
+            await asyncio.sleep(0.05)
+        try:
+            yield
+        finally:
+            async with self.client.pipeline(transaction=True) as pipeline:
+                try:
+                    await pipeline.watch(key)
+                    if await pipeline.get(key) == token:
+                        pipeline.multi()
+                        pipeline.delete(key)
+                        await pipeline.execute()
+                except WatchError:
+                    pass
+
+    async def flush_db(self):
         """
         Clear the entire Redis database.
         """
-        self.client.flushdb()
+        await self.client.flushdb()
         print("Redis database flushed.")
+
+    async def close(self):
+        """
+        Close the client and disconnect every pooled connection.
+        """
+        await self.client.aclose()
+        await self.binary_client.aclose()
+        await self.pool.disconnect()
+        await self.binary_pool.disconnect()
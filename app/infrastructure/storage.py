@@ -0,0 +1,195 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any, AsyncContextManager, Dict, List, Optional
+from app.config.settings import STORAGE_BACKEND, STORAGE_LOCK_TIMEOUT, STORAGE_PATH
+
+
+class Storage(ABC):
+    """
+    Key-value storage used by every service: strings and raw bytes, JSON-valued
+    hashes, integer counters and scored sets, with Redis semantics.
+
+    Implementations: RedisClient (shared Redis server) and MmapStore (embedded
+    append-only segment file read through mmap). Pick one with STORAGE_BACKEND.
+    """
+
+    async def set_data(self, key: str, value: Any):
+        """
+        Store a value as JSON.
+        """
+        await self.set_text(key, json.dumps(value))
+
+    async def get_data(self, key: str) -> Any:
+        """
+        Retrieve a value stored with set_data, or None.
+        """
+        data = await self.get_text(key)
+        return json.loads(data) if data else None
+
+    async def set_many(self, items: Dict[str, Any]):
+        """
+        Store many values as JSON.
+        """
+        await self.set_many_text({key: json.dumps(value) for key, value in items.items()})
+
+    async def get_many(self, keys: List[str]) -> List[Any]:
+        """
+        Retrieve many JSON values. Missing keys come back as None.
+        """
+        return [json.loads(data) if data else None for data in await self.get_many_text(keys)]
+
+    @abstractmethod
+    async def set_text(self, key: str, value: str, ttl: Optional[int] = None):
+        """
+        Store a string as is, expiring after `ttl` seconds if given.
+        """
+
+    @abstractmethod
+    async def get_text(self, key: str) -> Optional[str]:
+        """
+        Retrieve a string, or None.
+        """
+
+    @abstractmethod
+    async def set_bytes(self, key: str, value: bytes):
+        """
+        Store raw bytes.
+        """
+
+    @abstractmethod
+    async def get_bytes(self, key: str) -> Optional[bytes]:
+        """
+        Retrieve a value as raw bytes, whatever it was stored with.
+        """
+
+    @abstractmethod
+    async def set_many_text(self, items: Dict[str, str]):
+        """
+        Store many strings as is.
+        """
+
+    @abstractmethod
+    async def get_many_text(self, keys: List[str]) -> List[Optional[str]]:
+        """
+        Retrieve many strings. Missing keys come back as None.
+        """
+
+    @abstractmethod
+    async def set_many_bytes(self, items: Dict[str, bytes]):
+        """
+        Store many raw byte values.
+        """
+
+    @abstractmethod
+    async def get_many_bytes(self, keys: List[str]) -> List[Optional[bytes]]:
+        """
+        Retrieve many values as bytes-like objects (possibly memoryviews). Missing keys come back as None.
+        """
+
+    @abstractmethod
+    async def replace_hash(self, key: str, fields: Dict[str, Any]):
+        """
+        Atomically replace a hash with JSON-encoded fields.
+        """
+
+    @abstractmethod
+    async def get_hash_fields(self, key: str, fields: List[str]) -> List[Any]:
+        """
+        Retrieve JSON-encoded hash fields. Missing fields come back as None.
+        """
+
+    @abstractmethod
+    async def get_hash(self, key: str) -> Dict[str, Any]:
+        """
+        Retrieve every JSON-encoded field of a hash.
+        """
+
+    @abstractmethod
+    async def increment(self, key: str) -> int:
+        """
+        Atomically increment an integer counter and return its new value.
+        """
+
+    @abstractmethod
+    async def increment_many(self, deltas: Dict[str, int]) -> List[int]:
+        """
+        Add to many integer counters and return their new values.
+        """
+
+    @abstractmethod
+    async def add_scored(self, key: str, scores: Dict[str, float], only_existing: bool = False):
+        """
+        Add members to a sorted set, or only update the scores of members already in it.
+        """
+
+    @abstractmethod
+    async def get_scored_below(self, key: str, max_score: float) -> List[str]:
+        """
+        Return the members of a sorted set whose score is at most `max_score`, lowest first.
+        """
+
+    @abstractmethod
+    async def remove_scored(self, key: str, members: List[str]):
+        """
+        Remove members from a sorted set.
+        """
+
+    @abstractmethod
+    async def exists_many(self, keys: List[str]) -> List[bool]:
+        """
+        Check which of many keys exist.
+        """
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """
+        Check whether a key exists.
+        """
+
+    @abstractmethod
+    async def delete_data(self, key: str):
+        """
+        Delete a key.
+        """
+
+    @abstractmethod
+    async def delete_many(self, keys: List[str]):
+        """
+        Delete many keys.
+        """
+
+    @abstractmethod
+    def lock(self, name: str, timeout: float = STORAGE_LOCK_TIMEOUT) -> AsyncContextManager:
+        """
+        Return an async context manager holding an exclusive lock on `name`
+        for every user of the store, released after `timeout` seconds at most.
+        """
+
+    @abstractmethod
+    async def flush_db(self):
+        """
+        Clear the entire store.
+        """
+
+    @abstractmethod
+    async def close(self):
+        """
+        Release connections, files and locks.
+        """
+
+
+def create_storage(backend: str = STORAGE_BACKEND, path: str = STORAGE_PATH) -> Storage:
+    """
+    Create the storage backend selected in the settings.
+
+    Args:
+        backend (str): "redis" or "mmap".
+        path (str): Directory of the mmap store.
+    """
+    if backend == "redis":
+        from app.infrastructure.redis_client import RedisClient
+        return RedisClient()
+    if backend == "mmap":
+        from app.infrastructure.mmap_store import MmapStore
+        return MmapStore(path)
+    raise ValueError(f"Unsupported storage backend: {backend}")
@@ -1,26 +1,46 @@
-from fastapi import FastAPI
+import time
+from fastapi import FastAPI, Request
 from contextlib import asynccontextmanager
-from app.api.routes import repo, bundle
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from app.api.routes import repo, bundle, graph, metrics
 from app.config.env_loader import load_environment, get_github_token
 from app.infrastructure.github_client import GitHubClient
-from app.infrastructure.redis_client import RedisClient
+from app.infrastructure.storage import create_storage
+from app.services.bundle_cache import BundleCache
+from app.services.job_queue import JobQueue
+from app.services.repository_loader import run_load_job
+from app.config.settings import (
+    BLOB_COMPRESSION,
+    DEPENDENCY_MAP_COMPRESSION,
+    LOAD_WORKERS,
+    LOG_LEVEL,
+    PARSE_WORKERS,
+    STORAGE_BACKEND,
+)
+from app.utils import blob_codec, graph_codec
+from app.utils.metrics import HTTP_REQUEST_SECONDS
 import logging
 
 # Configure logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 async def initialize_resources():
     """
-    Initialize shared resources like GitHubClient and RedisClient.
+    Initialize shared resources like GitHubClient, the storage backend and the parsing pool.
     """
     await load_environment()
     logger.info("Environment variables loaded.")
+    # A codec missing here would otherwise fail the first load or bundle using it
+    blob_codec.check_compression(BLOB_COMPRESSION)
+    graph_codec.check_compression(DEPENDENCY_MAP_COMPRESSION)
     token = get_github_token()
     logger.info("GitHub token retrieved.")
     github_client = GitHubClient(token)
-    redis_client = RedisClient()
-    return github_client, redis_client
+    storage = create_storage()
+    parse_executor = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+    return github_client, storage, parse_executor
 
 
 @asynccontextmanager
@@ -29,23 +49,62 @@ async def lifespan(app: FastAPI):
     Lifespan context for managing app startup and shutdown.
     """
     logger.info("Initializing resources...")
-    github_client, redis_client = await initialize_resources()
+    github_client, storage, parse_executor = await initialize_resources()
 
     # Attach resources to app state
     app.state.github_client = github_client
-    app.state.redis_client = redis_client
+    app.state.storage = storage
+    app.state.parse_executor = parse_executor
+    # An embedded store is private to this process, so it gains nothing as a shared tier
+    app.state.bundle_cache = BundleCache(storage if STORAGE_BACKEND == "redis" else None)
+    app.state.load_queue = JobQueue(
+        partial(run_load_job, github_client=github_client, storage=storage, executor=parse_executor),
+        worker_count=LOAD_WORKERS,
+    )
+    app.state.load_queue.start()
     logger.info("Resources initialized successfully.")
 
     yield
 
+    # Stop load workers before the clients they use are closed
+    await app.state.load_queue.stop()
+    logger.info("Load workers stopped.")
     # Cleanup resources
     await app.state.github_client.close()
     logger.info("GitHubClient session closed.")
+    await app.state.storage.close()
+    logger.info("Storage closed.")
+    app.state.parse_executor.shutdown()
+    logger.info("Parsing pool shut down.")
     logger.info("App shutdown complete.")
 
 
 app = FastAPI(title="Repo Analyzer", lifespan=lifespan)
 
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    """
+    Observe every request in the latency histogram, labelled by route template.
+    """
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        HTTP_REQUEST_SECONDS.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route.path if route is not None else "unmatched",
+            status=str(status),
+        )
+
+
 # Include routes
 app.include_router(repo.router, prefix="/api/repo", tags=["Repository"])
 app.include_router(bundle.router, prefix="/api/bundle", tags=["Bundle"])
+app.include_router(graph.router, prefix="/api/graph", tags=["Graph"])
+app.include_router(metrics.router, tags=["Metrics"])
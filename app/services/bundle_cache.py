@@ -0,0 +1,151 @@
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from app.config.settings import BUNDLE_CACHE_MAX_BYTES, BUNDLE_CACHE_MAX_ENTRY_BYTES, BUNDLE_CACHE_TTL
+from app.infrastructure.storage import Storage
+from app.utils.metrics import BUNDLE_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# (repo_id, graph version, target file, direction, max depth)
+BundleKey = Tuple[str, int, str, str, Optional[int]]
+
+
+def bundle_etag(key: BundleKey) -> str:
+    """
+    Entity tag of a bundle.
+
+    A bundle only changes when its repository gets a new graph version, so the
+    tag is derived from the cache key and can be checked before building the
+    bundle. It is weak because it names the graph version, not the bytes sent.
+    """
+    digest = hashlib.sha1(json.dumps(key).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches an entity tag, with weak comparison.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+
+class BundleCache:
+    """
+    Two-tier cache of generated bundles.
+
+    Bundles are keyed by repository, graph version, target and traversal
+    options. Saving a graph bumps the repository's graph version (see
+    RedisService.save_graph), so entries of earlier versions are never
+    read again: they leave the in-process tier when a newer version is seen and
+    expire from Redis after their TTL.
+
+    The in-process tier is an LRU bounded by the JSON size of its bundles; the
+    Redis tier is shared by every worker and keeps bundles for `ttl` seconds.
+    Bundles larger than `max_entry_bytes` are not cached. Cached bundles are
+    shared between requests and must not be modified.
+    """
+
+    def __init__(
+        self,
+        storage: Optional[Storage] = None,
+        max_bytes: int = BUNDLE_CACHE_MAX_BYTES,
+        ttl: int = BUNDLE_CACHE_TTL,
+        max_entry_bytes: int = BUNDLE_CACHE_MAX_ENTRY_BYTES,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            storage (Optional[Storage]): Shared storage of the Redis tier; in-process only if None.
+            max_bytes (int): Size of the in-process tier in JSON bytes, 0 to disable it.
+            ttl (int): Seconds a bundle stays cached; 0 disables the Redis tier and keeps
+                in-process entries until they are evicted.
+            max_entry_bytes (int): Largest bundle cached, in JSON bytes.
+        """
+        self.storage = storage
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        # key -> (bundle, size, expiry time), least recently used first
+        self._entries: "OrderedDict[BundleKey, Tuple[Dict[str, str], int, float]]" = OrderedDict()
+        self._size = 0
+        self._versions: Dict[str, int] = {}
+
+    @staticmethod
+    def _redis_key(key: BundleKey) -> str:
+        repo_id, version, target_file, direction, max_depth = key
+        depth = "all" if max_depth is None else max_depth
+        return f"bundle_cache:{repo_id}:v{version}:{direction}:{depth}:{target_file}"
+
+    async def get(self, key: BundleKey) -> Optional[Dict[str, str]]:
+        """
+        Return a cached bundle, from the in-process tier first, or None.
+        """
+        self._observe_version(key)
+        entry = self._entries.get(key)
+        if entry is not None and entry[2] > time.monotonic():
+            self._entries.move_to_end(key)
+            BUNDLE_CACHE_REQUESTS.inc(tier="local", result="hit")
+            return entry[0]
+        if entry is not None:
+            self._evict(key)
+        BUNDLE_CACHE_REQUESTS.inc(tier="local", result="miss")
+
+        if self.storage is None or not self.ttl:
+            return None
+        data = await self.storage.get_text(self._redis_key(key))
+        if data is None:
+            BUNDLE_CACHE_REQUESTS.inc(tier="redis", result="miss")
+            return None
+        BUNDLE_CACHE_REQUESTS.inc(tier="redis", result="hit")
+        bundle = json.loads(data)
+        self._store_local(key, bundle, len(data))
+        return bundle
+
+    async def set(self, key: BundleKey, bundle: Dict[str, str]):
+        """
+        Cache a bundle in both tiers, unless it is larger than `max_entry_bytes`.
+        """
+        data = json.dumps(bundle)
+        if len(data) > self.max_entry_bytes:
+            logger.debug("Bundle of %s is %d bytes, not cached.", key[2], len(data))
+            return
+        self._store_local(key, bundle, len(data))
+        if self.storage is not None and self.ttl:
+            await self.storage.set_text(self._redis_key(key), data, ttl=self.ttl)
+
+    def _observe_version(self, key: BundleKey):
+        """
+        Drop the in-process entries of a repository once a newer graph version is requested.
+        """
+        repo_id, version = key[0], key[1]
+        latest = self._versions.get(repo_id)
+        if latest is not None and version <= latest:
+            return
+        self._versions[repo_id] = version
+        if latest is not None:
+            for stale in [entry for entry in self._entries if entry[0] == repo_id and entry[1] < version]:
+                self._evict(stale)
+
+    def _store_local(self, key: BundleKey, bundle: Dict[str, str], size: int):
+        if not self.max_bytes or size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._evict(key)
+        self._entries[key] = (bundle, size, time.monotonic() + (self.ttl or float("inf")))
+        self._size += size
+        while self._size > self.max_bytes:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key: BundleKey):
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
@@ -1,68 +1,245 @@
-from typing import Dict, List
-from app.infrastructure.redis_client import RedisClient
+from collections import deque
+from typing import AsyncIterator, Dict, List, Mapping, Optional, Tuple
+from app.config.settings import BUNDLE_STREAM_BATCH_SIZE, BUNDLE_STREAM_MAX_BYTES
+from app.infrastructure.storage import Storage
+from app.services.bundle_cache import BundleCache, BundleKey
+from app.services.graph_query_service import GraphQueryService
+from app.services.redis_service import RedisService
 
 class BundleService:
-    def __init__(self, repo_id: str, redis_client: RedisClient):
+    DIRECTIONS = {
+        "both": ("Depends On", "Used By"),
+        "dependencies": ("Depends On",),
+        "dependents": ("Used By",),
+    }
+
+    def __init__(self, repo_id: str, storage: Storage, cache: Optional[BundleCache] = None):
         """
-        Initialize the BundleService with a repository ID and Redis client.
+        Initialize the BundleService with a repository ID and storage.
+
+        Args:
+            repo_id (str): Repository to build bundles from.
+            storage (Storage): Shared storage backend.
+            cache (Optional[BundleCache]): Cache of generated bundles; every bundle is built if None.
         """
         self.repo_id = repo_id
-        self.redis_client = redis_client
+        self.storage = storage
+        self.redis_service = RedisService(storage)
+        self.cache = cache
+        self._graph_version: Optional[int] = None
+
+    async def bundle_key(self, target_file: str, direction: str = "both", max_depth: Optional[int] = None) -> BundleKey:
+        """
+        Return the cache key of a bundle. The graph version is read once per service instance.
+        """
+        if self._graph_version is None:
+            self._graph_version = await self.redis_service.get_graph_version(self.repo_id)
+        return self.repo_id, self._graph_version, target_file, direction, max_depth
 
-    def get_all_related_files(self, dependency_graph: Dict[str, Dict[str, List[str]]], target_file: str) -> set:
+    def get_all_related_files(
+        self,
+        dependency_graph: Mapping[str, Dict[str, List[str]]],
+        target_file: str,
+        edge_kinds: Tuple[str, ...] = ("Depends On", "Used By"),
+        max_depth: Optional[int] = None,
+    ) -> set:
         """
-        Get all related files (Depends On + Used By) for the target file.
+        Get all related files (Depends On + Used By by default) for the target file.
         """
         if target_file not in dependency_graph:
             raise ValueError(f"Target file {target_file} not found in the dependency graph.")
 
         related_files = set()
-        queue = [target_file]
+        queue = deque([(target_file, 0)])
 
         while queue:
-            current_file = queue.pop(0)
-            if current_file in dependency_graph:
-                depends_on = dependency_graph[current_file].get("Depends On", [])
-                used_by = dependency_graph[current_file].get("Used By", [])
-                all_related = depends_on + used_by
-
-                for related_file in all_related:
+            current_file, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            edges = dependency_graph.get(current_file, {})
+            for key in edge_kinds:
+                for related_file in edges.get(key, []):
                     if related_file not in related_files:
-                        queue.append(related_file)
+                        related_files.add(related_file)
+                        queue.append((related_file, depth + 1))
+
+        return related_files
 
-                related_files.update(all_related)
+    async def fetch_related_files(self, target_file: str, direction: str = "both", max_depth: Optional[int] = None) -> set:
+        """
+        Get the related files of the target file, optionally limited by edge direction and depth.
+
+        Unlimited "both" queries are answered from the precomputed component index
+        in two lookups. Other queries walk the adjacency hash breadth-first, one
+        HMGET per level, when the map is stored as JSON. Otherwise they walk the
+        graph of the repository's graph index, which is decoded once per graph
+        version and kept in memory (see GraphQueryService).
+
+        Args:
+            target_file (str): File to build the bundle around.
+            direction (str): "both", "dependencies" (Depends On) or "dependents" (Used By).
+            max_depth (Optional[int]): Maximum number of edges from the target; unlimited if None.
+        """
+        if direction not in self.DIRECTIONS:
+            raise ValueError(f"Unsupported direction: {direction}")
+        edge_kinds = self.DIRECTIONS[direction]
+
+        if direction == "both" and max_depth is None:
+            component = await self.redis_service.get_component(self.repo_id, target_file)
+            if component is not None:
+                return set(component)
+
+        if not await self.redis_service.has_adjacency(self.repo_id):
+            graph_index = await GraphQueryService(self.repo_id, self.storage).get_index()
+            return self.get_all_related_files(graph_index.graph, target_file, edge_kinds, max_depth)
+
+        adjacency = await self.redis_service.get_adjacency(self.repo_id, [target_file])
+        if adjacency[target_file] is None:
+            raise ValueError(f"Target file {target_file} not found in the dependency graph.")
+
+        related_files = set()
+        depth = 0
+        while max_depth is None or depth < max_depth:
+            frontier = []
+            for edges in adjacency.values():
+                for key in edge_kinds:
+                    for related_file in (edges or {}).get(key, []):
+                        if related_file not in related_files:
+                            related_files.add(related_file)
+                            frontier.append(related_file)
+            depth += 1
+            if not frontier or (max_depth is not None and depth >= max_depth):
+                break
+            adjacency = await self.redis_service.get_adjacency(self.repo_id, frontier)
 
         return related_files
 
-    def generate_bundle(self, target_file: str) -> Dict[str, str]:
+    async def generate_bundle(
+        self, target_file: str, direction: str = "both", max_depth: Optional[int] = None
+    ) -> Dict[str, str]:
         """
         Generate a bundle for the target file using the dependency graph from Redis.
+
+        With a cache, bundles already built for the current graph version are
+        returned without traversing the graph or reading any content.
         """
-        # Fetch the dependency map from Redis
-        dependency_graph = self.redis_client.get_data(f"dependency_map:{self.repo_id}")
-        if not dependency_graph:
-            raise ValueError(f"Dependency map for repo '{self.repo_id}' not found in Redis.")
+        key = None
+        if self.cache is not None:
+            key = await self.bundle_key(target_file, direction, max_depth)
+            bundle = await self.cache.get(key)
+            if bundle is not None:
+                return bundle
 
         # Get all related files for the target file
-        related_files = self.get_all_related_files(dependency_graph, target_file)
+        related_files = await self.fetch_related_files(target_file, direction, max_depth)
         related_files.add(target_file)
 
-        # Fetch file contents for the bundle
-        bundle = {}
-        for file in sorted(related_files):
-            file_content = self.redis_client.get_data(f"file_content:{self.repo_id}:{file}")
-            bundle[file] = file_content if file_content else f"Error: Content for {file} not found."
-
+        # Fetch file contents for the bundle in one pipelined MGET
+        contents = await self.redis_service.get_file_contents(self.repo_id, sorted(related_files))
+        bundle = {
+            file: file_content if file_content else f"Error: Content for {file} not found."
+            for file, file_content in contents.items()
+        }
+        if key is not None:
+            await self.cache.set(key, bundle)
         return bundle
 
-    def generate_bundle_for_ui(self, target_file: str) -> Dict[str, Dict[str, str]]:
+    async def generate_bundle_for_ui(
+        self, target_file: str, direction: str = "both", max_depth: Optional[int] = None
+    ) -> Dict[str, Dict[str, str]]:
         """
         Generate a bundle with metadata for UI display, including file content and related files.
         """
-        bundle = self.generate_bundle(target_file)
+        bundle = await self.generate_bundle(target_file, direction, max_depth)
         metadata = {
             "target_file": target_file,
             "related_files": list(bundle.keys()),
             "file_contents": bundle,
         }
         return metadata
+
+    async def stream_bundle(
+        self,
+        target_file: str,
+        direction: str = "both",
+        max_depth: Optional[int] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        batch_size: int = BUNDLE_STREAM_BATCH_SIZE,
+    ) -> AsyncIterator[Dict]:
+        """
+        Prepare a bundle streamed as records instead of one dict holding every file.
+
+        The related files are looked up before this returns, so unknown targets
+        raise here rather than mid-stream. The returned iterator then yields:
+
+        - a "metadata" record with the target, the total number of files and
+          the paths of the requested page;
+        - a "file" record per file in path order, with its content read from
+          Redis `batch_size` files at a time;
+        - an "end" record with the files and content bytes sent and the
+          `next_offset` to request, or None once the bundle is complete.
+
+        Args:
+            target_file (str): File to build the bundle around.
+            direction (str): "both", "dependencies" (Depends On) or "dependents" (Used By).
+            max_depth (Optional[int]): Maximum number of edges from the target; unlimited if None.
+            offset (int): Index of the first file to send, in path order.
+            limit (Optional[int]): Maximum number of files to send; the rest of the bundle if None.
+            max_bytes (Optional[int]): Content bytes after which the page ends (BUNDLE_STREAM_MAX_BYTES
+                if None, 0 for no budget). At least one file is always sent so paging makes progress.
+            batch_size (int): Number of files read from Redis per round trip.
+
+        Returns:
+            AsyncIterator[Dict]: The bundle records.
+        """
+        related_files = await self.fetch_related_files(target_file, direction, max_depth)
+        related_files.add(target_file)
+        files = sorted(related_files)
+        page = files[offset:] if limit is None else files[offset:offset + limit]
+        budget = BUNDLE_STREAM_MAX_BYTES if max_bytes is None else max_bytes
+
+        async def records():
+            yield {
+                "type": "metadata",
+                "target_file": target_file,
+                "direction": direction,
+                "max_depth": max_depth,
+                "total_files": len(files),
+                "offset": offset,
+                "related_files": page,
+            }
+
+            sent = sent_bytes = 0
+            exhausted = False
+            for start in range(0, len(page), batch_size):
+                batch = page[start:start + batch_size]
+                contents = await self.redis_service.get_file_contents(self.repo_id, batch)
+                for file in batch:
+                    content = contents[file]
+                    size = 0 if not content else len(content) if content.isascii() else len(content.encode("utf-8"))
+                    if budget and sent and sent_bytes + size > budget:
+                        exhausted = True
+                        break
+                    yield {
+                        "type": "file",
+                        "path": file,
+                        "content": content if content else f"Error: Content for {file} not found.",
+                        "missing": not content,
+                    }
+                    sent += 1
+                    sent_bytes += size
+                if exhausted:
+                    break
+
+            next_offset = offset + sent
+            yield {
+                "type": "end",
+                "files_sent": sent,
+                "bytes_sent": sent_bytes,
+                "truncated": exhausted,
+                "next_offset": next_offset if next_offset < len(files) else None,
+            }
+
+        return records()
@@ -1,44 +1,62 @@
 import os
 import json
-from typing import Dict, List
-import networkx as nx
-from networkx.readwrite import json_graph
-from app.infrastructure.redis_client import RedisClient
-from app.utils.parsing_utils import PythonParser, DotNetParser, JavaScriptParser, CppParser, JavaParser
-
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+from app.infrastructure.storage import Storage
+from app.services.redis_service import RedisService
+from app.utils.compact_graph import CompactGraph, GraphIndex
+from app.utils.metrics import FUZZY_MATCH_CALLS, UNRESOLVED_IMPORTS, stage_timer
+from app.utils.namespace_resolver import NamespaceResolver
+from app.utils.parallel_parsing import parse_files
+from app.utils.parsing_utils import PARSERS
+from app.utils.path_resolver import PathResolver, TsConfig
+
+logger = logging.getLogger(__name__)
 
 class DependencyAnalyzer:
     """
     Analyze dependencies for multi-language repositories.
     """
 
-    PARSERS = {
-        ".py": PythonParser(),
-        ".cs": DotNetParser(),
-        ".js": JavaScriptParser(),
-        ".ts": JavaScriptParser(),
-        ".tsx": JavaScriptParser(),
-        ".cpp": CppParser(),
-        ".h": CppParser(),
-        ".java": JavaParser(),
-    }
+    PARSERS = PARSERS
 
-    def __init__(self, files: Dict[str, str], valid_files: List[str]):
+    def __init__(
+        self,
+        files: Dict[str, str],
+        valid_files: List[str],
+        executor: Optional[Executor] = None,
+        progress: Optional[Dict] = None,
+        ts_configs: Optional[Dict[str, TsConfig]] = None,
+    ):
         """
         Initialize the DependencyAnalyzer with a dictionary of files and valid files.
 
         Args:
             files (Dict[str, str]): A dictionary of file paths and their content.
             valid_files (List[str]): A list of valid file paths in the repository.
+            executor (Optional[Executor]): Process pool used to parse large repositories.
+            progress (Optional[Dict]): Dict whose "files_resolved" count is kept up to date.
+            ts_configs (Optional[Dict[str, TsConfig]]): JS/TS resolution options keyed by directory.
+
+        Stage durations (parse, resolve, graph_build, export) are recorded in the
+        stage metrics and accumulated in `self.timings`.
         """
         self.files = files
         self.valid_files = valid_files
+        self.executor = executor
+        self.progress = progress if progress is not None else {}
+        self.progress["files_resolved"] = 0
+        self.timings: Dict[str, float] = {}
         self.raw_dependencies = {}      # Stores raw dependencies from parsers
         self.resolved_dependencies = {} # Stores resolved dependencies after mapping
-        self.graph = nx.DiGraph()
+        self.graph = CompactGraph()
 
         # Create a mapping of valid namespaces or file stems for matching
         self.namespace_mapping = self._build_namespace_mapping()
+        self.resolver = NamespaceResolver(self.namespace_mapping)
+        self.path_resolver = PathResolver(valid_files, ts_configs)
 
     def _build_namespace_mapping(self) -> Dict[str, str]:
         """
@@ -68,7 +86,7 @@ class DependencyAnalyzer:
         """
         Parse dependencies for all files and resolve them into a unified structure.
         """
-        print("Starting dependency analysis...")
+        logger.info("Starting dependency analysis...")
 
         # Step 1: Parse raw dependencies for all files
         self._parse_dependencies()
@@ -82,70 +100,123 @@ class DependencyAnalyzer:
     def _parse_dependencies(self):
         """
         Parse raw dependencies for all files using appropriate parsers.
-        """
-        for file_path, content in self.files.items():
-            ext = f".{file_path.split('.')[-1]}"
-            parser = self.PARSERS.get(ext)
-            if not parser:
-                print(f"Skipping unsupported file: {file_path}")
-                continue
 
-            try:
-                print(f"Parsing dependencies for: {file_path}")
-                self.raw_dependencies[file_path] = parser.parse(content)
-            except Exception as e:
-                print(f"Error parsing {file_path}: {e}")
-                self.raw_dependencies[file_path] = []
+        Files whose raw dependencies are already known are skipped. The rest are
+        parsed in chunks on a process pool once there are more than
+        PARSE_PARALLEL_THRESHOLD of them; smaller inputs are parsed serially.
+        """
+        files = {path: content for path, content in self.files.items() if path not in self.raw_dependencies}
+        if not files:
+            return
+        logger.info("Parsing dependencies for %d files...", len(files))
+        self.raw_dependencies.update(parse_files(files, executor=self.executor, timings=self.timings))
 
     def resolve_dependencies(self):
         """
         Resolve raw dependencies into actual file paths using namespace mapping.
         """
-        print("Resolving dependencies...")
-
-        for file_path, dependencies in self.raw_dependencies.items():
-            resolved = []
+        logger.info("Resolving dependencies...")
+        self._resolve_all(self.raw_dependencies)
 
-            for dependency in dependencies:
-                resolved_path = self._resolve_dependency(dependency)
-                if resolved_path:
-                    resolved.append(resolved_path)
-                else:
-                    print(f"Unresolved dependency in {file_path}: {dependency}")
-
-            self.resolved_dependencies[file_path] = resolved
-
-    def _resolve_dependency(self, dependency: str) -> str:
+    def _resolve_all(self, raw_dependencies: Dict[str, List[str]]):
+        """
+        Resolve many files as one timed stage, counting fuzzy matcher calls.
+        """
+        fuzzy_calls = self.resolver.fuzzy_calls
+        with stage_timer("resolve", self.timings):
+            for file_path, dependencies in raw_dependencies.items():
+                self.resolved_dependencies[file_path] = self._resolve_file(file_path, dependencies)
+                self.progress["files_resolved"] += 1
+        FUZZY_MATCH_CALLS.inc(self.resolver.fuzzy_calls - fuzzy_calls)
+
+    def _resolve_file(self, file_path: str, dependencies: List[str]) -> List[str]:
+        """
+        Resolve the raw dependencies of a single file.
         """
-        Resolve a dependency to a file path using precomputed mappings and fuzzy matching.
+        resolved = []
+        unresolved = 0
+
+        for dependency in dependencies:
+            resolved_path = self._resolve_dependency(dependency, file_path)
+            if resolved_path:
+                resolved.append(resolved_path)
+            else:
+                unresolved += 1
+                logger.debug("Unresolved dependency in %s: %s", file_path, dependency)
+
+        if unresolved:
+            UNRESOLVED_IMPORTS.inc(unresolved)
+        return resolved
+
+    def _resolve_dependency(self, dependency: str, importer: Optional[str] = None) -> str:
+        """
+        Resolve a dependency to a file path.
+
+        Path-based imports (relative Python imports, JS/TS specifiers, C++
+        includes) are resolved against the importing file; namespaces and bare
+        specifiers use the precomputed mappings and indexed fuzzy matching.
 
         Args:
             dependency (str): The raw dependency string.
+            importer (Optional[str]): Path of the file declaring the dependency.
 
         Returns:
             str: The resolved file path or None if not found.
         """
-        # Attempt exact match
-        if dependency in self.namespace_mapping:
-            return self.namespace_mapping[dependency]
-
-        # Fuzzy matching using difflib
-        from difflib import get_close_matches
-        candidates = get_close_matches(dependency, self.namespace_mapping.keys())
-        if candidates:
-            return self.namespace_mapping[candidates[0]]
-
-        # No match found
-        return None
+        if importer:
+            resolved, path_based = self.path_resolver.resolve(dependency, importer)
+            if path_based:
+                return resolved
+        return self.resolver.resolve(dependency)
 
     def build_graph(self):
         """
         Build the dependency graph using resolved dependencies.
         """
-        print("Building dependency graph...")
-        for file_path, resolved_deps in self.resolved_dependencies.items():
-            for dep in resolved_deps:
-                self.graph.add_edge(file_path, dep)
+        logger.info("Building dependency graph...")
+        with stage_timer("graph_build", self.timings):
+            self.graph = CompactGraph.from_dependencies(self.resolved_dependencies)
+
+    def load_previous(self, resolved_dependencies: Dict[str, List[str]]):
+        """
+        Seed the analyzer with the resolved dependencies of a previous run.
+
+        Args:
+            resolved_dependencies (Dict[str, List[str]]): Resolved dependencies keyed by file path.
+        """
+        self.resolved_dependencies = dict(resolved_dependencies)
+        self.build_graph()
+
+    def update(
+        self,
+        changed_dependencies: Dict[str, List[str]],
+        removed_files: List[str],
+        unchanged_dependencies: Optional[Dict[str, List[str]]] = None,
+    ):
+        """
+        Incrementally apply a reload on top of `load_previous`.
+
+        Removed files are dropped and only files whose dependencies are new or
+        modified are re-resolved; the compact graph is then rebuilt from the
+        resolved dependencies in a single linear pass. When the set of files
+        changed, the namespace mapping did too, so `unchanged_dependencies` (the
+        cached raw dependencies of untouched files) must be passed to re-resolve them.
+
+        Args:
+            changed_dependencies (Dict[str, List[str]]): Raw dependencies of new or modified files.
+            removed_files (List[str]): Files that no longer exist.
+            unchanged_dependencies (Optional[Dict[str, List[str]]]): Raw dependencies of untouched files.
+        """
+        logger.info("Updating dependency graph...")
+        for file_path in removed_files:
+            self.resolved_dependencies.pop(file_path, None)
+
+        to_resolve = dict(unchanged_dependencies or {})
+        to_resolve.update(changed_dependencies)
+        self.raw_dependencies.update(to_resolve)
+
+        self._resolve_all(to_resolve)
+        self.build_graph()
 
     def export_graph(self) -> Dict[str, Dict[str, List[str]]]:
         """
@@ -154,46 +225,75 @@ class DependencyAnalyzer:
         Returns:
             Dict[str, Dict[str, List[str]]]: A structured representation of dependencies.
         """
-        output = {}
-
-        for node in self.graph.nodes:
-            # Initialize the node entry
-            output[node] = {}
+        with stage_timer("export", self.timings):
+            return self.graph.to_dependency_map()
 
-            # Collect outgoing edges (dependencies)
-            depends_on = list(self.graph.successors(node))
-            if depends_on:
-                output[node]["Depends On"] = depends_on
+    def export_components(self) -> List[List[str]]:
+        """
+        Export the weakly connected components of the dependency graph.
 
-            # Collect incoming edges (files using this file)
-            used_by = list(self.graph.predecessors(node))
-            if used_by:
-                output[node]["Used By"] = used_by
+        A bundle follows both "Depends On" and "Used By" edges, so it is exactly
+        the weakly connected component of its target; computing them once here
+        turns bundle requests into lookups.
 
-        return output
+        Returns:
+            List[List[str]]: Sorted members of each component, largest component first.
+        """
+        components = [sorted(component) for component in self.graph.weakly_connected_components()]
+        components.sort(key=lambda members: (-len(members), members[0]))
+        return components
 
+    def export_graph_index(self) -> GraphIndex:
+        """
+        Compute the strongly connected components of the dependency graph and
+        its condensation, which answer impact, cycle and path queries.
 
-async def analyze_and_export_dependencies(files: dict, valid_files: list, repo_id: str) -> Dict[str, Dict[str, List[str]]]:
+        Returns:
+            GraphIndex: The indexed graph.
+        """
+        with stage_timer("condense", self.timings):
+            return GraphIndex.build(self.graph)
+
+
+async def analyze_and_export_dependencies(
+    files: dict,
+    valid_files: list,
+    repo_id: str,
+    storage: Storage,
+    executor: Optional[Executor] = None,
+    raw_dependencies: Optional[Dict[str, List[str]]] = None,
+) -> Dict[str, Dict[str, List[str]]]:
     """
     Analyze dependencies and store the dependency graph in Redis.
 
+    The analysis runs in a worker thread so the event loop keeps serving other
+    requests; parsing itself fans out to `executor` for large repositories.
+
     Args:
         files (dict): Dictionary of file paths and their content.
         valid_files (list): List of valid file paths.
         repo_id (str): Unique identifier for the repository.
+        storage (Storage): Shared storage backend used to store the graph.
+        executor (Optional[Executor]): Shared process pool for parsing.
+        raw_dependencies (Optional[Dict[str, List[str]]]): Dependencies already parsed
+            upstream; these files are not parsed again.
 
     Returns:
         dict: The dependency graph.
     """
-    print("Analyzing dependencies...")
-    analyzer = DependencyAnalyzer(files, valid_files)
-    analyzer.analyze()
+    logger.info("Analyzing dependencies...")
+    analyzer = DependencyAnalyzer(files, valid_files, executor=executor)
+    if raw_dependencies:
+        analyzer.raw_dependencies.update(raw_dependencies)
+    await asyncio.to_thread(analyzer.analyze)
 
-    dependency_graph = analyzer.export_graph()
+    dependency_graph = await asyncio.to_thread(analyzer.export_graph)
+    components = await asyncio.to_thread(analyzer.export_components)
+    graph_index = await asyncio.to_thread(analyzer.export_graph_index)
 
     # Save to Redis
-    redis_client = RedisClient()
-    redis_client.set_data(f"dependency_map:{repo_id}", dependency_graph)
+    redis_service = RedisService(storage)
+    await redis_service.save_graph(repo_id, dependency_graph, components, graph_index)
 
-    print(f"Dependency graph saved to Redis under 'dependency_map:{repo_id}'.")
+    logger.info("Dependency graph saved to Redis under 'dependency_map:%s'.", repo_id)
     return dependency_graph
\ No newline at end of file
@@ -1,6 +1,13 @@
-from typing import List, Dict
+from typing import AsyncIterator, Callable, List, Dict, Tuple
 import asyncio
+import logging
+from app.config.settings import ARCHIVE_BUFFER_CHUNKS
 from app.infrastructure.github_client import GitHubClient
+from app.utils.archive_utils import ChunkReader, iter_archive_files
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
 
 
 class GitHubService:
@@ -24,29 +31,67 @@ class GitHubService:
         """
         Fetch the content of a specific file in the repository.
         """
-        url = f"https://raw.githubusercontent.com/{owner}/{repo}/{branch}/{path}"
+        url = f"{self.client.RAW_BASE_URL}/{owner}/{repo}/{branch}/{path}"
         return await self.client.fetch_raw(url)
 
-    async def fetch_all_file_contents(self, owner: str, repo: str, file_paths: List[str], branch: str = "main") -> Dict[str, str]:
+    async def stream_archive_files(
+        self, owner: str, repo: str, wanted: Callable[[str], bool], branch: str = "main"
+    ) -> AsyncIterator[Tuple[str, str]]:
         """
-        Fetch contents of all files concurrently.
+        Download the tarball of a ref once and yield the selected files as they are extracted.
+
+        The archive is streamed: downloaded chunks go through a small bounded queue to a
+        worker thread that decompresses and walks the tar, so neither the archive nor
+        its unpacked contents are ever held whole in memory or written to disk.
 
         Args:
             owner (str): Repository owner.
             repo (str): Repository name.
-            file_paths (List[str]): List of file paths to fetch.
-            branch (str): Branch to fetch from.
+            wanted (Callable[[str], bool]): Predicate selecting the paths to extract.
+            branch (str): Branch or ref to download.
 
-        Returns:
-            Dict[str, str]: A dictionary where keys are file paths and values are file contents.
+        Yields:
+            Tuple[str, str]: File path and decoded content.
         """
-        async def fetch_content(path):
+        url = f"{self.client.BASE_URL}/repos/{owner}/{repo}/tarball/{branch}"
+        loop = asyncio.get_running_loop()
+        chunks = asyncio.Queue(maxsize=ARCHIVE_BUFFER_CHUNKS)
+        files = asyncio.Queue(maxsize=ARCHIVE_BUFFER_CHUNKS)
+        closing = False
+
+        async def download():
             try:
-                return path, await self.fetch_file_content(owner, repo, path, branch)
+                async for chunk in self.client.stream(url):
+                    await chunks.put(chunk)
+                await chunks.put(b"")
             except Exception as e:
-                print(f"Failed to fetch {path}: {e}")
-                return path, None
+                await chunks.put(e)
+
+        def put_file(item):
+            if not closing:
+                asyncio.run_coroutine_threadsafe(files.put(item), loop).result()
+
+        def extract():
+            try:
+                for path, data in iter_archive_files(ChunkReader(chunks, loop), wanted):
+                    put_file((path, data.decode("utf-8", errors="replace")))
+            finally:
+                put_file(_DONE)
 
-        tasks = [fetch_content(path) for path in file_paths]
-        results = await asyncio.gather(*tasks)
-        return {path: content for path, content in results if content}
+        download_task = asyncio.create_task(download())
+        extract_future = loop.run_in_executor(None, extract)
+        try:
+            while (item := await files.get()) is not _DONE:
+                yield item
+            await extract_future
+        finally:
+            closing = True
+            download_task.cancel()
+            while not extract_future.done():
+                # Unblock the extraction thread: empty both queues and signal end of stream
+                for queue in (files, chunks):
+                    while not queue.empty():
+                        queue.get_nowait()
+                chunks.put_nowait(b"")
+                await asyncio.sleep(0.01)
+            await asyncio.gather(download_task, extract_future, return_exceptions=True)
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from app.config.settings import GRAPH_INDEX_CACHE_SIZE
+from app.infrastructure.storage import Storage
+from app.services.redis_service import RedisService
+from app.utils.compact_graph import CompactGraph, GraphIndex
+
+logger = logging.getLogger(__name__)
+
+
+class GraphQueryService:
+    """
+    Impact, cycle and path queries over the graph index computed at analysis time.
+
+    The index of a repository is read and decoded once per graph version, then
+    shared by every instance in the process, so a query costs one version read
+    and a walk of the condensation in memory.
+    """
+
+    INDEX_CACHE_SIZE = GRAPH_INDEX_CACHE_SIZE
+    # (repo_id, graph version) -> index, least recently used first
+    _index_cache: "OrderedDict[Tuple[str, int], GraphIndex]" = OrderedDict()
+
+    def __init__(self, repo_id: str, storage: Storage):
+        """
+        Initialize the GraphQueryService with a repository ID and storage.
+
+        Args:
+            repo_id (str): Repository to query.
+            storage (Storage): Shared storage backend.
+        """
+        self.repo_id = repo_id
+        self.redis_service = RedisService(storage)
+
+    async def get_index(self) -> GraphIndex:
+        """
+        Return the graph index of the repository's current graph version.
+
+        Repositories analyzed before indexes were stored have theirs computed
+        from the dependency map on first use.
+
+        Raises:
+            ValueError: If the repository has no dependency map.
+        """
+        version = await self.redis_service.get_graph_version(self.repo_id)
+        key = (self.repo_id, version)
+        cache = self._index_cache
+        if key in cache:
+            cache.move_to_end(key)
+            return cache[key]
+
+        graph_index = await self.redis_service.get_graph_index(self.repo_id)
+        if graph_index is None:
+            dependency_graph = await self.redis_service.get_dependency_graph(self.repo_id)
+            if not dependency_graph:
+                raise ValueError(f"Dependency map for repo '{self.repo_id}' not found in Redis.")
+            logger.info("No graph index stored for %s, computing it from the dependency map.", self.repo_id)
+            graph_index = await asyncio.to_thread(self._build_index, dependency_graph)
+
+        for cached_key in [cached_key for cached_key in cache if cached_key[0] == self.repo_id]:
+            del cache[cached_key]
+        cache[key] = graph_index
+        while len(cache) > self.INDEX_CACHE_SIZE:
+            cache.popitem(last=False)
+        return graph_index
+
+    @staticmethod
+    def _build_index(dependency_graph) -> GraphIndex:
+        if not isinstance(dependency_graph, CompactGraph):
+            dependency_graph = CompactGraph.from_dependencies(
+                {file_path: edges.get("Depends On", []) for file_path, edges in dependency_graph.items()}
+            )
+        return GraphIndex.build(dependency_graph)
+
+    async def dependents(self, file_path: str) -> List[str]:
+        """
+        Return the files depending on a file, directly or transitively.
+        """
+        return (await self.get_index()).dependents(file_path)
+
+    async def dependencies(self, file_path: str) -> List[str]:
+        """
+        Return the files a file depends on, directly or transitively.
+        """
+        return (await self.get_index()).dependencies(file_path)
+
+    async def cycles(self) -> List[List[str]]:
+        """
+        Return the circular dependencies of the repository, largest first.
+        """
+        return (await self.get_index()).cycles()
+
+    async def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        Return a shortest chain of dependencies from `source` to `target`, or None.
+        """
+        return (await self.get_index()).shortest_path(source, target)
@@ -0,0 +1,213 @@
+import asyncio
+import json
+import logging
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+from app.config.settings import JOB_HISTORY_SIZE, LOAD_WORKERS
+from app.utils.filtering import TreeFilter
+
+logger = logging.getLogger(__name__)
+
+
+class LoadJob:
+    """
+    A queued repository load and its progress.
+    """
+
+    def __init__(
+        self,
+        repo_id: str,
+        owner: str,
+        repo: str,
+        branch: str,
+        ingestion_mode: str = "raw",
+        tree_filter: Optional[TreeFilter] = None,
+    ):
+        self.job_id = uuid.uuid4().hex
+        self.repo_id = repo_id
+        self.owner = owner
+        self.repo = repo
+        self.branch = branch
+        self.ingestion_mode = ingestion_mode
+        self.tree_filter = tree_filter or TreeFilter()
+        self.status = "queued"
+        self.progress: Dict = {}
+        self.timings: Dict[str, float] = {}
+        self.failed_files: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    @property
+    def key(self) -> Tuple[str, str, str, str]:
+        """
+        Identity of the work: the ref and every option changing what is loaded.
+        """
+        return self.repo_id, self.branch, self.ingestion_mode, json.dumps(self.tree_filter.to_dict(), sort_keys=True)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "repo_id": self.repo_id,
+            "branch": self.branch,
+            "ingestion_mode": self.ingestion_mode,
+            "filter": self.tree_filter.to_dict(),
+            "status": self.status,
+            "progress": dict(self.progress),
+            "timings": dict(self.timings),
+            "failed_files": self.failed_files,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class JobQueue:
+    """
+    In-process queue running repository loads on a fixed pool of asyncio workers.
+
+    A load submitted while an identical one (same repo_id, branch, ingestion
+    mode and filter) is queued or running returns the existing job instead of
+    repeating the work. Loads of one repo_id share its graph and resolved
+    dependencies, so they run one at a time whatever the branch: a worker picking
+    a job whose repo_id is busy parks it until the running load finishes.
+    Finished jobs stay queryable until `history_size` newer ones have finished.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[LoadJob], Awaitable[None]],
+        worker_count: int = LOAD_WORKERS,
+        history_size: int = JOB_HISTORY_SIZE,
+    ):
+        """
+        Initialize the queue.
+
+        Args:
+            handler (Callable[[LoadJob], Awaitable[None]]): Coroutine running a job; it may update `job.progress`.
+            worker_count (int): Number of jobs run concurrently.
+            history_size (int): Number of finished jobs kept for status queries.
+        """
+        self.handler = handler
+        self.worker_count = worker_count
+        self.history_size = history_size
+        self.jobs: Dict[str, LoadJob] = {}
+        self._active: Dict[Tuple[str, str, str, str], LoadJob] = {}
+        self._running: Set[str] = set()
+        # repo_id -> jobs waiting for the running load of that repo_id, in submission order
+        self._waiting: Dict[str, Deque[LoadJob]] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+
+    def start(self):
+        """
+        Start the worker tasks; must be called from a running event loop.
+        """
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.worker_count)]
+
+    async def stop(self):
+        """
+        Cancel the workers. Jobs still queued or running are marked as failed.
+        """
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in list(self._active.values()):
+            self._finish(job, "failed", "Server shut down before the job finished.")
+
+    def submit(
+        self,
+        repo_id: str,
+        owner: str,
+        repo: str,
+        branch: str,
+        ingestion_mode: str = "raw",
+        tree_filter: Optional[TreeFilter] = None,
+    ) -> Tuple[LoadJob, bool]:
+        """
+        Enqueue a load, or return the active job for the same repo_id, branch,
+        ingestion mode and filter.
+
+        Returns:
+            Tuple[LoadJob, bool]: The job and whether it was newly created.
+        """
+        job = LoadJob(repo_id, owner, repo, branch, ingestion_mode, tree_filter)
+        if job.key in self._active:
+            return self._active[job.key], False
+
+        self.jobs[job.job_id] = job
+        self._active[job.key] = job
+        self._queue.put_nowait(job)
+        return job, True
+
+    def get(self, job_id: str) -> LoadJob:
+        """
+        Look up a job by ID.
+
+        Raises:
+            ValueError: If the job is unknown or has been evicted.
+        """
+        if job_id not in self.jobs:
+            raise ValueError(f"Job {job_id} not found.")
+        return self.jobs[job_id]
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            if job.repo_id in self._running:
+                self._waiting.setdefault(job.repo_id, deque()).append(job)
+                continue
+            repo_id = job.repo_id
+            self._running.add(repo_id)
+            try:
+                # Keep the repo_id and run its parked jobs in submission order
+                while job is not None:
+                    await self._run(job)
+                    job = self._next_waiting(repo_id)
+            finally:
+                self._running.discard(repo_id)
+
+    async def _run(self, job: LoadJob):
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            await self.handler(job)
+        except asyncio.CancelledError:
+            self._finish(job, "failed", "Job cancelled.")
+            raise
+        except Exception as e:
+            logger.exception("Load job %s for %s failed", job.job_id, job.repo_id)
+            self._finish(job, "failed", str(e) or type(e).__name__)
+        else:
+            self._finish(job, "completed")
+
+    def _next_waiting(self, repo_id: str) -> Optional[LoadJob]:
+        waiting = self._waiting.get(repo_id)
+        if not waiting:
+            return None
+        job = waiting.popleft()
+        if not waiting:
+            del self._waiting[repo_id]
+        return job
+
+    def _finish(self, job: LoadJob, status: str, error: Optional[str] = None):
+        job.status = status
+        job.error = error
+        job.finished_at = time.time()
+        if self._active.get(job.key) is job:
+            del self._active[job.key]
+
+        self._finished[job.job_id] = None
+        while len(self._finished) > self.history_size:
+            evicted, _ = self._finished.popitem(last=False)
+            self.jobs.pop(evicted, None)
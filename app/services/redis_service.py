@@ -1,17 +1,402 @@
-from app.infrastructure.redis_client import RedisClient
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Mapping, Optional
+from app.config.settings import (
+    BLOB_COMPRESSION,
+    BLOB_DICTIONARY_MIN_SAMPLES,
+    BLOB_DICTIONARY_SIZE,
+    BLOB_GC_GRACE_SECONDS,
+    DEPENDENCY_MAP_COMPRESSION,
+    DEPENDENCY_MAP_FORMAT,
+)
+from app.infrastructure.storage import Storage
+from app.utils.blob_codec import decode_blobs, dictionary_id, dictionary_ids, encode_blobs, train_dictionary
+from app.utils.compact_graph import GraphIndex
+from app.utils.graph_codec import decode_graph_index, encode_dependency_map, encode_graph_index, load_dependency_map
+from app.utils.metrics import BLOBS_COLLECTED
+from app.utils.parsing_utils import PARSER_VERSION
+from app.utils.path_resolver import RESOLVER_VERSION
 
 class RedisService:
-    def __init__(self, redis_client: RedisClient):
-        self.redis_client = redis_client
+    MAP_FORMATS = ("binary", "json")
+    # Compression dictionaries are immutable and content-addressed, so every
+    # instance shares the ones already read
+    DICTIONARY_CACHE_SIZE = 64
+    _dictionary_cache: "OrderedDict[int, bytes]" = OrderedDict()
 
-    def save_file_content(self, repo_id: str, file_path: str, content: str):
-        self.redis_client.set_data(f"file_content:{repo_id}:{file_path}", content)
+    def __init__(
+        self,
+        storage: Storage,
+        map_format: str = DEPENDENCY_MAP_FORMAT,
+        map_compression: str = DEPENDENCY_MAP_COMPRESSION,
+        blob_compression: str = BLOB_COMPRESSION,
+    ):
+        if map_format not in self.MAP_FORMATS:
+            raise ValueError(f"Unsupported dependency map format: {map_format}")
+        self.storage = storage
+        self.map_format = map_format
+        self.map_compression = map_compression
+        self.blob_compression = blob_compression
+        self._repo_dictionaries: Dict[str, bytes] = {}
+        self._current_refs: Dict[str, str] = {}
 
-    def save_dependency_map(self, repo_id: str, dependency_map: dict):
-        self.redis_client.set_data(f"dependency_map:{repo_id}", dependency_map)
+    @staticmethod
+    def _blob_key(blob_sha: str) -> str:
+        return f"blob:{blob_sha}"
 
-    def get_dependency_map(self, repo_id: str):
-        return self.redis_client.get_data(f"dependency_map:{repo_id}")
+    @staticmethod
+    def _blob_refs_key(blob_sha: str) -> str:
+        return f"blob_refs:{blob_sha}"
 
-    def get_file_content(self, repo_id: str, file_path: str):
-        return self.redis_client.get_data(f"file_content:{repo_id}:{file_path}")
+    async def save_blobs(self, blobs: Dict[str, str], repo_id: Optional[str] = None):
+        """
+        Store file contents by git blob SHA with batched, pipelined MSETs.
+
+        Identical files of every repository and ref share one copy. Writing a
+        blob also postpones its garbage collection if it is unreferenced, so a
+        load has the grace period to reference the blobs it wrote.
+
+        Unless `blob_compression` is "none", contents are compressed (see
+        blob_codec) with the dictionary of `repo_id`, which is trained from the
+        first blobs saved for the repository.
+
+        Args:
+            blobs (Dict[str, str]): File contents keyed by blob SHA.
+            repo_id (Optional[str]): Repository the blobs were loaded for; compressed without a dictionary if None.
+        """
+        keys = {self._blob_key(sha): content for sha, content in blobs.items()}
+        if self.blob_compression == "none":
+            await self.storage.set_many_text(keys)
+        else:
+            dictionary = await self._repo_dictionary(repo_id, list(blobs.values())) if repo_id else None
+            encoded = await asyncio.to_thread(encode_blobs, keys, self.blob_compression, dictionary)
+            await self.storage.set_many_bytes(encoded)
+        await self.touch_blobs(list(blobs))
+
+    async def _repo_dictionary(self, repo_id: str, samples: List[str]) -> Optional[bytes]:
+        """
+        Return the compression dictionary of a repository, training it from
+        `samples` if it has none yet and there are enough of them.
+        """
+        if repo_id in self._repo_dictionaries:
+            return self._repo_dictionaries[repo_id]
+        stored_id = await self.storage.get_text(f"blob_dictionary:{repo_id}")
+        if stored_id:
+            dictionary_key = int(stored_id, 16)
+            dictionary = (await self._load_dictionaries({dictionary_key})).get(dictionary_key)
+        elif len(samples) >= BLOB_DICTIONARY_MIN_SAMPLES:
+            dictionary = await asyncio.to_thread(train_dictionary, samples, BLOB_DICTIONARY_SIZE, self.blob_compression)
+            if dictionary is not None:
+                # Dictionaries are kept forever: any blob compressed with one may outlive the repository
+                dictionary_key = dictionary_id(dictionary)
+                await self.storage.set_bytes(f"blob_dictionary_data:{dictionary_key:x}", dictionary)
+                await self.storage.set_text(f"blob_dictionary:{repo_id}", f"{dictionary_key:x}")
+        else:
+            dictionary = None
+        if dictionary is not None:
+            self._repo_dictionaries[repo_id] = dictionary
+        return dictionary
+
+    async def _load_dictionaries(self, dictionary_keys: Iterable[int]) -> Dict[int, bytes]:
+        """
+        Read compression dictionaries by ID, from the shared cache or in one MGET.
+        """
+        cache = self._dictionary_cache
+        dictionaries = {key: cache[key] for key in dictionary_keys if key in cache}
+        missing = [key for key in dictionary_keys if key not in dictionaries]
+        if missing:
+            values = await self.storage.get_many_bytes([f"blob_dictionary_data:{key:x}" for key in missing])
+            for key, value in zip(missing, values):
+                if value is not None:
+                    # Copied, as a mapped view would pin the storage file
+                    dictionaries[key] = cache[key] = bytes(value)
+        for key in dictionaries:
+            cache.move_to_end(key)
+        while len(cache) > self.DICTIONARY_CACHE_SIZE:
+            cache.popitem(last=False)
+        return dictionaries
+
+    async def touch_blobs(self, blob_shas: List[str]):
+        """
+        Restart the grace period of blobs awaiting garbage collection, e.g. before reusing them.
+        """
+        await self.storage.add_scored("blob_gc", {sha: time.time() for sha in blob_shas}, only_existing=True)
+
+    async def existing_blobs(self, blob_shas: List[str]) -> set:
+        """
+        Return which blobs are already stored.
+        """
+        found = await self.storage.exists_many([self._blob_key(sha) for sha in blob_shas])
+        return {sha for sha, exists in zip(blob_shas, found) if exists}
+
+    async def collect_garbage(self, grace: float = BLOB_GC_GRACE_SECONDS) -> int:
+        """
+        Delete the blobs no manifest has referenced for `grace` seconds.
+
+        Returns:
+            int: The number of blobs deleted.
+        """
+        candidates = await self.storage.get_scored_below("blob_gc", time.time() - grace)
+        if not candidates:
+            return 0
+        counts = await self.storage.get_many_text([self._blob_refs_key(sha) for sha in candidates])
+        unreferenced = [sha for sha, count in zip(candidates, counts) if not count or int(count) <= 0]
+        await self.storage.delete_many(
+            [self._blob_key(sha) for sha in unreferenced] + [self._blob_refs_key(sha) for sha in unreferenced]
+        )
+        await self.storage.remove_scored("blob_gc", candidates)
+        BLOBS_COLLECTED.inc(len(unreferenced))
+        return len(unreferenced)
+
+    async def save_dependency_map(self, repo_id: str, dependency_map: dict):
+        """
+        Store the dependency map.
+
+        In "binary" format the map is a single compact blob (see graph_codec). In
+        "json" format it is stored as JSON, plus a per-node adjacency hash so
+        bundle requests can read only the nodes they traverse. The graph version
+        is left to the caller (see save_graph). Encoding runs in a worker thread.
+        """
+        if self.map_format == "json":
+            await self.storage.set_text(f"dependency_map:{repo_id}", await asyncio.to_thread(json.dumps, dependency_map))
+            await self.storage.replace_hash(f"dependency_adjacency:{repo_id}", dependency_map)
+            return
+
+        encoded = await asyncio.to_thread(encode_dependency_map, dependency_map, self.map_compression)
+        await self.storage.set_bytes(f"dependency_map:{repo_id}", encoded)
+        await self.storage.delete_data(f"dependency_adjacency:{repo_id}")
+
+    async def save_graph(
+        self, repo_id: str, dependency_map: dict, components: List[List[str]], graph_index: GraphIndex
+    ) -> int:
+        """
+        Store the dependency map, its components and its graph index, then bump
+        the graph version once all of them are written, so nothing is cached
+        under a version describing only part of the new graph.
+
+        Returns:
+            int: The new graph version.
+        """
+        await self.save_dependency_map(repo_id, dependency_map)
+        await self.save_components(repo_id, components)
+        await self.save_graph_index(repo_id, graph_index)
+        return await self.bump_graph_version(repo_id)
+
+    async def bump_graph_version(self, repo_id: str) -> int:
+        """
+        Start a new graph version, which every bundle cache key includes.
+        """
+        return await self.storage.increment(f"graph_version:{repo_id}")
+
+    async def get_graph_version(self, repo_id: str) -> int:
+        """
+        Return the graph version of a repository, 0 if its map was never saved with one.
+        """
+        version = await self.storage.get_text(f"graph_version:{repo_id}")
+        return int(version) if version else 0
+
+    async def get_adjacency(self, repo_id: str, file_paths: List[str]) -> Dict[str, Optional[Dict[str, List[str]]]]:
+        """
+        Fetch the adjacency of several nodes in one round trip. Unknown nodes map to None.
+        """
+        edges = await self.storage.get_hash_fields(f"dependency_adjacency:{repo_id}", file_paths)
+        return dict(zip(file_paths, edges))
+
+    async def has_adjacency(self, repo_id: str) -> bool:
+        return await self.storage.exists(f"dependency_adjacency:{repo_id}")
+
+    async def save_components(self, repo_id: str, components: List[List[str]]):
+        """
+        Store weakly connected components: a node -> component ID index and the
+        members of each component. Both hashes are built in a worker thread.
+        """
+        index, members = await asyncio.to_thread(self._component_hashes, components)
+        await self.storage.replace_hash(f"component_index:{repo_id}", index)
+        await self.storage.replace_hash(f"component_members:{repo_id}", members)
+
+    @staticmethod
+    def _component_hashes(components: List[List[str]]):
+        index = {file_path: component_id for component_id, members in enumerate(components) for file_path in members}
+        return index, {str(component_id): members for component_id, members in enumerate(components)}
+
+    async def get_component(self, repo_id: str, file_path: str) -> Optional[List[str]]:
+        """
+        Return the members of the component containing a file, or None if it is not indexed.
+        """
+        [component_id] = await self.storage.get_hash_fields(f"component_index:{repo_id}", [file_path])
+        if component_id is None:
+            return None
+        [members] = await self.storage.get_hash_fields(f"component_members:{repo_id}", [str(component_id)])
+        return members
+
+    async def save_graph_index(self, repo_id: str, graph_index: GraphIndex):
+        """
+        Store the strongly connected components of the dependency graph, always
+        in binary format, encoded in a worker thread.
+        """
+        encoded = await asyncio.to_thread(encode_graph_index, graph_index, self.map_compression)
+        await self.storage.set_bytes(f"graph_index:{repo_id}", encoded)
+
+    async def get_graph_index(self, repo_id: str) -> Optional[GraphIndex]:
+        """
+        Load the graph index of a repository, or None if it was stored before indexes existed.
+        """
+        data = await self.storage.get_bytes(f"graph_index:{repo_id}")
+        return await asyncio.to_thread(decode_graph_index, data) if data else None
+
+    async def get_dependency_graph(self, repo_id: str) -> Optional[Mapping[str, Dict[str, List[str]]]]:
+        """
+        Load the dependency map in whichever format it was stored. Binary maps
+        come back as a CompactGraph, which is indexed like the map but only
+        builds the entries that are read.
+        """
+        data = await self.storage.get_bytes(f"dependency_map:{repo_id}")
+        return load_dependency_map(data) if data else None
+
+    @staticmethod
+    def _manifest_key(repo_id: str, ref: str) -> str:
+        return f"ref_manifest:{repo_id}:{ref}"
+
+    async def set_current_ref(self, repo_id: str, ref: str):
+        """
+        Record the ref whose graph is being saved, whose manifest bundles read contents through.
+        """
+        await self.storage.set_text(f"current_ref:{repo_id}", ref)
+        self._current_refs[repo_id] = ref
+
+    async def get_current_ref(self, repo_id: str) -> Optional[str]:
+        if repo_id not in self._current_refs:
+            ref = await self.storage.get_text(f"current_ref:{repo_id}")
+            if ref is None:
+                return None
+            self._current_refs[repo_id] = ref
+        return self._current_refs[repo_id]
+
+    async def get_file_content(self, repo_id: str, file_path: str, ref: Optional[str] = None) -> Optional[str]:
+        return (await self.get_file_contents(repo_id, [file_path], ref))[file_path]
+
+    async def get_file_contents(
+        self, repo_id: str, file_paths: List[str], ref: Optional[str] = None
+    ) -> Dict[str, Optional[str]]:
+        """
+        Fetch many file contents through the manifest of `ref`, by default the
+        ref whose graph is current: one HMGET batch for the blob SHAs, one MGET
+        batch for the blobs, decompressed together with the dictionaries they
+        need. Missing files map to None.
+        """
+        ref = ref if ref is not None else await self.get_current_ref(repo_id)
+        if ref is None:
+            return dict.fromkeys(file_paths)
+        blob_shas = await self.storage.get_hash_fields(self._manifest_key(repo_id, ref), file_paths)
+        stored = [sha for sha in blob_shas if sha is not None]
+        values = await self.storage.get_many_bytes([self._blob_key(sha) for sha in stored])
+        dictionaries = await self._load_dictionaries(dictionary_ids(values))
+        contents = dict(zip(stored, decode_blobs(values, dictionaries)))
+        return {file_path: contents.get(sha) for file_path, sha in zip(file_paths, blob_shas)}
+
+    async def save_file_manifest(self, repo_id: str, ref: str, manifest: Dict[str, str]):
+        """
+        Replace the path -> blob SHA manifest of a ref of a repository.
+
+        Blob reference counts are adjusted by the difference with the previous
+        manifest of the ref; blobs left without references are queued for
+        garbage collection (see collect_garbage). The read, diff and update run
+        under a storage lock, so concurrent saves of a ref cannot apply their
+        differences against the same previous manifest.
+        """
+        key = self._manifest_key(repo_id, ref)
+        async with self.storage.lock(key):
+            previous = await self.storage.get_hash(key)
+            await self.storage.replace_hash(key, manifest)
+            await self._adjust_blob_refs(previous, manifest)
+
+    async def _adjust_blob_refs(self, previous: Dict[str, str], manifest: Dict[str, str]):
+        deltas: Dict[str, int] = {}
+        for file_path, sha in previous.items():
+            if manifest.get(file_path) != sha:
+                deltas[sha] = deltas.get(sha, 0) - 1
+        for file_path, sha in manifest.items():
+            if previous.get(file_path) != sha:
+                deltas[sha] = deltas.get(sha, 0) + 1
+        deltas = {sha: delta for sha, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        counts = await self.storage.increment_many({self._blob_refs_key(sha): delta for sha, delta in deltas.items()})
+        unreferenced = [sha for sha, count in zip(deltas, counts) if count <= 0]
+        if unreferenced:
+            await self.storage.add_scored("blob_gc", {sha: time.time() for sha in unreferenced})
+
+    async def get_file_manifest(self, repo_id: str, ref: str) -> Optional[Dict[str, str]]:
+        return await self.storage.get_hash(self._manifest_key(repo_id, ref)) or None
+
+    async def save_ts_config_manifest(self, repo_id: str, ref: str, manifest: Dict[str, str]):
+        """
+        Store the path -> blob SHA mapping of the tsconfig files of the last load of a ref.
+        """
+        await self.storage.set_data(f"ts_config_manifest:{repo_id}:{ref}", manifest)
+
+    async def get_ts_config_manifest(self, repo_id: str, ref: str) -> Optional[Dict[str, str]]:
+        return await self.storage.get_data(f"ts_config_manifest:{repo_id}:{ref}")
+
+    async def save_resolved_dependencies(self, repo_id: str, ref: str, resolved_dependencies: Dict[str, List[str]]):
+        """
+        Store the resolved dependencies of the last load of a ref, with the
+        parser and resolver versions that produced them.
+        """
+        await self.storage.set_data(
+            f"resolved_dependencies:{repo_id}:{ref}",
+            {"parser_version": PARSER_VERSION, "resolver_version": RESOLVER_VERSION, "dependencies": resolved_dependencies},
+        )
+
+    async def get_resolved_dependencies(self, repo_id: str, ref: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Load the resolved dependencies of the last load of a ref, or None if
+        there are none or another parser or resolver version produced them.
+        """
+        data = await self.storage.get_data(f"resolved_dependencies:{repo_id}:{ref}")
+        if (
+            data is None
+            or data.get("parser_version") != PARSER_VERSION
+            or data.get("resolver_version") != RESOLVER_VERSION
+        ):
+            return None
+        return data["dependencies"]
+
+    @staticmethod
+    def _parsed_dependencies_key(file_path: str, blob_sha: str) -> str:
+        """
+        Parse results depend only on the blob and the parser picked by extension,
+        so they are shared by every repo, branch and path holding the same blob.
+        """
+        ext = file_path.rsplit(".", 1)[-1]
+        return f"parsed_dependencies:v{PARSER_VERSION}:{ext}:{blob_sha}"
+
+    async def save_parsed_dependencies(self, blobs: Dict[str, str], raw_dependencies: Dict[str, List[str]]):
+        """
+        Cache parse results by blob SHA.
+
+        Args:
+            blobs (Dict[str, str]): Path -> blob SHA mapping covering every parsed path.
+            raw_dependencies (Dict[str, List[str]]): Raw dependencies keyed by path.
+        """
+        await self.storage.set_many({
+            self._parsed_dependencies_key(file_path, blobs[file_path]): dependencies
+            for file_path, dependencies in raw_dependencies.items()
+        })
+
+    async def get_parsed_dependencies(self, blobs: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Look up cached parse results for a path -> blob SHA mapping.
+
+        Returns:
+            Dict[str, List[str]]: Raw dependencies of the paths found in the cache.
+        """
+        file_paths = list(blobs)
+        keys = [self._parsed_dependencies_key(file_path, blobs[file_path]) for file_path in file_paths]
+        return {
+            file_path: dependencies
+            for file_path, dependencies in zip(file_paths, await self.storage.get_many(keys))
+            if dependencies is not None
+        }
@@ -0,0 +1,418 @@
+import asyncio
+import logging
+from concurrent.futures import Executor
+from typing import Dict, List, Optional
+from app.config.settings import (
+    FETCH_CONCURRENCY,
+    PARSE_CHUNK_SIZE,
+    PARSE_WORKERS,
+    PIPELINE_QUEUE_SIZE,
+    REDIS_BATCH_SIZE,
+)
+from app.infrastructure.github_client import GitHubClient
+from app.infrastructure.storage import Storage
+from app.services.dependency_analysis_service import DependencyAnalyzer
+from app.services.github_service import GitHubService
+from app.services.job_queue import LoadJob
+from app.services.redis_service import RedisService
+from app.utils.filtering import TreeFilter
+from app.utils.metrics import PARSE_ERRORS, record_stage, stage_timer
+from app.utils.parallel_parsing import parse_chunk
+from app.utils.path_resolver import TsConfig, is_ts_config
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class RepositoryLoader:
+    """
+    Load a repository through a bounded fetch -> store/parse pipeline.
+
+    Source files are selected from the tree metadata before anything is
+    downloaded (see TreeFilter: extensions, include/exclude globs, blob size). Fetch
+    workers push contents onto a bounded queue; a single consumer writes them to
+    Redis and parses them in chunks as they arrive, so only a bounded number of
+    files is held in memory at any time and the stages overlap.
+
+    Contents come either from one raw request per file or, in "archive" mode,
+    from a single tarball of the ref streamed through extraction.
+
+    Reloads are incremental: the tree's blob SHAs are diffed against the manifest
+    of the previous load of the same branch, only new or modified blobs are
+    fetched and parsed, and the previous graph is patched instead of rebuilt.
+    A graph resolved by another parser or resolver version (PARSER_VERSION,
+    RESOLVER_VERSION) is resolved again in full. Contents are stored once per
+    blob SHA and shared by every repository and ref, so blobs already in the
+    store with a cached parse result are not downloaded at all. The repository's
+    tsconfig/jsconfig files are fetched on every load to resolve JS/TS imports;
+    when they change, every file is re-resolved.
+
+    Stage durations are recorded in the stage metrics and accumulated in
+    `self.timings`: tree_fetch, filter, content_fetch (the whole overlapped
+    pipeline), then the analyzer's resolve, graph_build and export, and
+    redis_write (the final save of the manifests and the graph only). Within
+    content_fetch, blob_write is the time spent writing content batches and
+    parse the parse worker time; both overlap the fetches.
+    """
+
+    INGESTION_MODES = ("raw", "archive")
+
+    def __init__(
+        self,
+        github_service: GitHubService,
+        redis_service: RedisService,
+        executor: Optional[Executor] = None,
+        fetch_concurrency: int = FETCH_CONCURRENCY,
+        queue_size: int = PIPELINE_QUEUE_SIZE,
+        chunk_size: int = PARSE_CHUNK_SIZE,
+        write_batch_size: int = REDIS_BATCH_SIZE,
+        ingestion_mode: str = "raw",
+        progress: Optional[Dict] = None,
+        tree_filter: Optional[TreeFilter] = None,
+    ):
+        """
+        Initialize the loader with shared services and pipeline limits.
+
+        Args:
+            github_service (GitHubService): Service used to fetch the tree and file contents.
+            redis_service (RedisService): Service used to store file contents.
+            executor (Optional[Executor]): Pool used for parsing; the default thread pool if omitted.
+            fetch_concurrency (int): Number of concurrent fetch workers.
+            queue_size (int): Maximum number of fetched files waiting to be stored and parsed.
+            chunk_size (int): Number of files parsed per task.
+            write_batch_size (int): Number of files written to Redis per round trip.
+            ingestion_mode (str): "raw" to fetch files one by one, "archive" to stream a single tarball.
+            progress (Optional[Dict]): Dict updated in place with the current stage and file counts.
+            tree_filter (Optional[TreeFilter]): Rules selecting the blobs to load; the defaults if omitted.
+        """
+        if ingestion_mode not in self.INGESTION_MODES:
+            raise ValueError(f"Unsupported ingestion mode: {ingestion_mode}")
+
+        self.github_service = github_service
+        self.redis_service = redis_service
+        self.executor = executor
+        self.fetch_concurrency = fetch_concurrency
+        self.queue_size = queue_size
+        self.chunk_size = chunk_size
+        self.write_batch_size = write_batch_size
+        self.ingestion_mode = ingestion_mode
+        self.tree_filter = tree_filter or TreeFilter()
+        self.failures: Dict[str, str] = {}
+        self.progress = progress if progress is not None else {}
+        self.progress.update(
+            stage="queued",
+            files_total=0,
+            files_skipped=0,
+            files_reused=0,
+            files_fetched=0,
+            files_parsed=0,
+            files_resolved=0,
+        )
+        self.timings: Dict[str, float] = {}
+
+    async def load(self, owner: str, repo: str, branch: str, repo_id: str) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Fetch, store and analyze a repository, then save its dependency map.
+
+        Args:
+            owner (str): Repository owner.
+            repo (str): Repository name.
+            branch (str): Branch to load.
+            repo_id (str): Unique identifier for the repository.
+
+        Returns:
+            dict: The dependency graph.
+        """
+        logger.info("Fetching repository tree...")
+        self.progress["stage"] = "fetching_tree"
+        with stage_timer("tree_fetch", self.timings):
+            repo_tree = await self.github_service.fetch_repo_tree(owner, repo, branch)
+        with stage_timer("filter", self.timings):
+            source_files, skipped = self.tree_filter.select(repo_tree)
+            blob_shas = {item["path"]: item["sha"] for item in repo_tree if item["type"] == "blob"}
+            manifest = {path: blob_shas[path] for path in source_files}
+            ts_config_manifest = {
+                path: sha for path, sha in blob_shas.items() if is_ts_config(path) and not self.tree_filter.is_excluded(path)
+            }
+        self.progress["files_skipped"] = sum(skipped.values())
+        logger.info("Source files identified: %d of %d, skipped: %s", len(source_files), len(blob_shas), skipped)
+
+        # Diff against the previous load; only new or modified blobs are fetched and parsed
+        previous_manifest = await self.redis_service.get_file_manifest(repo_id, branch) or {}
+        previous_resolved = (
+            await self.redis_service.get_resolved_dependencies(repo_id, branch) if previous_manifest else None
+        )
+        incremental = previous_resolved is not None
+        unchanged = {path: sha for path, sha in manifest.items() if previous_manifest.get(path) == sha}
+        removed = [path for path in previous_manifest if path not in manifest]
+        previous_ts_configs = await self.redis_service.get_ts_config_manifest(repo_id, branch) or {}
+        # A new set of files or new tsconfig options change how every import resolves
+        paths_changed = set(previous_manifest) != set(manifest) or previous_ts_configs != ts_config_manifest
+
+        unchanged_dependencies = {}
+        if incremental and paths_changed:
+            # The namespace mapping changed, so untouched files must be re-resolved too
+            unchanged_dependencies = await self.redis_service.get_parsed_dependencies(unchanged)
+        to_fetch = [
+            path for path in source_files
+            if not incremental or path not in unchanged or (paths_changed and path not in unchanged_dependencies)
+        ]
+        reused = await self._reusable_blobs({path: manifest[path] for path in to_fetch})
+        to_fetch = [path for path in to_fetch if path not in reused]
+        logger.info(
+            "Fetching %d new or modified files, %d reused from the blob store, %d removed.",
+            len(to_fetch), len(reused), len(removed),
+        )
+        self.progress.update(stage="fetching", files_total=len(to_fetch), files_reused=len(reused))
+
+        with stage_timer("content_fetch", self.timings):
+            ts_configs = await self._fetch_ts_configs(owner, repo, branch, list(ts_config_manifest))
+            raw_dependencies = await self.stream_contents(
+                owner, repo, branch, repo_id, {path: manifest[path] for path in to_fetch}
+            )
+        raw_dependencies.update(reused)
+        logger.info("Stored and parsed %d files, %d failed to fetch.", len(raw_dependencies), len(self.failures))
+
+        self.progress["stage"] = "resolving"
+        analyzer = DependencyAnalyzer(
+            {}, source_files, executor=self.executor, progress=self.progress, ts_configs=ts_configs
+        )
+        if incremental:
+            analyzer.load_previous(previous_resolved)
+            await asyncio.to_thread(analyzer.update, raw_dependencies, removed, unchanged_dependencies)
+        else:
+            analyzer.raw_dependencies.update(raw_dependencies)
+            await asyncio.to_thread(analyzer.analyze)
+        dependency_graph = await asyncio.to_thread(analyzer.export_graph)
+        self.timings.update(analyzer.timings)
+
+        # Files that failed to fetch are left out of the manifest so the next load retries them
+        for path in self.failures:
+            manifest.pop(path, None)
+        self.progress["stage"] = "saving"
+        with stage_timer("redis_write", self.timings):
+            await self._save_state(
+                repo_id, branch, manifest, ts_config_manifest, raw_dependencies, analyzer, dependency_graph
+            )
+        self.progress["stage"] = "done"
+        return dependency_graph
+
+    async def _save_state(
+        self,
+        repo_id: str,
+        branch: str,
+        manifest: Dict[str, str],
+        ts_config_manifest: Dict[str, str],
+        raw_dependencies: Dict[str, List[str]],
+        analyzer: DependencyAnalyzer,
+        dependency_graph: Dict[str, Dict[str, List[str]]],
+    ):
+        """
+        Persist parse results by blob SHA, the new manifests of the branch, the
+        dependency map and its indexes, then garbage-collect the blobs no manifest
+        references anymore. The branch becomes the one bundles read contents from.
+        """
+        await self.redis_service.save_parsed_dependencies(manifest, raw_dependencies)
+        await self.redis_service.save_resolved_dependencies(repo_id, branch, analyzer.resolved_dependencies)
+        await self.redis_service.save_file_manifest(repo_id, branch, manifest)
+        await self.redis_service.save_ts_config_manifest(repo_id, branch, ts_config_manifest)
+        await self.redis_service.set_current_ref(repo_id, branch)
+        components = await asyncio.to_thread(analyzer.export_components)
+        graph_index = await asyncio.to_thread(analyzer.export_graph_index)
+        await self.redis_service.save_graph(repo_id, dependency_graph, components, graph_index)
+        logger.info("Dependency graph saved to Redis under 'dependency_map:%s'.", repo_id)
+        collected = await self.redis_service.collect_garbage()
+        if collected:
+            logger.info("Deleted %d unreferenced blobs.", collected)
+
+    async def _reusable_blobs(self, blob_shas: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Find the files whose blob is already stored, e.g. by another ref or a
+        fork, and whose parse result is cached: they need no download.
+
+        Returns:
+            Dict[str, List[str]]: Raw dependencies of the reusable files, keyed by path.
+        """
+        parsed = await self.redis_service.get_parsed_dependencies(blob_shas)
+        if not parsed:
+            return {}
+        stored = await self.redis_service.existing_blobs(sorted({blob_shas[path] for path in parsed}))
+        # Keep reused blobs clear of garbage collection until the manifest references them
+        await self.redis_service.touch_blobs(sorted(stored))
+        return {path: dependencies for path, dependencies in parsed.items() if blob_shas[path] in stored}
+
+    async def _fetch_ts_configs(self, owner: str, repo: str, branch: str, paths: List[str]) -> Dict[str, TsConfig]:
+        """
+        Fetch the tsconfig/jsconfig files used to resolve JS/TS imports. A config
+        that cannot be fetched is skipped, leaving its imports to name matching.
+        """
+        async def fetch(path):
+            try:
+                return path, await self.github_service.fetch_file_content(owner, repo, path, branch)
+            except Exception as e:
+                logger.warning("Failed to fetch %s: %s", path, e)
+                return path, None
+
+        contents = await asyncio.gather(*(fetch(path) for path in paths))
+        return TsConfig.load_all({path: content for path, content in contents if content})
+
+    async def stream_contents(
+        self, owner: str, repo: str, branch: str, repo_id: str, blob_shas: Dict[str, str]
+    ) -> Dict[str, List[str]]:
+        """
+        Fetch file contents and store them by blob SHA and parse them as they
+        arrive. Files that cannot be fetched are recorded in `self.failures`.
+
+        Args:
+            owner (str): Repository owner.
+            repo (str): Repository name.
+            branch (str): Branch to fetch from.
+            repo_id (str): Unique identifier for the repository, whose dictionary compresses the contents.
+            blob_shas (Dict[str, str]): Blob SHAs of the files to load, keyed by path.
+
+        Returns:
+            Dict[str, List[str]]: Raw dependencies keyed by file path.
+        """
+        contents = asyncio.Queue(maxsize=self.queue_size)
+        produce = self._produce_from_archive if self.ingestion_mode == "archive" else self._produce_from_raw
+
+        async def producer():
+            try:
+                await produce(owner, repo, branch, list(blob_shas), contents)
+            except asyncio.CancelledError:
+                # The consumer failed and is gone: a full queue would never drain
+                raise
+            except Exception:
+                await contents.put(_DONE)
+                raise
+            await contents.put(_DONE)
+
+        producer_task = asyncio.create_task(producer())
+        try:
+            raw_dependencies = await self._consume(contents, repo_id, blob_shas)
+            await producer_task
+        finally:
+            if not producer_task.done():
+                producer_task.cancel()
+                await asyncio.gather(producer_task, return_exceptions=True)
+        return raw_dependencies
+
+    async def _produce_from_raw(
+        self, owner: str, repo: str, branch: str, file_paths: List[str], contents: asyncio.Queue
+    ):
+        """
+        Fetch each file with its own request, using `fetch_concurrency` workers.
+        """
+        paths = asyncio.Queue()
+        for path in file_paths:
+            paths.put_nowait(path)
+
+        async def fetch_worker():
+            while not paths.empty():
+                path = paths.get_nowait()
+                try:
+                    content = await self.github_service.fetch_file_content(owner, repo, path, branch)
+                except Exception as e:
+                    logger.warning("Failed to fetch %s: %s", path, e)
+                    self.failures[path] = str(e) or type(e).__name__
+                    continue
+                self.progress["files_fetched"] += 1
+                if content:
+                    await contents.put((path, content))
+
+        workers = min(self.fetch_concurrency, len(file_paths)) or 1
+        await asyncio.gather(*(fetch_worker() for _ in range(workers)))
+
+    async def _produce_from_archive(
+        self, owner: str, repo: str, branch: str, file_paths: List[str], contents: asyncio.Queue
+    ):
+        """
+        Extract the files from a single streamed tarball of the ref.
+        """
+        wanted = set(file_paths)
+        seen = set()
+        async for path, content in self.github_service.stream_archive_files(owner, repo, wanted.__contains__, branch):
+            seen.add(path)
+            self.progress["files_fetched"] += 1
+            if content:
+                await contents.put((path, content))
+
+        for path in wanted - seen:
+            self.failures[path] = "Not found in archive"
+
+    async def _consume(self, contents: asyncio.Queue, repo_id: str, blob_shas: Dict[str, str]) -> Dict[str, List[str]]:
+        """
+        Drain fetched contents, parsing them in chunks of `chunk_size` and writing
+        them to Redis in batches of `write_batch_size`.
+        """
+        loop = asyncio.get_running_loop()
+        raw_dependencies = {}
+        in_flight = set()
+        max_in_flight = max(2, PARSE_WORKERS)
+        parse_seconds = 0.0
+
+        def collect(result):
+            nonlocal parse_seconds
+            dependencies, errors, seconds = result
+            raw_dependencies.update(dependencies)
+            PARSE_ERRORS.inc(errors)
+            parse_seconds += seconds
+            self.progress["files_parsed"] = len(raw_dependencies)
+
+        async def parse(chunk):
+            in_flight.add(loop.run_in_executor(self.executor, parse_chunk, chunk))
+            if len(in_flight) >= max_in_flight:
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for future in done:
+                    in_flight.discard(future)
+                    collect(future.result())
+
+        async def write(batch):
+            with stage_timer("blob_write", self.timings):
+                await self.redis_service.save_blobs({blob_shas[path]: content for path, content in batch}, repo_id)
+
+        chunk, batch = [], []
+        while (item := await contents.get()) is not _DONE:
+            chunk.append(item)
+            batch.append(item)
+            if len(chunk) >= self.chunk_size:
+                await parse(chunk)
+                chunk = []
+            if len(batch) >= self.write_batch_size:
+                await write(batch)
+                batch = []
+        if chunk:
+            await parse(chunk)
+        if batch:
+            await write(batch)
+
+        for result in await asyncio.gather(*in_flight):
+            collect(result)
+        record_stage("parse", parse_seconds, self.timings)
+        return raw_dependencies
+
+
+async def run_load_job(
+    job: LoadJob, github_client: GitHubClient, storage: Storage, executor: Optional[Executor] = None
+):
+    """
+    Run a queued load with the shared clients, reporting progress on the job.
+
+    Args:
+        job (LoadJob): The job to run.
+        github_client (GitHubClient): Shared GitHub client.
+        storage (Storage): Shared storage backend.
+        executor (Optional[Executor]): Shared process pool for parsing.
+    """
+    loader = RepositoryLoader(
+        GitHubService(github_client),
+        RedisService(storage),
+        executor=executor,
+        ingestion_mode=job.ingestion_mode,
+        progress=job.progress,
+        tree_filter=job.tree_filter,
+    )
+    job.timings = loader.timings
+    await loader.load(job.owner, job.repo, job.branch, job.repo_id)
+    job.failed_files = loader.failures
@@ -0,0 +1,63 @@
+import asyncio
+import io
+import tarfile
+from typing import Callable, Iterator, Tuple
+
+
+class ChunkReader(io.RawIOBase):
+    """
+    Blocking file-like view over an asyncio queue of byte chunks.
+
+    Meant to be read from a worker thread while the event loop fills the queue.
+    An empty chunk marks the end of the stream; an exception instance is raised
+    in the reading thread.
+    """
+
+    def __init__(self, chunks: asyncio.Queue, loop: asyncio.AbstractEventLoop):
+        self._chunks = chunks
+        self._loop = loop
+        self._buffer = memoryview(b"")
+        self._eof = False
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._buffer and not self._eof:
+            chunk = asyncio.run_coroutine_threadsafe(self._chunks.get(), self._loop).result()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                self._eof = True
+            self._buffer = memoryview(chunk)
+
+        size = min(len(buffer), len(self._buffer))
+        buffer[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+def iter_archive_files(fileobj, wanted: Callable[[str], bool]) -> Iterator[Tuple[str, bytes]]:
+    """
+    Stream regular files out of a gzipped tarball without seeking or touching disk.
+
+    GitHub archives wrap everything in a single `{owner}-{repo}-{sha}/` directory,
+    which is stripped from the yielded paths.
+
+    Args:
+        fileobj: Readable file-like object positioned at the start of the archive.
+        wanted (Callable[[str], bool]): Predicate selecting the repository paths to extract.
+
+    Yields:
+        Tuple[str, bytes]: Repository path and raw content of each selected file.
+    """
+    with tarfile.open(fileobj=fileobj, mode="r|gz") as archive:
+        for member in archive:
+            if not member.isfile():
+                continue
+            _, _, path = member.name.partition("/")
+            if not path or not wanted(path):
+                continue
+            extracted = archive.extractfile(member)
+            if extracted is not None:
+                yield path, extracted.read()
@@ -0,0 +1,207 @@
+import hashlib
+import struct
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Stored file contents are either plain UTF-8 text, as written before compression
+# existed or with compression off, or:
+#   MAGIC | compression ID (u8) | dictionary ID (u64, 0 for none) | payload
+# Source text never starts with a NUL byte, so the two kinds can share a key space.
+MAGIC = b"\0Z"
+_HEADER = struct.Struct("<2sBQ")
+
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2}
+_COMPRESSION_NAMES = {value: name for name, value in COMPRESSION_IDS.items()}
+
+# zlib only uses the last 32 KiB of a preset dictionary
+ZLIB_MAX_DICTIONARY = 32 * 1024
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+
+def check_compression(compression: str):
+    """
+    Check that a compression setting is supported and usable here. Called at
+    startup for the configured one, so a missing library fails the process
+    instead of the first read or write.
+
+    Raises:
+        ValueError: If the compression is unknown.
+        RuntimeError: If the library it needs is not installed.
+    """
+    if compression not in COMPRESSION_IDS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression == "zstd" and zstandard is None:
+        raise RuntimeError("zstd compression requires the zstandard package.")
+
+
+def available_compressions() -> List[str]:
+    """
+    List the compression settings usable in this environment.
+    """
+    return [name for name in COMPRESSION_IDS if name != "zstd" or zstandard is not None]
+
+
+def dictionary_id(dictionary: bytes) -> int:
+    """
+    Content-derived ID of a dictionary, never 0.
+    """
+    return int.from_bytes(hashlib.sha1(dictionary).digest()[:8], "little") or 1
+
+
+def train_dictionary(samples: Sequence[str], size: int, compression: str = "zstd") -> Optional[bytes]:
+    """
+    Build a compression dictionary from sample file contents.
+
+    zstd dictionaries are trained with zstandard. For zlib, which takes any
+    bytes as a preset dictionary, the lines shared by the most samples are
+    packed into at most 32 KiB, the most common last since zlib reaches
+    recent bytes with the shortest distances.
+
+    Args:
+        samples (Sequence[str]): File contents of one repository.
+        size (int): Maximum dictionary size in bytes.
+        compression (str): "zstd" or "zlib".
+
+    Returns:
+        Optional[bytes]: The dictionary, or None if the samples are too few or too alike to train one.
+    """
+    check_compression(compression)
+    if compression == "zstd":
+        try:
+            return zstandard.train_dictionary(size, [sample.encode("utf-8") for sample in samples]).as_bytes()
+        except zstandard.ZstdError:
+            return None
+    if compression != "zlib":
+        return None
+
+    counts = Counter(line for sample in samples for line in set(sample.splitlines(keepends=True)) if len(line) > 4)
+    budget = min(size, ZLIB_MAX_DICTIONARY)
+    chosen = []
+    for line, count in counts.most_common():
+        if count < 2 or budget <= 0:
+            break
+        encoded = line.encode("utf-8")
+        if len(encoded) <= budget:
+            chosen.append(encoded)
+            budget -= len(encoded)
+    return b"".join(reversed(chosen)) or None
+
+
+def encode_blobs(
+    contents: Mapping[str, str], compression: str = "zstd", dictionary: Optional[bytes] = None
+) -> Dict[str, bytes]:
+    """
+    Compress file contents, reusing one compressor for the whole batch.
+
+    A blob that does not shrink is stored uncompressed behind the header.
+
+    Args:
+        contents (Mapping[str, str]): Text keyed by any ID (e.g. blob SHA).
+        compression (str): "zstd", "zlib" or "none".
+        dictionary (Optional[bytes]): Dictionary trained for these files, if any.
+
+    Returns:
+        Dict[str, bytes]: The encoded values, with the same keys.
+    """
+    check_compression(compression)
+    dictionary_key = dictionary_id(dictionary) if dictionary else 0
+    if compression == "zstd":
+        compressor = zstandard.ZstdCompressor(
+            level=ZSTD_LEVEL, dict_data=zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        )
+        compress = compressor.compress
+    elif compression == "zlib":
+        primed = zlib.compressobj(ZLIB_LEVEL, zdict=dictionary[-ZLIB_MAX_DICTIONARY:]) if dictionary else None
+
+        def compress(data: bytes) -> bytes:
+            compressor = primed.copy() if primed is not None else zlib.compressobj(ZLIB_LEVEL)
+            return compressor.compress(data) + compressor.flush()
+    else:
+        compress = None
+
+    compressed_header = _HEADER.pack(MAGIC, COMPRESSION_IDS[compression], dictionary_key)
+    plain_header = _HEADER.pack(MAGIC, COMPRESSION_IDS["none"], 0)
+    encoded = {}
+    for key, text in contents.items():
+        data = text.encode("utf-8")
+        payload = compress(data) if compress is not None else data
+        if len(payload) < len(data):
+            encoded[key] = compressed_header + payload
+        else:
+            encoded[key] = plain_header + data
+    return encoded
+
+
+def is_encoded(data: bytes) -> bool:
+    """
+    Check whether a stored value carries the header rather than plain text.
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def dictionary_ids(values: Iterable[Optional[bytes]]) -> set:
+    """
+    Collect the IDs of the dictionaries needed to decode stored values.
+    """
+    ids = set()
+    for value in values:
+        if value and is_encoded(value):
+            ids.add(_HEADER.unpack_from(value)[2])
+    ids.discard(0)
+    return ids
+
+
+def decode_blobs(values: Sequence[Optional[bytes]], dictionaries: Mapping[int, bytes]) -> List[Optional[str]]:
+    """
+    Decode stored values in either form, building one decompressor per
+    compression and dictionary for the whole batch. Values may be any bytes-like
+    object, such as memoryviews of a mapped file. Missing values stay None.
+
+    Raises:
+        ValueError: If a value needs a dictionary that is not given or a missing compression library.
+    """
+    decompressors = {}
+
+    def decompressor(compression_id: int, dictionary_key: int):
+        key = (compression_id, dictionary_key)
+        if key in decompressors:
+            return decompressors[key]
+        dictionary = None
+        if dictionary_key:
+            dictionary = dictionaries.get(dictionary_key)
+            if dictionary is None:
+                raise ValueError(f"Cannot decode blob: dictionary {dictionary_key:x} not found.")
+        compression = _COMPRESSION_NAMES.get(compression_id)
+        if compression == "zstd" and zstandard is not None:
+            dict_data = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+            decompress = zstandard.ZstdDecompressor(dict_data=dict_data).decompress
+        elif compression == "zlib":
+            primed = zlib.decompressobj(zdict=dictionary[-ZLIB_MAX_DICTIONARY:]) if dictionary else None
+
+            def decompress(data: bytes) -> bytes:
+                return (primed.copy() if primed is not None else zlib.decompressobj()).decompress(data)
+        else:
+            raise ValueError(f"Cannot decode blob: {compression or compression_id} compression unavailable.")
+        decompressors[key] = decompress
+        return decompress
+
+    texts = []
+    for value in values:
+        if value is None:
+            texts.append(None)
+        elif not is_encoded(value):
+            texts.append(str(value, "utf-8"))
+        else:
+            _, compression_id, dictionary_key = _HEADER.unpack_from(value)
+            payload = memoryview(value)[_HEADER.size:]
+            if compression_id != COMPRESSION_IDS["none"]:
+                payload = decompressor(compression_id, dictionary_key)(payload)
+            texts.append(str(payload, "utf-8"))
+    return texts
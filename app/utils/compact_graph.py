@@ -0,0 +1,504 @@
+from array import array
+from itertools import chain, repeat
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Marks unvisited nodes in integer arrays
+_UNSET = 0xFFFFFFFF
+
+
+class CompactGraph:
+    """
+    Immutable directed graph stored as compressed sparse row (CSR) arrays.
+
+    Paths are interned once into a table and referred to by integer IDs. Forward
+    and reverse edges each live in two flat arrays: ``offsets[i]:offsets[i + 1]``
+    is the slice of ``targets`` holding the neighbours of node ``i``. This takes a
+    few bytes per edge instead of the dict-of-dicts of a networkx DiGraph.
+
+    Node and edge order match a DiGraph built with ``add_edge`` over the same
+    input: nodes in order of first appearance, neighbours in insertion order.
+
+    The graph also reads like the exported dependency map (``graph[path]`` is the
+    node's "Depends On" / "Used By" entry), so code written against the JSON map
+    works on it unchanged while only materializing the nodes it touches.
+    """
+
+    def __init__(self):
+        """
+        Create an empty graph; use `from_dependencies` to build one.
+        """
+        self.paths: List[str] = []
+        self.index: Dict[str, int] = {}
+        self._out_offsets = array("I", [0])
+        self._out_targets = array("I")
+        self._in_offsets: Optional[array] = array("I", [0])
+        self._in_sources: Optional[array] = array("I")
+
+    @classmethod
+    def from_dependencies(cls, dependencies: Dict[str, List[str]]) -> "CompactGraph":
+        """
+        Build the graph from resolved dependencies.
+
+        Only files taking part in at least one edge become nodes, and duplicate
+        dependencies of a file count as a single edge.
+
+        Args:
+            dependencies (Dict[str, List[str]]): Dependency paths keyed by file path.
+
+        Returns:
+            CompactGraph: The built graph.
+        """
+        graph = cls()
+        paths, index = graph.paths, graph.index
+        sources, targets = array("I"), array("I")
+
+        def intern(path: str) -> int:
+            node_id = index.get(path)
+            if node_id is None:
+                node_id = index[path] = len(paths)
+                paths.append(path)
+            return node_id
+
+        for file_path, file_dependencies in dependencies.items():
+            seen = set()
+            for dependency in file_dependencies:
+                if dependency in seen:
+                    continue
+                seen.add(dependency)
+                source = intern(file_path)
+                sources.append(source)
+                targets.append(intern(dependency))
+
+        graph._out_offsets, graph._out_targets = cls._csr(len(paths), sources, targets)
+        graph._in_offsets, graph._in_sources = cls._csr(len(paths), targets, sources)
+        return graph
+
+    @classmethod
+    def from_csr(cls, paths: List[str], out_offsets: array, out_targets: array) -> "CompactGraph":
+        """
+        Wrap existing forward CSR arrays, e.g. decoded from storage.
+
+        Reverse edges are only built the first time they are needed, and then
+        list the dependents of a node in node order.
+        """
+        graph = cls()
+        graph.paths = paths
+        graph.index = dict(zip(paths, range(len(paths))))
+        graph._out_offsets, graph._out_targets = out_offsets, out_targets
+        graph._in_offsets = graph._in_sources = None
+        return graph
+
+    def _reverse(self):
+        """
+        Return the reverse CSR arrays, building them from the forward ones if needed.
+        """
+        if self._in_offsets is None:
+            offsets = self._out_offsets
+            sources = array("I", chain.from_iterable(
+                repeat(node_id, offsets[node_id + 1] - offsets[node_id]) for node_id in range(len(self.paths))
+            ))
+            self._in_offsets, self._in_sources = self._csr(len(self.paths), self._out_targets, sources)
+        return self._in_offsets, self._in_sources
+
+    @staticmethod
+    def _csr(node_count: int, keys: array, values: array):
+        """
+        Group edge values by key with a stable counting sort.
+
+        Returns:
+            Tuple[array, array]: The offsets and the grouped values.
+        """
+        offsets = array("I", bytes(4 * (node_count + 1)))
+        for key in keys:
+            offsets[key + 1] += 1
+        for i in range(node_count):
+            offsets[i + 1] += offsets[i]
+
+        grouped = array("I", bytes(4 * len(values)))
+        cursor = offsets[:-1]
+        for key, value in zip(keys, values):
+            grouped[cursor[key]] = value
+            cursor[key] += 1
+        return offsets, grouped
+
+    @property
+    def nodes(self) -> List[str]:
+        return self.paths
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def __contains__(self, path: str) -> bool:
+        return path in self.index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __getitem__(self, path: str) -> Dict[str, List[str]]:
+        """
+        Return the dependency map entry of a node.
+        """
+        entry = {}
+        depends_on = list(self.successors(path))
+        if depends_on:
+            entry["Depends On"] = depends_on
+        used_by = list(self.predecessors(path))
+        if used_by:
+            entry["Used By"] = used_by
+        return entry
+
+    def get(self, path: str, default=None):
+        return self[path] if path in self.index else default
+
+    def has_node(self, path: str) -> bool:
+        return path in self.index
+
+    def number_of_edges(self) -> int:
+        return len(self._out_targets)
+
+    def forward_csr(self) -> Tuple[array, array]:
+        """
+        Return the forward CSR arrays: node offsets and edge targets.
+        """
+        return self._out_offsets, self._out_targets
+
+    def successors(self, path: str) -> Iterator[str]:
+        """
+        Iterate over the files a file depends on.
+        """
+        node_id = self.index[path]
+        for target in self._out_targets[self._out_offsets[node_id]:self._out_offsets[node_id + 1]]:
+            yield self.paths[target]
+
+    def predecessors(self, path: str) -> Iterator[str]:
+        """
+        Iterate over the files depending on a file.
+        """
+        node_id = self.index[path]
+        in_offsets, in_sources = self._reverse()
+        for source in in_sources[in_offsets[node_id]:in_offsets[node_id + 1]]:
+            yield self.paths[source]
+
+    def to_dependency_map(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Export the graph as the "Depends On" / "Used By" map stored in Redis.
+        """
+        paths = self.paths
+        out_offsets, out_targets = self._out_offsets, self._out_targets
+        in_offsets, in_sources = self._reverse()
+        output = {}
+
+        for node_id, path in enumerate(paths):
+            entry = output[path] = {}
+            start, end = out_offsets[node_id], out_offsets[node_id + 1]
+            if start != end:
+                entry["Depends On"] = [paths[target] for target in out_targets[start:end]]
+            start, end = in_offsets[node_id], in_offsets[node_id + 1]
+            if start != end:
+                entry["Used By"] = [paths[source] for source in in_sources[start:end]]
+
+        return output
+
+    def weakly_connected_components(self) -> List[List[str]]:
+        """
+        Group nodes into weakly connected components with union-find.
+
+        Returns:
+            List[List[str]]: Members of each component, in node order.
+        """
+        parent = array("I", range(len(self.paths)))
+
+        def find(node_id: int) -> int:
+            root = node_id
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node_id] != root:
+                parent[node_id], node_id = root, parent[node_id]
+            return root
+
+        out_offsets, out_targets = self._out_offsets, self._out_targets
+        for source in range(len(self.paths)):
+            for target in out_targets[out_offsets[source]:out_offsets[source + 1]]:
+                source_root, target_root = find(source), find(target)
+                if source_root != target_root:
+                    parent[max(source_root, target_root)] = min(source_root, target_root)
+
+        components: Dict[int, List[str]] = {}
+        for node_id, path in enumerate(self.paths):
+            components.setdefault(find(node_id), []).append(path)
+        return list(components.values())
+
+    def strongly_connected_components(self) -> array:
+        """
+        Find strongly connected components with an iterative Tarjan search.
+
+        Tarjan closes a component only after every component it reaches, so
+        numbering them in reverse order of completion yields a topological order
+        of the condensation: every edge goes from a component to one with a
+        greater or equal ID, i.e. dependents come before their dependencies.
+
+        Returns:
+            array: Component ID of each node.
+        """
+        node_count = len(self.paths)
+        offsets, targets = self._out_offsets, self._out_targets
+        order = array("I", [_UNSET]) * node_count
+        low = array("I", [_UNSET]) * node_count
+        component_of = array("I", [_UNSET]) * node_count
+        on_stack = bytearray(node_count)
+        stack: List[int] = []
+        counter = found = 0
+
+        for root in range(node_count):
+            if order[root] != _UNSET:
+                continue
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            # (node, next edge to follow) of the current DFS path
+            path_nodes, path_edges = [root], [offsets[root]]
+            while path_nodes:
+                node, edge = path_nodes[-1], path_edges[-1]
+                if edge < offsets[node + 1]:
+                    path_edges[-1] = edge + 1
+                    target = targets[edge]
+                    if order[target] == _UNSET:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = 1
+                        path_nodes.append(target)
+                        path_edges.append(offsets[target])
+                    elif on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                    continue
+
+                path_nodes.pop()
+                path_edges.pop()
+                if path_nodes and low[node] < low[path_nodes[-1]]:
+                    low[path_nodes[-1]] = low[node]
+                if low[node] == order[node]:
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = 0
+                        component_of[member] = found
+                        if member == node:
+                            break
+                    found += 1
+
+        return array("I", (found - 1 - component_id for component_id in component_of))
+
+
+class GraphIndex:
+    """
+    Strongly connected components of a CompactGraph and its condensation DAG.
+
+    Components are numbered in topological order (see
+    `CompactGraph.strongly_connected_components`), which makes the
+    condensation usable for queries without cycle handling: transitive
+    dependencies and dependents walk component edges instead of file edges,
+    and a path search only looks at files ordered between its two ends.
+
+    Only the component ID of each node is stored; members and condensation
+    edges are rebuilt from it in one linear pass.
+    """
+
+    def __init__(self, graph: CompactGraph, component_of: array):
+        """
+        Index a graph with its precomputed component assignment.
+
+        Args:
+            graph (CompactGraph): The dependency graph.
+            component_of (array): Topologically numbered component ID of each node.
+        """
+        self.graph = graph
+        self.component_of = component_of
+        self.component_count = max(component_of) + 1 if component_of else 0
+        count = self.component_count
+
+        self._member_offsets, self._members = CompactGraph._csr(count, component_of, array("I", range(len(graph))))
+
+        offsets, targets = graph.forward_csr()
+        sources, condensed_targets = array("I"), array("I")
+        self._cyclic = bytearray(count)
+        seen = set()
+        for node_id in range(len(graph)):
+            source = component_of[node_id]
+            for target_id in targets[offsets[node_id]:offsets[node_id + 1]]:
+                target = component_of[target_id]
+                if target == source:
+                    # An edge inside a component; in a single-file one, a self-loop
+                    self._cyclic[source] = 1
+                elif (source, target) not in seen:
+                    seen.add((source, target))
+                    sources.append(source)
+                    condensed_targets.append(target)
+        for component_id in range(count):
+            if self._member_offsets[component_id + 1] - self._member_offsets[component_id] > 1:
+                self._cyclic[component_id] = 1
+
+        self._out_offsets, self._out_targets = CompactGraph._csr(count, sources, condensed_targets)
+        self._in_offsets, self._in_sources = CompactGraph._csr(count, condensed_targets, sources)
+        # Position of each node in path order, built by the first query returning files
+        self._rank: Optional[array] = None
+        # Path searches walk edges backwards too; build them now rather than in a query
+        graph._reverse()
+
+    @classmethod
+    def build(cls, graph: CompactGraph) -> "GraphIndex":
+        """
+        Compute the components of a graph and index it.
+        """
+        return cls(graph, graph.strongly_connected_components())
+
+    def _component(self, path: str) -> int:
+        node_id = self.graph.index.get(path)
+        if node_id is None:
+            raise ValueError(f"File {path} not found in the dependency graph.")
+        return self.component_of[node_id]
+
+    def _member_paths(self, component_id: int) -> List[str]:
+        paths = self.graph.paths
+        start, end = self._member_offsets[component_id], self._member_offsets[component_id + 1]
+        return [paths[node_id] for node_id in self._members[start:end]]
+
+    def members(self, path: str) -> List[str]:
+        """
+        Return the files in the same strongly connected component as a file, itself included.
+        """
+        return sorted(self._member_paths(self._component(path)))
+
+    def cycles(self) -> List[List[str]]:
+        """
+        List circular dependencies: every component of more than one file, and
+        files importing themselves.
+
+        Returns:
+            List[List[str]]: Sorted members of each cycle, largest cycle first.
+        """
+        cycles = [
+            sorted(self._member_paths(component_id))
+            for component_id in range(self.component_count)
+            if self._cyclic[component_id]
+        ]
+        cycles.sort(key=lambda members: (-len(members), members[0]))
+        return cycles
+
+    def _sorted_paths(self, node_ids: List[int]) -> List[str]:
+        """
+        Return the paths of nodes in path order, comparing precomputed ranks instead of strings.
+        """
+        if self._rank is None:
+            self._rank = array("I", bytes(4 * len(self.graph)))
+            for rank, node_id in enumerate(sorted(range(len(self.graph)), key=self.graph.paths.__getitem__)):
+                self._rank[node_id] = rank
+        node_ids.sort(key=self._rank.__getitem__)
+        paths = self.graph.paths
+        return [paths[node_id] for node_id in node_ids]
+
+    def _closure(self, path: str, offsets: array, neighbours: array) -> List[str]:
+        start = self._component(path)
+        reached = bytearray(self.component_count)
+        reached[start] = 1
+        queue = [start]
+        for component_id in queue:
+            for neighbour in neighbours[offsets[component_id]:offsets[component_id + 1]]:
+                if not reached[neighbour]:
+                    reached[neighbour] = 1
+                    queue.append(neighbour)
+
+        member_offsets, members = self._member_offsets, self._members
+        node_ids = [
+            node_id
+            for component_id in queue
+            for node_id in members[member_offsets[component_id]:member_offsets[component_id + 1]]
+        ]
+        node_ids.remove(self.graph.index[path])
+        return self._sorted_paths(node_ids)
+
+    def dependencies(self, path: str) -> List[str]:
+        """
+        Return every file a file depends on, directly or transitively, the
+        other files of its cycle included.
+
+        Raises:
+            ValueError: If the file is not in the graph.
+        """
+        return self._closure(path, self._out_offsets, self._out_targets)
+
+    def dependents(self, path: str) -> List[str]:
+        """
+        Return every file depending on a file, directly or transitively: what
+        may break if it changes. Cycles are handled as in `dependencies`.
+
+        Raises:
+            ValueError: If the file is not in the graph.
+        """
+        return self._closure(path, self._in_offsets, self._in_sources)
+
+    def shortest_path(self, source: str, target: str) -> Optional[List[str]]:
+        """
+        Find a shortest chain of "Depends On" edges from one file to another.
+
+        A bidirectional breadth-first search grows whichever frontier is
+        smaller, forward from the source and backward from the target. Neither
+        side visits a file whose component lies outside the topological range
+        between the two files' components, since no such file is on a path
+        between them.
+
+        Returns:
+            Optional[List[str]]: The files along the path, both ends included, or None if there is none.
+
+        Raises:
+            ValueError: If either file is not in the graph.
+        """
+        source_component, target_component = self._component(source), self._component(target)
+        if source == target:
+            return [source]
+        if source_component > target_component:
+            return None
+
+        index, component_of = self.graph.index, self.component_of
+        out_offsets, out_targets = self.graph.forward_csr()
+        in_offsets, in_sources = self.graph._reverse()
+        start, goal = index[source], index[target]
+        # node -> previous node towards the source, and next node towards the target
+        forward, backward = {start: start}, {goal: goal}
+        forward_frontier, backward_frontier = [start], [goal]
+
+        while forward_frontier and backward_frontier:
+            if len(forward_frontier) <= len(backward_frontier):
+                frontier, forward_frontier = forward_frontier, []
+                for node_id in frontier:
+                    for neighbour in out_targets[out_offsets[node_id]:out_offsets[node_id + 1]]:
+                        if neighbour in forward or component_of[neighbour] > target_component:
+                            continue
+                        forward[neighbour] = node_id
+                        if neighbour in backward:
+                            return self._join(neighbour, forward, backward)
+                        forward_frontier.append(neighbour)
+            else:
+                frontier, backward_frontier = backward_frontier, []
+                for node_id in frontier:
+                    for neighbour in in_sources[in_offsets[node_id]:in_offsets[node_id + 1]]:
+                        if neighbour in backward or component_of[neighbour] < source_component:
+                            continue
+                        backward[neighbour] = node_id
+                        if neighbour in forward:
+                            return self._join(neighbour, forward, backward)
+                        backward_frontier.append(neighbour)
+        return None
+
+    def _join(self, meeting: int, forward: Dict[int, int], backward: Dict[int, int]) -> List[str]:
+        """
+        Assemble the path through the node where both searches met.
+        """
+        chain = [meeting]
+        while forward[chain[-1]] != chain[-1]:
+            chain.append(forward[chain[-1]])
+        chain.reverse()
+        while backward[chain[-1]] != chain[-1]:
+            chain.append(backward[chain[-1]])
+        paths = self.graph.paths
+        return [paths[node_id] for node_id in chain]
@@ -1,21 +1,154 @@
-def filter_source_files(files: dict, valid_files: list, extensions: list) -> tuple:
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.config.settings import DEFAULT_EXCLUDE_GLOBS, MAX_BLOB_SIZE, SOURCE_EXTENSIONS
+from app.utils.metrics import SKIPPED_FILES
+
+
+def glob_to_regex(pattern: str) -> str:
     """
-    Filter files and valid_files based on allowed extensions.
+    Translate a gitignore-style glob into a regular expression over repository paths.
+
+    `*` and `?` stay within a path segment, `**` spans segments and `[...]`
+    is a character class. A pattern without a slash matches at any depth, a
+    leading slash anchors it to the repository root and a trailing slash
+    matches everything below a directory.
 
     Args:
-        files (dict): Dictionary of file paths and their content.
-        valid_files (list): List of valid file paths.
-        extensions (list): List of file extensions to include.
+        pattern (str): The glob, e.g. "node_modules/", "src/**/*.ts" or "*.min.js".
 
     Returns:
-        tuple: Filtered files and valid_files.
+        str: A regular expression to match against whole paths.
+    """
+    directory = pattern.endswith("/")
+    pattern = pattern.rstrip("/")
+    anchored = "/" in pattern
+    pattern = pattern.lstrip("/")
+
+    parts = []
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith("**/", i):
+            parts.append("(?:.*/)?")
+            i += 3
+            continue
+        if pattern.startswith("**", i):
+            parts.append(".*")
+            i += 2
+            continue
+        if char == "*":
+            parts.append("[^/]*")
+        elif char == "?":
+            parts.append("[^/]")
+        elif char == "[" and "]" in pattern[i + 2:]:
+            end = pattern.index("]", i + 2)
+            body = pattern[i + 1:end]
+            if body.startswith("!"):
+                body = "^" + body[1:]
+            parts.append(f"[{body.replace(chr(92), chr(92) * 2)}]")
+            i = end
+        else:
+            parts.append(re.escape(char))
+        i += 1
+
+    regex = "".join(parts)
+    if not anchored:
+        regex = "(?:.*/)?" + regex
+    return regex + ("/.*" if directory else "")
+
+
+def compile_globs(patterns: Iterable[str]) -> Optional["re.Pattern"]:
+    """
+    Compile globs into a single pattern matching any of them, or None if there are none.
+    """
+    regexes = [f"(?:{glob_to_regex(pattern)})" for pattern in patterns if pattern]
+    return re.compile("|".join(regexes)) if regexes else None
+
+
+class TreeFilter:
     """
-    filtered_files = {
-        path: content
-        for path, content in files.items()
-        if any(path.endswith(ext) for ext in extensions)
-    }
-    filtered_valid_files = [
-        file for file in valid_files if any(file.endswith(ext) for ext in extensions)
-    ]
-    return filtered_files, filtered_valid_files
+    Select the blobs of a repository tree worth downloading, from tree metadata only.
+
+    A blob is kept when it has a source extension, is no larger than
+    `max_blob_size`, matches one of the `include` globs (if any) and none of
+    the `exclude` globs. Extensions are checked with a single `str.endswith`
+    and each glob list is compiled into one regular expression, so every path
+    is tested once per rule.
+    """
+
+    def __init__(
+        self,
+        include: Optional[Sequence[str]] = None,
+        exclude: Optional[Sequence[str]] = None,
+        default_excludes: bool = True,
+        max_blob_size: Optional[int] = None,
+        extensions: Sequence[str] = SOURCE_EXTENSIONS,
+    ):
+        """
+        Compile the filter rules.
+
+        Args:
+            include (Optional[Sequence[str]]): Globs a path must match; all paths if omitted.
+            exclude (Optional[Sequence[str]]): Globs of paths to skip.
+            default_excludes (bool): Whether to also skip DEFAULT_EXCLUDE_GLOBS (node_modules, vendor, dist...).
+            max_blob_size (Optional[int]): Largest blob in bytes to fetch; MAX_BLOB_SIZE if omitted, 0 for no limit.
+            extensions (Sequence[str]): File extensions to keep.
+        """
+        self.include = list(include or [])
+        self.exclude = list(exclude or []) + (list(DEFAULT_EXCLUDE_GLOBS) if default_excludes else [])
+        self.max_blob_size = MAX_BLOB_SIZE if max_blob_size is None else max_blob_size
+        self.extensions = tuple(extensions)
+        self._include = compile_globs(self.include)
+        self._exclude = compile_globs(self.exclude)
+
+    def is_excluded(self, path: str) -> bool:
+        return self._exclude is not None and self._exclude.fullmatch(path) is not None
+
+    def skip_reason(self, item: Dict) -> Optional[str]:
+        """
+        Return why a tree entry is skipped ("extension", "size", "not_included" or
+        "excluded"), or None if it should be fetched.
+        """
+        path = item["path"]
+        if not path.endswith(self.extensions):
+            return "extension"
+        if self.max_blob_size and (item.get("size") or 0) > self.max_blob_size:
+            return "size"
+        if self._include is not None and self._include.fullmatch(path) is None:
+            return "not_included"
+        if self.is_excluded(path):
+            return "excluded"
+        return None
+
+    def select(self, tree: List[Dict]) -> Tuple[List[str], Dict[str, int]]:
+        """
+        Pick the source blobs of a GitHub tree listing.
+
+        Args:
+            tree (List[Dict]): Tree entries with "path", "type" and "size".
+
+        Returns:
+            Tuple[List[str], Dict[str, int]]: Paths of the blobs to fetch, and the
+            number of skipped blobs per reason (also counted in SKIPPED_FILES).
+        """
+        selected = []
+        skipped: Dict[str, int] = {}
+        for item in tree:
+            if item["type"] != "blob":
+                continue
+            reason = self.skip_reason(item)
+            if reason is None:
+                selected.append(item["path"])
+            else:
+                skipped[reason] = skipped.get(reason, 0) + 1
+
+        for reason, count in skipped.items():
+            SKIPPED_FILES.inc(count, reason=reason)
+        return selected, skipped
+
+    def to_dict(self) -> Dict:
+        return {
+            "include": self.include,
+            "exclude": self.exclude,
+            "max_blob_size": self.max_blob_size,
+        }
@@ -0,0 +1,256 @@
+import json
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate, chain, pairwise
+from typing import Dict, List, Union
+from app.utils.compact_graph import CompactGraph, GraphIndex
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame
+except ImportError:
+    lz4 = None
+
+# Layout, all integers little-endian:
+#   header  MAGIC | version (u8) | compression ID (u8)
+#   body    node count, edge count, path table size (3 x u32)
+#           path table: UTF-8 paths joined by NUL
+#           out-degree of each node
+#           edge targets, each stored as the difference from the previous one
+# Both integer arrays are prefixed with their array typecode (u8) and use the
+# narrowest width that fits their values, so local edges cost one or two bytes.
+# The body is compressed as a whole. Only "Depends On" edges are stored; "Used By"
+# is their reverse and is rebuilt when first needed.
+# A graph index (INDEX_MAGIC) has the same body followed by the component ID of
+# each node, packed like the other arrays.
+MAGIC = b"DMAP"
+INDEX_MAGIC = b"DIDX"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sBB")
+_COUNTS = struct.Struct("<III")
+
+COMPRESSION_IDS = {"none": 0, "zlib": 1, "zstd": 2, "lz4": 3}
+_PACKAGES = {"zstd": "zstandard", "lz4": "lz4"}
+
+
+def _compressor(name: str):
+    if name == "zlib":
+        return zlib.compress
+    if name == "zstd" and zstandard is not None:
+        return zstandard.ZstdCompressor(level=3).compress
+    if name == "lz4" and lz4 is not None:
+        return lz4.frame.compress
+    return None
+
+
+def _decompressor(name: str):
+    if name == "zlib":
+        return zlib.decompress
+    if name == "zstd" and zstandard is not None:
+        return zstandard.ZstdDecompressor().decompress
+    if name == "lz4" and lz4 is not None:
+        return lz4.frame.decompress
+    return None
+
+
+def check_compression(compression: str):
+    """
+    Check that a compression setting is supported and usable here. Called at
+    startup for the configured one, so a missing library fails the process
+    instead of the first map saved.
+
+    Raises:
+        ValueError: If the compression is unknown.
+        RuntimeError: If the library it needs is not installed.
+    """
+    if compression not in COMPRESSION_IDS:
+        raise ValueError(f"Unsupported compression: {compression}")
+    if compression != "none" and _compressor(compression) is None:
+        raise RuntimeError(f"{compression} compression requires the {_PACKAGES[compression]} package.")
+
+
+def available_compressions() -> List[str]:
+    """
+    List the compression settings usable in this environment.
+    """
+    return [name for name in COMPRESSION_IDS if name == "none" or _compressor(name) is not None]
+
+
+def _little_endian(values: array) -> array:
+    if sys.byteorder != "little":
+        values.byteswap()
+    return values
+
+
+def _pack_integers(values: array, signed: bool) -> bytes:
+    """
+    Serialize integers with the narrowest array typecode that holds them all.
+    """
+    low, high = (min(values), max(values)) if values else (0, 0)
+    for typecode in ("bhi" if signed else "BHI"):
+        bits = array(typecode).itemsize * 8
+        if signed and -(1 << bits - 1) <= low and high < 1 << bits - 1:
+            break
+        if not signed and high < 1 << bits:
+            break
+    return typecode.encode() + _little_endian(array(typecode, values)).tobytes()
+
+
+def _unpack_integers(body: memoryview, position: int, count: int):
+    """
+    Read an array written by `_pack_integers`.
+
+    Returns:
+        Tuple[array, int]: The values and the position right after them.
+    """
+    values = array(chr(body[position]))
+    end = position + 1 + values.itemsize * count
+    values.frombytes(body[position + 1:end])
+    return _little_endian(values), end
+
+
+def is_encoded(data: bytes) -> bool:
+    """
+    Check whether stored bytes use the binary format rather than JSON.
+    """
+    return data[:len(MAGIC)] == MAGIC
+
+
+def _encode(magic: bytes, compression: str, paths: List[str], degrees: array, deltas: array, *extra: bytes) -> bytes:
+    """
+    Pack a graph body, followed by `extra` sections, behind the header.
+    """
+    check_compression(compression)
+    compress = None if compression == "none" else _compressor(compression)
+
+    table = "\0".join(paths).encode("utf-8")
+    body = b"".join([
+        _COUNTS.pack(len(paths), len(deltas), len(table)),
+        table,
+        _pack_integers(degrees, signed=False),
+        _pack_integers(deltas, signed=True),
+        *extra,
+    ])
+    if compress is not None:
+        body = compress(body)
+    return _HEADER.pack(magic, FORMAT_VERSION, COMPRESSION_IDS[compression]) + body
+
+
+def _decode(data: bytes, magic: bytes):
+    """
+    Decompress a body written by `_encode` and read its graph.
+
+    Returns:
+        Tuple[CompactGraph, memoryview, int]: The graph, the body and the position after the graph.
+    """
+    found, version, compression_id = _HEADER.unpack_from(data)
+    if found != magic or version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported dependency map format (version {version}).")
+    compression = next((name for name, value in COMPRESSION_IDS.items() if value == compression_id), None)
+    body = memoryview(data)[_HEADER.size:]
+    if compression != "none":
+        decompress = _decompressor(compression) if compression else None
+        if decompress is None:
+            raise ValueError(f"Cannot decode dependency map: {compression or compression_id} compression unavailable.")
+        body = memoryview(decompress(body))
+
+    node_count, edge_count, table_size = _COUNTS.unpack_from(body)
+    position = _COUNTS.size
+    table = bytes(body[position:position + table_size]).decode("utf-8")
+    paths = table.split("\0") if node_count else []
+    position += table_size
+
+    degrees, position = _unpack_integers(body, position, node_count)
+    deltas, position = _unpack_integers(body, position, edge_count)
+
+    out_offsets = array("I", accumulate(degrees, initial=0))
+    out_targets = array("I", accumulate(deltas))
+    return CompactGraph.from_csr(paths, out_offsets, out_targets), body, position
+
+
+def encode_dependency_map(dependency_map: Dict[str, Dict[str, List[str]]], compression: str = "zstd") -> bytes:
+    """
+    Encode an exported dependency map in the compact binary format.
+
+    Each path is stored once; edges are integer IDs. The compression library
+    must be installed (see check_compression).
+
+    Args:
+        dependency_map (Dict[str, Dict[str, List[str]]]): Map as produced by `export_graph`.
+        compression (str): "zstd", "lz4", "zlib" or "none".
+
+    Returns:
+        bytes: The encoded map.
+    """
+    paths = list(dependency_map)
+    index = dict(zip(paths, range(len(paths))))
+    degrees, deltas = array("I"), array("i")
+    previous = 0
+    for path in list(paths):
+        depends_on = dependency_map[path].get("Depends On", [])
+        degrees.append(len(depends_on))
+        for dependency in depends_on:
+            target = index.get(dependency)
+            if target is None:
+                target = index[dependency] = len(paths)
+                paths.append(dependency)
+            deltas.append(target - previous)
+            previous = target
+    # Dependencies that are not keys themselves have no outgoing edges
+    degrees.extend([0] * (len(paths) - len(degrees)))
+    return _encode(MAGIC, compression, paths, degrees, deltas)
+
+
+def decode_dependency_map(data: bytes) -> CompactGraph:
+    """
+    Decode a binary dependency map into a CompactGraph without materializing
+    the per-node lists; index it like the exported map or call `to_dependency_map`.
+
+    Raises:
+        ValueError: If the data is not a supported map or needs a missing compression library.
+    """
+    return _decode(data, MAGIC)[0]
+
+
+def encode_graph_index(graph_index: GraphIndex, compression: str = "zstd") -> bytes:
+    """
+    Encode a graph and its strongly connected components.
+
+    Args:
+        graph_index (GraphIndex): The index to store.
+        compression (str): "zstd", "lz4", "zlib" or "none".
+
+    Returns:
+        bytes: The encoded index.
+    """
+    offsets, targets = graph_index.graph.forward_csr()
+    degrees = array("I", (end - start for start, end in pairwise(offsets)))
+    deltas = array("i", (target - previous for previous, target in pairwise(chain((0,), targets))))
+    components = _pack_integers(graph_index.component_of, signed=False)
+    return _encode(INDEX_MAGIC, compression, graph_index.graph.paths, degrees, deltas, components)
+
+
+def decode_graph_index(data: bytes) -> GraphIndex:
+    """
+    Decode an index written by `encode_graph_index`.
+
+    Raises:
+        ValueError: If the data is not a supported index or needs a missing compression library.
+    """
+    graph, body, position = _decode(data, INDEX_MAGIC)
+    component_of, _ = _unpack_integers(body, position, len(graph))
+    return GraphIndex(graph, component_of)
+
+
+def load_dependency_map(data: bytes) -> Union[CompactGraph, Dict[str, Dict[str, List[str]]]]:
+    """
+    Read a stored dependency map in either format: a CompactGraph for binary
+    maps, a plain dict for JSON ones.
+    """
+    return decode_dependency_map(data) if is_encoded(data) else json.loads(data)
@@ -0,0 +1,196 @@
+import bisect
+import logging
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric(ABC):
+    """
+    Base class for labelled, thread-safe metrics rendered in the Prometheus text format.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            lines.extend(self._samples())
+        return lines
+
+    @abstractmethod
+    def _samples(self) -> Iterator[str]:
+        """
+        Yield the sample lines of the metric; called with the lock held.
+        """
+        pass
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count.
+    """
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {} if labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> Iterator[str]:
+        for key, value in self._values.items():
+            yield f"{self.name}{_format_labels(list(zip(self.labelnames, key)))} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values over fixed buckets, plus their sum and count.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: non-cumulative bucket counts (last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+
+    def sum(self, **labels: str) -> float:
+        entry = self._values.get(self._key(labels))
+        return entry[1][0] if entry else 0.0
+
+    def _samples(self) -> Iterator[str]:
+        for key, (counts, total) in self._values.items():
+            labels = list(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                yield f"{self.name}_bucket{_format_labels(labels + [('le', le)])} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(labels)} {_format_value(total[0])}"
+            yield f"{self.name}_count{_format_labels(labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    """
+    Collection of metrics rendered together for the /metrics endpoint.
+    """
+
+    def __init__(self):
+        self.metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self.metrics:
+            raise ValueError(f"Metric {metric.name} is already registered.")
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self.metrics.values() for line in metric.render()) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.register(Histogram(
+    "repo_analyzer_stage_seconds", "Duration of analysis pipeline stages.", ["stage"], buckets=STAGE_BUCKETS
+))
+FETCHED_BYTES = REGISTRY.register(Counter(
+    "repo_analyzer_github_fetched_bytes_total", "Bytes downloaded from GitHub."
+))
+PARSE_ERRORS = REGISTRY.register(Counter(
+    "repo_analyzer_parse_errors_total", "Files whose parser raised an error."
+))
+UNRESOLVED_IMPORTS = REGISTRY.register(Counter(
+    "repo_analyzer_unresolved_imports_total", "Raw dependencies that did not resolve to a repository file."
+))
+SKIPPED_FILES = REGISTRY.register(Counter(
+    "repo_analyzer_tree_files_skipped_total", "Tree blobs not fetched, by reason.", ["reason"]
+))
+FUZZY_MATCH_CALLS = REGISTRY.register(Counter(
+    "repo_analyzer_fuzzy_match_calls_total", "Dependencies that needed fuzzy namespace matching."
+))
+BLOBS_COLLECTED = REGISTRY.register(Counter(
+    "repo_analyzer_blobs_collected_total", "Unreferenced file content blobs deleted by garbage collection."
+))
+BUNDLE_CACHE_REQUESTS = REGISTRY.register(Counter(
+    "repo_analyzer_bundle_cache_requests_total", "Bundle cache lookups by tier and result.", ["tier", "result"]
+))
+HTTP_REQUEST_SECONDS = REGISTRY.register(Histogram(
+    "repo_analyzer_http_request_seconds", "HTTP request latency by route.", ["method", "route", "status"]
+))
+
+
+@contextmanager
+def stage_timer(stage: str, timings: Optional[Dict[str, float]] = None):
+    """
+    Time a pipeline stage: observe it in STAGE_SECONDS, log it, and add it to
+    `timings` when given (repeated stages accumulate).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start, timings)
+
+
+def record_stage(stage: str, seconds: float, timings: Optional[Dict[str, float]] = None):
+    """
+    Record a stage duration measured elsewhere, e.g. inside a worker process.
+    """
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+    logger.debug("Stage %s took %.3fs", stage, seconds)
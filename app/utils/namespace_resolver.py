@@ -0,0 +1,135 @@
+import heapq
+from collections import Counter, defaultdict
+from difflib import SequenceMatcher
+from math import ceil
+from typing import Dict, List, Optional
+
+
+class NamespaceResolver:
+    """
+    Resolve raw dependency strings to file paths using an indexed namespace mapping.
+
+    Lookups run in order: exact match, memoized result, then fuzzy matching over a
+    pruned candidate set. Candidates come from a last-segment suffix index and an
+    n-gram inverted index (keys sharing the most n-grams first), restricted to the
+    key lengths that can reach the cutoff. They are scored with the same rules as
+    ``difflib.get_close_matches``; only weak matches that share few n-grams with
+    the dependency can come out differently from a full difflib scan.
+    """
+
+    NGRAM_SIZE = 3
+    MIN_NGRAM_OVERLAP = 0.3
+    MAX_CANDIDATES = 64
+
+    def __init__(self, namespace_mapping: Dict[str, str], cutoff: float = 0.6):
+        """
+        Build the suffix and n-gram indexes for a namespace mapping.
+
+        Args:
+            namespace_mapping (Dict[str, str]): Logical namespaces mapped to file paths.
+            cutoff (float): Minimum similarity ratio for a fuzzy match.
+        """
+        self.namespace_mapping = namespace_mapping
+        self.cutoff = cutoff
+        self.fuzzy_calls = 0
+
+        self._keys: List[str] = list(namespace_mapping)
+        self._key_lengths: List[int] = [len(key) for key in self._keys]
+        self._suffix_index: Dict[str, List[int]] = defaultdict(list)
+        self._ngram_index: Dict[str, List[int]] = defaultdict(list)
+        self._memo: Dict[str, Optional[str]] = {}
+
+        for key_id, key in enumerate(self._keys):
+            self._suffix_index[key.rsplit(".", 1)[-1]].append(key_id)
+            for gram in self._ngrams(key):
+                self._ngram_index[gram].append(key_id)
+
+    def _ngrams(self, value: str) -> set:
+        """
+        Split a string into its distinct n-grams (the whole string if it is shorter).
+        """
+        size = self.NGRAM_SIZE
+        if len(value) <= size:
+            return {value}
+        return {value[i:i + size] for i in range(len(value) - size + 1)}
+
+    def resolve(self, dependency: str) -> Optional[str]:
+        """
+        Resolve a dependency to a file path.
+
+        Args:
+            dependency (str): The raw dependency string.
+
+        Returns:
+            Optional[str]: The resolved file path or None if not found.
+        """
+        resolved = self.namespace_mapping.get(dependency)
+        if resolved is not None:
+            return resolved
+
+        if dependency in self._memo:
+            return self._memo[dependency]
+
+        match = self._fuzzy_match(dependency)
+        resolved = self.namespace_mapping[match] if match is not None else None
+        self._memo[dependency] = resolved
+        return resolved
+
+    def _candidates(self, dependency: str) -> List[int]:
+        """
+        Collect key ids worth scoring for a dependency.
+        """
+        length = len(dependency)
+        min_length = length * self.cutoff / (2 - self.cutoff)
+        max_length = length * (2 - self.cutoff) / self.cutoff
+
+        grams = self._ngrams(dependency)
+        required = max(1, ceil(len(grams) * self.MIN_NGRAM_OVERLAP))
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._ngram_index.get(gram, ()))
+
+        def in_range(key_id: int) -> bool:
+            return min_length <= self._key_lengths[key_id] <= max_length
+
+        candidates = set(filter(in_range, self._suffix_index.get(dependency.rsplit(".", 1)[-1], ())))
+        eligible = [(count, key_id) for key_id, count in shared.items() if count >= required]
+        for _, key_id in heapq.nlargest(self.MAX_CANDIDATES * 4, eligible):
+            if len(candidates) >= self.MAX_CANDIDATES:
+                break
+            if in_range(key_id):
+                candidates.add(key_id)
+
+        return list(candidates)
+
+    def _fuzzy_match(self, dependency: str) -> Optional[str]:
+        """
+        Return the closest key for a dependency, scored like difflib.get_close_matches.
+
+        Candidates are scored in descending order of their quick_ratio upper bound, so
+        the full ratio is only computed while it can still beat the best match.
+        """
+        self.fuzzy_calls += 1
+        matcher = SequenceMatcher()
+        matcher.set_seq2(dependency)
+
+        bounded = []
+        for key_id in self._candidates(dependency):
+            key = self._keys[key_id]
+            matcher.set_seq1(key)
+            if matcher.real_quick_ratio() >= self.cutoff:
+                upper = matcher.quick_ratio()
+                if upper >= self.cutoff:
+                    bounded.append((upper, key))
+        bounded.sort(reverse=True)
+
+        best = None
+        for upper, key in bounded:
+            if best is not None and upper < best[0]:
+                break
+            matcher.set_seq1(key)
+            score = matcher.ratio()
+            if score >= self.cutoff and (best is None or (score, key) > best):
+                best = (score, key)
+
+        return best[1] if best else None
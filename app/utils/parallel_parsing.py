@@ -0,0 +1,101 @@
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from app.config.settings import PARSE_CHUNK_SIZE, PARSE_PARALLEL_THRESHOLD, PARSE_WORKERS
+from app.utils.metrics import PARSE_ERRORS, record_stage
+from app.utils.parsing_utils import PARSERS
+
+logger = logging.getLogger(__name__)
+
+# Raw dependencies of a chunk, number of files whose parser failed, and seconds spent parsing
+ChunkResult = Tuple[Dict[str, List[str]], int, float]
+
+
+def _parse_file(file_path: str, content: str) -> Tuple[Optional[List[str]], bool]:
+    """
+    Parse a single file, reporting whether its parser failed.
+    """
+    parser = PARSERS.get(f".{file_path.split('.')[-1]}")
+    if not parser:
+        logger.debug("Skipping unsupported file: %s", file_path)
+        return None, False
+
+    try:
+        return parser.parse(content), False
+    except Exception as e:
+        logger.debug("Error parsing %s: %s", file_path, e)
+        return [], True
+
+
+def parse_chunk(chunk: List[Tuple[str, str]]) -> ChunkResult:
+    """
+    Parse a chunk of (file_path, content) pairs. Runs inside pool workers, so
+    error counts and timings are returned for the parent process to record.
+
+    Args:
+        chunk (List[Tuple[str, str]]): File paths and their content.
+
+    Returns:
+        ChunkResult: Raw dependencies of every supported file in the chunk, the
+        number of parse errors and the time spent parsing.
+    """
+    start = time.perf_counter()
+    raw_dependencies = {}
+    errors = 0
+    for file_path, content in chunk:
+        dependencies, failed = _parse_file(file_path, content)
+        errors += failed
+        if dependencies is not None:
+            raw_dependencies[file_path] = dependencies
+    return raw_dependencies, errors, time.perf_counter() - start
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[list]:
+    """
+    Split an iterable into lists of at most `size` items.
+    """
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def parse_files(
+    files: Dict[str, str],
+    executor: Optional[Executor] = None,
+    max_workers: int = PARSE_WORKERS,
+    threshold: int = PARSE_PARALLEL_THRESHOLD,
+    chunk_size: int = PARSE_CHUNK_SIZE,
+    timings: Optional[Dict[str, float]] = None,
+) -> Dict[str, List[str]]:
+    """
+    Parse raw dependencies for all files, fanning out to a process pool for large inputs.
+
+    Args:
+        files (Dict[str, str]): A dictionary of file paths and their content.
+        executor (Optional[Executor]): Shared pool to use; a temporary one is created if omitted.
+        max_workers (int): Worker count for the temporary pool.
+        threshold (int): File count below which parsing stays serial.
+        chunk_size (int): Number of files shipped to a worker per task.
+        timings (Optional[Dict[str, float]]): Stage timings the parse time is added to.
+
+    Returns:
+        Dict[str, List[str]]: Raw dependencies keyed by file path.
+    """
+    if len(files) < threshold or (executor is None and max_workers <= 1):
+        results = [parse_chunk(list(files.items()))]
+    elif executor is not None:
+        results = executor.map(parse_chunk, iter_chunks(files.items(), chunk_size))
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(parse_chunk, iter_chunks(files.items(), chunk_size)))
+
+    raw_dependencies = {}
+    parse_seconds = 0.0
+    for dependencies, errors, seconds in results:
+        raw_dependencies.update(dependencies)
+        PARSE_ERRORS.inc(errors)
+        parse_seconds += seconds
+    record_stage("parse", parse_seconds, timings)
+    return raw_dependencies
@@ -1,20 +1,67 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple, Union
 import re
 import ast
 
+# Bump whenever parser output changes so cached parse results are not reused
+PARSER_VERSION = 2
+
+# File content as text, or as raw UTF-8 bytes to skip decoding the whole file
+Source = Union[str, bytes, bytearray, memoryview]
+
+# Characters str.splitlines() breaks on, so whole-buffer patterns see the same lines
+_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+_BYTE_LINE_BREAKS = "\n\r\x0b\x0c\x1c\x1d\x1e"
+
+
+def _compile_line_patterns(template: str, binary: bool) -> Tuple[re.Pattern, re.Pattern]:
+    """
+    Compile a single-line pattern so it can run once over a whole buffer.
+
+    In `template`, `{ws}` is whitespace that does not end the line, `{any}` any
+    character of the line, `{breaks}` the line break characters and `{word}`
+    the content of an identifier character class.
+
+    Rather than anchoring each match with a lookbehind, which the regex engine
+    has to try at every position, the buffer pattern starts with the line break
+    that precedes the line. That leading character class lets the engine skip
+    straight from one line break to the next; the first line, which has none,
+    is matched separately.
+
+    For bytes, non-ASCII bytes count as identifier characters so UTF-8 names
+    match as they do in text. Only the ASCII line breaks and whitespace are
+    recognized: U+0085, U+2028 and U+2029 do not end a line and non-breaking
+    spaces do not count as whitespace, unlike for text input.
+
+    Returns:
+        Tuple[re.Pattern, re.Pattern]: The first-line pattern and the pattern
+            for the lines after a line break.
+    """
+    breaks = _BYTE_LINE_BREAKS if binary else _LINE_BREAKS
+    body = template.format(
+        ws="[ \\t\x1f]" if binary else f"[^\\S{breaks}]",
+        any=f"[^{breaks}]",
+        breaks=breaks,
+        word="\\w\x80-\xff" if binary else "\\w",
+    )
+    line = f"[{breaks}]{body}"
+    if binary:
+        return re.compile(body.encode("latin-1")), re.compile(line.encode("latin-1"))
+    return re.compile(body), re.compile(line)
+
+
 class BaseParser(ABC):
     """
     Abstract base class for all parsers.
     """
 
     @abstractmethod
-    def parse(self, file_content: str) -> List[str]:
+    def parse(self, file_content: Source) -> List[str]:
         """
         Parse a file's content and extract dependencies.
 
         Args:
-            file_content (str): Content of the file as a string.
+            file_content (Source): Content of the file as a string or UTF-8 bytes.
 
         Returns:
             List[str]: A list of dependencies.
@@ -22,74 +69,230 @@ class BaseParser(ABC):
         pass
 
 
+class LineRegexParser(BaseParser):
+    """
+    Base class for parsers matching one directive per line.
+
+    Subclasses set `TEMPLATE` (see `_compile_line_patterns`) with the
+    dependency in its only group. The patterns are compiled once per class and
+    applied in a single pass over the buffer instead of splitting it into
+    lines; bytes and memoryviews are scanned without decoding, only the
+    matches are decoded.
+    """
+
+    TEMPLATE = ""
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.PATTERNS = _compile_line_patterns(cls.TEMPLATE, binary=False)
+        cls.BYTES_PATTERNS = _compile_line_patterns(cls.TEMPLATE, binary=True)
+
+    def parse(self, file_content: Source) -> List[str]:
+        text = isinstance(file_content, str)
+        first_line, lines = self.PATTERNS if text else self.BYTES_PATTERNS
+        imports = lines.findall(file_content)
+        match = first_line.match(file_content)
+        if match:
+            imports.insert(0, match.group(1))
+        if text:
+            return imports
+        return [dependency.decode("utf-8", errors="replace") for dependency in imports]
+
+
 class PythonParser(BaseParser):
     """
     Parse Python files to extract dependencies (imports).
+
+    Relative imports keep their leading dots (`from ..core import x` gives
+    "..core", `from . import a` gives ".a"); the analyzer resolves them against
+    the importing file.
+
+    A lightweight scanner finds import statements without building an AST: it
+    skips strings and comments and only looks at statements starting a line or
+    following `;` or `:`, so imports inside functions, `try` blocks and
+    one-line compound statements are found too. Statements it cannot read with
+    certainty (e.g. `import a, \\` continued on the next line, or spaces
+    around dots) send the file to `ast`; files that do not parse still return
+    what the scanner found.
     """
 
-    def parse(self, file_content: str) -> List[str]:
-        tree = ast.parse(file_content)
+    # Branches start with a literal so the regex engine can jump between candidates
+    TOKEN = re.compile(
+        r"""#|"|'|\n[ \t\f]*(?:import|from)\b|\r[ \t\f]*(?:import|from)\b"""
+        r"""|;[ \t\f]*(?:import|from)\b|:[ \t\f]*(?:import|from)\b"""
+    )
+    FIRST_STATEMENT = re.compile(r"\ufeff?[ \t\f]*(?:import|from)\b")
+    STRING_ENDS = {
+        '"': re.compile(r'[^\\"\r\n]*(?:\\(?:\r\n|[\s\S])[^\\"\r\n]*)*"'),
+        "'": re.compile(r"[^\\'\r\n]*(?:\\(?:\r\n|[\s\S])[^\\'\r\n]*)*'"),
+        '"""': re.compile(r'[^\\"]*(?:(?:\\[\s\S]|"(?!""))[^\\"]*)*"""'),
+        "'''": re.compile(r"[^\\']*(?:(?:\\[\s\S]|'(?!''))[^\\']*)*'''"),
+    }
+    _END = r"[ \t\f]*(?=[;#\r\n]|$)"
+    _NAME = r"\w+(?:\.\w+)*"
+    IMPORT = re.compile(
+        rf"[ \t\f]+({_NAME}(?:[ \t\f]+as[ \t\f]+\w+)?(?:[ \t\f]*,[ \t\f]*{_NAME}(?:[ \t\f]+as[ \t\f]+\w+)?)*){_END}"
+    )
+    FROM = re.compile(
+        rf"[ \t\f]*(\.*)[ \t\f]*({_NAME})?[ \t\f]+import(?:[ \t\f]*\(([^()\\]*)\)|[ \t\f]+((?:[^;#\r\n()\\]|\\(?:\r\n|[\r\n]))+?)){_END}"
+    )
+    ALIAS = re.compile(r"[ \t\f]+as[ \t\f]+\w+")
+
+    def parse(self, file_content: Source) -> List[str]:
+        if isinstance(file_content, (bytes, bytearray, memoryview)):
+            try:
+                text = bytes(file_content).decode("utf-8")
+            except UnicodeDecodeError:
+                return self._parse_ast(bytes(file_content))
+        else:
+            text = file_content
+
+        imports, complete = self._scan(text)
+        if complete:
+            return imports
+        try:
+            return self._parse_ast(file_content if isinstance(file_content, (str, bytes)) else bytes(file_content))
+        except SyntaxError:
+            return imports
+
+    def _scan(self, text: str) -> Tuple[List[str], bool]:
+        """
+        Collect import statements with the scanner.
+
+        Returns:
+            Tuple[List[str], bool]: The imports found, in source order, and
+            whether every import statement could be read.
+        """
+        imports: List[str] = []
+        complete = True
+        match = self.FIRST_STATEMENT.match(text)
+        pos = 0
+        if match is None:
+            match = self.TOKEN.search(text)
+
+        while match is not None:
+            token = match.group()
+            if token == "#":
+                end = text.find("\n", match.end())
+                pos = len(text) if end == -1 else end
+            elif token in ("'", '"'):
+                quote = token * 3 if text.startswith(token * 3, match.start()) else token
+                end = self.STRING_ENDS[quote].match(text, match.start() + len(quote))
+                if end is None:
+                    # Unterminated string: the rest of the file cannot be scanned reliably
+                    return imports, False
+                pos = end.end()
+            else:
+                pos = self._statement(text, match.end(), token.endswith("t"), imports)
+                if pos is None:
+                    complete = False
+                    pos = match.end()
+            match = self.TOKEN.search(text, pos)
+
+        return imports, complete
+
+    def _statement(self, text: str, pos: int, is_import: bool, imports: List[str]) -> Optional[int]:
+        """
+        Read one `import` or `from` statement whose keyword ends at `pos`.
+
+        Returns:
+            Optional[int]: Where the statement ends, or None if it could not be read.
+        """
+        if is_import:
+            match = self.IMPORT.match(text, pos)
+            if match is None:
+                return None
+            imports.extend(self.ALIAS.sub("", name).strip() for name in match.group(1).split(","))
+            return match.end()
+
+        match = self.FROM.match(text, pos)
+        if match is None:
+            return None
+        dots, module, parenthesized, names = match.groups()
+        if not dots and not module:
+            return None
+        if module:
+            imports.append(dots + module)
+            return match.end()
+
+        # `from . import a, b` imports the modules a and b of the package; a
+        # comment in a parenthesized list may hide a ")", so leave those to ast
+        if parenthesized is not None:
+            if "#" in parenthesized:
+                return None
+            names = parenthesized
+        for name in names.replace("\\", "").split(","):
+            name = self.ALIAS.sub("", name).strip()
+            if name == "*":
+                imports.append(dots)
+            elif name:
+                imports.append(dots + name)
+        return match.end()
+
+    def _parse_ast(self, file_content: Union[str, bytes]) -> List[str]:
+        """
+        Collect imports from the syntax tree, in source order.
+        """
+        nodes = [
+            node for node in ast.walk(ast.parse(file_content))
+            if isinstance(node, (ast.Import, ast.ImportFrom))
+        ]
+        nodes.sort(key=lambda node: (node.lineno, node.col_offset))
+
         imports = []
-        for node in ast.walk(tree):
+        for node in nodes:
             if isinstance(node, ast.Import):
-                imports.extend([alias.name for alias in node.names])
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    imports.append(node.module)
+                imports.extend(alias.name for alias in node.names)
+            elif node.module:
+                imports.append("." * node.level + node.module)
+            else:
+                imports.extend(
+                    "." * node.level if alias.name == "*" else "." * node.level + alias.name
+                    for alias in node.names
+                )
         return imports
 
 
-class DotNetParser(BaseParser):
+class DotNetParser(LineRegexParser):
     """
     Parse .NET C# files to extract dependencies (using statements).
     """
 
-    def parse(self, file_content: str) -> List[str]:
-        dependencies = []
-        for line in file_content.splitlines():
-            match = re.match(r"^\s*using\s+([\w.]+);", line)
-            if match:
-                dependencies.append(match.group(1))
-        return dependencies
+    TEMPLATE = r"{ws}*using{ws}+([{word}.]+);"
 
 
-class JavaScriptParser(BaseParser):
+class JavaScriptParser(LineRegexParser):
     """
     Parse JavaScript/TypeScript files to extract dependencies (import statements).
     """
 
-    def parse(self, file_content: str) -> List[str]:
-        dependencies = []
-        for line in file_content.splitlines():
-            match = re.match(r"^\s*import\s+.*\s+from\s+['\"](.+)['\"]", line)
-            if match:
-                dependencies.append(match.group(1))
-        return dependencies
+    TEMPLATE = r"""{ws}*import{ws}+{any}*{ws}+from{ws}+['"]({any}+)['"]"""
 
 
-class JavaParser(BaseParser):
+class JavaParser(LineRegexParser):
     """
     Parse Java files to extract dependencies (import statements).
     """
 
-    def parse(self, file_content: str) -> List[str]:
-        dependencies = []
-        for line in file_content.splitlines():
-            match = re.match(r"^\s*import\s+([\w.]+);", line)
-            if match:
-                dependencies.append(match.group(1))
-        return dependencies
+    TEMPLATE = r"{ws}*import{ws}+([{word}.]+);"
 
 
-class CppParser(BaseParser):
+class CppParser(LineRegexParser):
     """
     Parse C++ files to extract dependencies (#include directives).
     """
 
-    def parse(self, file_content: str) -> List[str]:
-        dependencies = []
-        for line in file_content.splitlines():
-            match = re.match(r'^\s*#include\s+[<"]([^">]+)[">]', line)
-            if match:
-                dependencies.append(match.group(1))
-        return dependencies
+    TEMPLATE = r'{ws}*#include{ws}+[<"]([^">{breaks}]+)[">]'
+
+
+# Parser instances keyed by file extension
+PARSERS = {
+    ".py": PythonParser(),
+    ".cs": DotNetParser(),
+    ".js": JavaScriptParser(),
+    ".ts": JavaScriptParser(),
+    ".tsx": JavaScriptParser(),
+    ".cpp": CppParser(),
+    ".h": CppParser(),
+    ".java": JavaParser(),
+}
@@ -0,0 +1,283 @@
+import json
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from app.config.settings import CPP_INCLUDE_DIRS
+
+# Bump whenever import resolution changes (here, in NamespaceResolver or in
+# DependencyAnalyzer) so resolved dependencies stored by earlier loads are not reused
+RESOLVER_VERSION = 2
+
+# Extensions tried, in order, for extensionless JS/TS specifiers (as TypeScript does)
+JS_EXTENSIONS = (".ts", ".tsx", ".d.ts", ".js", ".jsx", ".mjs", ".cjs")
+JS_IMPORTERS = (".js", ".jsx", ".mjs", ".cjs", ".ts", ".tsx")
+CPP_IMPORTERS = (".c", ".cc", ".cpp", ".cxx", ".h", ".hh", ".hpp", ".hxx", ".inl")
+
+# Files whose compiler options configure JS/TS module resolution for their directory
+TS_CONFIG_NAMES = ("tsconfig.json", "jsconfig.json")
+
+_JSON_COMMENTS = re.compile(r'("(?:[^"\\]|\\.)*")|//[^\n]*|/\*[\s\S]*?\*/')
+_TRAILING_COMMAS = re.compile(r'("(?:[^"\\]|\\.)*")|,(\s*[}\]])')
+
+
+def is_ts_config(path: str) -> bool:
+    """
+    Whether a path is a tsconfig/jsconfig file, including ones only used through `extends`.
+    """
+    name = posixpath.basename(path)
+    return name.endswith(".json") and name.startswith(("tsconfig", "jsconfig"))
+
+
+def parse_ts_config(text: str) -> dict:
+    """
+    Parse a tsconfig.json, which may contain comments and trailing commas.
+    """
+    text = _JSON_COMMENTS.sub(lambda match: match.group(1) or "", text)
+    text = _TRAILING_COMMAS.sub(lambda match: match.group(1) or match.group(2), text)
+    return json.loads(text)
+
+
+def _join(directory: str, path: str) -> Optional[str]:
+    """
+    Join a relative path to a repository directory; None if it leaves the repository.
+    """
+    joined = posixpath.normpath(posixpath.join(directory, path))
+    if joined == ".":
+        return ""
+    if joined.startswith("../") or joined == ".." or joined.startswith("/"):
+        return None
+    return joined
+
+
+class TsConfig:
+    """
+    Module resolution options of one tsconfig.json, with paths made repository-relative.
+    """
+
+    def __init__(self, base_url: Optional[str], paths: Dict[str, List[str]], paths_base: str):
+        """
+        Args:
+            base_url (Optional[str]): Repository directory of `baseUrl`, if set.
+            paths (Dict[str, List[str]]): The `paths` mapping of patterns to substitutions.
+            paths_base (str): Directory the substitutions are relative to.
+        """
+        self.base_url = base_url
+        # (prefix, suffix or None for exact patterns, substitutions), longest prefix
+        # first as TypeScript matches them
+        self.patterns: List[Tuple[str, Optional[str], List[str]]] = []
+        for pattern, substitutions in paths.items():
+            prefix, star, suffix = pattern.partition("*")
+            joined = [_join(paths_base, substitution) for substitution in substitutions]
+            self.patterns.append((prefix, suffix if star else None, [path for path in joined if path is not None]))
+        self.patterns.sort(key=lambda entry: -len(entry[0]))
+
+    @classmethod
+    def load_all(cls, files: Dict[str, str]) -> Dict[str, "TsConfig"]:
+        """
+        Build the resolution options of every tsconfig.json/jsconfig.json.
+
+        Relative `extends` chains are followed within `files`; options set in a
+        config override the ones it extends, and `baseUrl`/`paths` stay relative
+        to the config that declares them. Unreadable configs are skipped.
+
+        Args:
+            files (Dict[str, str]): Content of the config files keyed by path.
+
+        Returns:
+            Dict[str, TsConfig]: Options keyed by the directory they apply to.
+        """
+        parsed = {}
+        for path, text in files.items():
+            try:
+                parsed[path] = parse_ts_config(text)
+            except ValueError:
+                continue
+
+        configs = {}
+        for path in parsed:
+            if posixpath.basename(path) not in TS_CONFIG_NAMES:
+                continue
+            base_url = paths = paths_base = None
+            seen = set()
+            current = path
+            while current in parsed and current not in seen:
+                seen.add(current)
+                directory = posixpath.dirname(current)
+                options = parsed[current].get("compilerOptions") or {}
+                if base_url is None and isinstance(options.get("baseUrl"), str):
+                    base_url = _join(directory, options["baseUrl"])
+                if paths is None and isinstance(options.get("paths"), dict):
+                    paths, paths_base = options["paths"], directory
+                extends = parsed[current].get("extends")
+                if not isinstance(extends, str) or not extends.startswith("."):
+                    break
+                current = _join(directory, extends if extends.endswith(".json") else f"{extends}.json")
+
+            if base_url is not None or paths:
+                # Since TypeScript 4.1 `paths` without `baseUrl` are relative to their config
+                base = base_url if base_url is not None else paths_base
+                configs[posixpath.dirname(path)] = cls(base_url, paths or {}, base)
+        return configs
+
+
+class PathResolver:
+    """
+    Resolve path-based imports against the importing file and the set of repository paths.
+
+    Covers relative Python imports (`..core.models`), JS/TS specifiers
+    (relative, `baseUrl` and tsconfig `paths`, with extension and `index`
+    probing; any other bare specifier is a package) and C++ includes (importer directory, include directories, then
+    the closest file ending with the included path). Every step is a set or
+    dict lookup, so these imports never reach the fuzzy namespace matcher.
+    """
+
+    def __init__(
+        self,
+        valid_files: Iterable[str],
+        ts_configs: Optional[Dict[str, TsConfig]] = None,
+        include_dirs: Sequence[str] = CPP_INCLUDE_DIRS,
+    ):
+        """
+        Index the repository paths.
+
+        Args:
+            valid_files (Iterable[str]): Paths of the repository files.
+            ts_configs (Optional[Dict[str, TsConfig]]): JS/TS resolution options keyed by directory.
+            include_dirs (Sequence[str]): Repository directories searched for C++ includes.
+        """
+        self.paths = set(valid_files)
+        self.ts_configs = ts_configs or {}
+        self.include_dirs = [directory.strip("/") for directory in include_dirs]
+        self._config_for_directory: Dict[str, Optional[TsConfig]] = {}
+
+        # Every trailing run of path segments of C/C++ files, for includes relative to unknown directories
+        self._suffixes: Dict[str, List[str]] = {}
+        for path in self.paths:
+            if path.endswith(CPP_IMPORTERS):
+                parts = path.split("/")
+                for i in range(len(parts)):
+                    self._suffixes.setdefault("/".join(parts[i:]), []).append(path)
+
+    def resolve(self, dependency: str, importer: str) -> Tuple[Optional[str], bool]:
+        """
+        Resolve an import relative to the file declaring it.
+
+        Args:
+            dependency (str): The raw dependency string.
+            importer (str): Path of the importing file.
+
+        Returns:
+            Tuple[Optional[str], bool]: The resolved path, and whether the import
+            is path-based. Path-based imports that do not resolve point outside
+            the repository and must not be matched by name.
+        """
+        if importer.endswith(".py"):
+            if dependency.startswith("."):
+                return self._resolve_python(dependency, importer), True
+        elif importer.endswith(JS_IMPORTERS):
+            return self._resolve_js(dependency, importer)
+        elif importer.endswith(CPP_IMPORTERS):
+            return self._resolve_include(dependency, importer), True
+        return None, False
+
+    def _first_existing(self, candidates: Iterable[Optional[str]]) -> Optional[str]:
+        for candidate in candidates:
+            if candidate in self.paths:
+                return candidate
+        return None
+
+    def _resolve_python(self, dependency: str, importer: str) -> Optional[str]:
+        """
+        One leading dot is the importer's package, each further dot one package up.
+
+        ".name" also comes from `from . import name`, where the name may be
+        defined in the package itself, so it falls back to the package's
+        `__init__.py`.
+        """
+        module = dependency.lstrip(".")
+        level = len(dependency) - len(module)
+        package = posixpath.dirname(importer)
+        base = _join(package, "/".join([".."] * (level - 1)) or ".")
+        if base is None:
+            return None
+        if not module:
+            return self._first_existing([posixpath.join(base, "__init__.py")])
+        stem = posixpath.join(base, module.replace(".", "/"))
+        candidates = [f"{stem}.py", f"{stem}/__init__.py"]
+        if "." not in module:
+            candidates.append(posixpath.join(base, "__init__.py"))
+        return self._first_existing(candidates)
+
+    def _js_candidates(self, path: Optional[str]) -> Iterable[Optional[str]]:
+        """
+        Files a JS/TS specifier can point to: itself, with an extension, or its index file.
+        """
+        if path is None:
+            return
+        yield path
+        stem, extension = posixpath.splitext(path)
+        if extension in (".js", ".jsx", ".mjs", ".cjs"):
+            # TypeScript sources are imported with the extension of their compiled output
+            yield from (stem + ts_extension for ts_extension in (".ts", ".tsx", ".mts", ".cts"))
+        yield from (path + extension for extension in JS_EXTENSIONS)
+        index = posixpath.join(path, "index") if path else "index"
+        yield from (index + extension for extension in JS_EXTENSIONS)
+
+    def _ts_config(self, directory: str) -> Optional[TsConfig]:
+        """
+        Return the options of the nearest tsconfig.json above a directory.
+        """
+        if directory in self._config_for_directory:
+            return self._config_for_directory[directory]
+        config = self.ts_configs.get(directory)
+        if config is None and directory:
+            config = self._ts_config(posixpath.dirname(directory))
+        self._config_for_directory[directory] = config
+        return config
+
+    def _resolve_js(self, specifier: str, importer: str) -> Tuple[Optional[str], bool]:
+        directory = posixpath.dirname(importer)
+        if specifier.startswith(("./", "../")) or specifier in (".", ".."):
+            return self._first_existing(self._js_candidates(_join(directory, specifier))), True
+        if specifier.startswith("/"):
+            return self._first_existing(self._js_candidates(_join("", specifier.lstrip("/")))), True
+
+        # Bare specifiers not mapped by a tsconfig are packages (node_modules, or
+        # ambient modules), so they are never matched by name either
+        config = self._ts_config(directory)
+        if config is None:
+            return None, True
+        for prefix, suffix, substitutions in config.patterns:
+            if suffix is None:
+                if specifier != prefix:
+                    continue
+                matched = ""
+            elif specifier.startswith(prefix) and specifier.endswith(suffix) and len(specifier) >= len(prefix) + len(suffix):
+                matched = specifier[len(prefix):len(specifier) - len(suffix)]
+            else:
+                continue
+            for substitution in substitutions:
+                resolved = self._first_existing(self._js_candidates(substitution.replace("*", matched, 1)))
+                if resolved:
+                    return resolved, True
+            return None, True
+
+        if config.base_url is not None:
+            resolved = self._first_existing(self._js_candidates(_join(config.base_url, specifier)))
+            if resolved:
+                return resolved, True
+        return None, True
+
+    def _resolve_include(self, include: str, importer: str) -> Optional[str]:
+        directory = posixpath.dirname(importer)
+        resolved = self._first_existing(
+            [_join(directory, include)] + [_join(include_dir, include) for include_dir in self.include_dirs] + [_join("", include)]
+        )
+        if resolved or include.startswith("../"):
+            return resolved
+
+        # Include directories outside the configured ones: take the matching file closest to the importer
+        candidates = self._suffixes.get(posixpath.normpath(include))
+        if not candidates:
+            return None
+        return min(candidates, key=lambda path: (-len(posixpath.commonpath([path, importer])), path))
@@ -0,0 +1,140 @@
+"""
+Benchmark file content compression in the blob store.
+
+The codec table shows, for each compression with and without a dictionary
+trained on the first 1000 files, the stored size ratio and the encode and
+batch-decode throughput. The store table saves the same files through
+RedisService into fakeredis, or with --backend mmap into an MmapStore in a
+temporary directory, then reads random bundle-sized batches through the
+manifest, reporting the bytes stored and the read latency.
+
+Synthetic files are far more repetitive than real code; pass --source with a
+local checkout for realistic ratios.
+
+Usage:
+    python -m benchmarks.bench_blob_store [--files 2000] [--source DIR] [--batch 100] [--backend redis|mmap]
+"""
+import argparse
+import asyncio
+import hashlib
+import os
+import random
+import tempfile
+import time
+
+from app.config.settings import BLOB_DICTIONARY_SIZE, SOURCE_EXTENSIONS
+from app.infrastructure.mmap_store import MmapStore
+from app.services.redis_service import RedisService
+from app.utils.blob_codec import available_compressions, decode_blobs, dictionary_id, encode_blobs, train_dictionary
+from benchmarks.stubs import fake_redis_client, used_memory
+from benchmarks.synthetic_repo import generate_repo
+
+
+def load_files(files: int, body_lines: int, source: str, seed: int) -> dict:
+    """
+    Return up to `files` source files keyed by path, from `source` or a synthetic repository.
+    """
+    if not source:
+        repo = generate_repo(files, body_lines=body_lines, seed=seed)
+        return {path: content for path, content in repo.files.items() if path.endswith(tuple(SOURCE_EXTENSIONS))}
+
+    contents = {}
+    for directory, _, names in sorted(os.walk(source)):
+        for name in sorted(names):
+            path = os.path.join(directory, name)
+            if not name.endswith(tuple(SOURCE_EXTENSIONS)):
+                continue
+            try:
+                with open(path, encoding="utf-8") as file:
+                    contents[os.path.relpath(path, source)] = file.read()
+            except (UnicodeDecodeError, OSError):
+                continue
+            if len(contents) >= files:
+                return contents
+    return contents
+
+
+def best_of(repeat: int, function, *args):
+    seconds, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, result
+
+
+def run_codec(blobs: dict, repeat: int):
+    megabytes = sum(len(content.encode()) for content in blobs.values()) / 2 ** 20
+    samples = list(blobs.values())[:1000]
+    print(f"{'compression':>12} {'dict KB':>8} {'ratio':>6} {'encode MB/s':>12} {'decode MB/s':>12}")
+    for compression in available_compressions():
+        for with_dictionary in ([False] if compression == "none" else [False, True]):
+            dictionary = train_dictionary(samples, BLOB_DICTIONARY_SIZE, compression) if with_dictionary else None
+            dictionaries = {dictionary_id(dictionary): dictionary} if dictionary else {}
+            encode_time, encoded = best_of(repeat, encode_blobs, blobs, compression, dictionary)
+            values = list(encoded.values())
+            decode_time, decoded = best_of(repeat, decode_blobs, values, dictionaries)
+            if decoded != list(blobs.values()):
+                raise AssertionError(f"{compression}: decoded contents differ")
+            stored = sum(len(value) for value in values) / 2 ** 20
+            print(
+                f"{compression:>12} {len(dictionary or b'') / 1024:>8.0f} {megabytes / stored:>6.1f} "
+                f"{megabytes / encode_time:>12.1f} {megabytes / decode_time:>12.1f}"
+            )
+
+
+async def run_store(files: dict, batch: int, reads: int, seed: int, backend: str):
+    manifest = {path: hashlib.sha1(content.encode()).hexdigest() for path, content in files.items()}
+    blobs = {manifest[path]: content for path, content in files.items()}
+    paths = list(files)
+    rng = random.Random(seed)
+    batches = [rng.sample(paths, min(batch, len(paths))) for _ in range(reads)]
+
+    print(f"{'compression':>12} {backend + ' MB':>9} {'ratio':>6} {'read ms':>8}")
+    baseline = None
+    for compression in available_compressions():
+        directory = tempfile.TemporaryDirectory()
+        client = MmapStore(directory.name) if backend == "mmap" else fake_redis_client()
+        redis_service = RedisService(client, blob_compression=compression)
+        items = list(blobs.items())
+        for start in range(0, len(items), 1000):
+            await redis_service.save_blobs(dict(items[start:start + 1000]), "bench")
+        await redis_service.save_file_manifest("bench", "main", manifest)
+        await redis_service.set_current_ref("bench", "main")
+        memory = client._size if backend == "mmap" else await used_memory(client)
+        baseline = baseline or memory
+
+        reader = RedisService(client)
+        await reader.get_file_contents("bench", batches[0])
+        start = time.perf_counter()
+        for paths_batch in batches:
+            contents = await reader.get_file_contents("bench", paths_batch)
+            if contents != {path: files[path] for path in paths_batch}:
+                raise AssertionError(f"{compression}: stored contents differ")
+        read_ms = (time.perf_counter() - start) / len(batches) * 1000
+        print(f"{compression:>12} {memory / 2 ** 20:>9.2f} {baseline / memory:>6.1f} {read_ms:>8.2f}")
+        await client.close()
+        directory.cleanup()
+
+
+def run(files: int, body_lines: int, source: str, batch: int, reads: int, repeat: int, seed: int, backend: str):
+    contents = load_files(files, body_lines, source, seed)
+    megabytes = sum(len(content.encode()) for content in contents.values()) / 2 ** 20
+    print(f"{len(contents)} files, {megabytes:.1f} MB, compressions: {', '.join(available_compressions())}\n")
+    run_codec({hashlib.sha1(content.encode()).hexdigest(): content for content in contents.values()}, repeat)
+    print()
+    asyncio.run(run_store(contents, batch, reads, seed, backend))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--body-lines", type=int, default=40)
+    parser.add_argument("--source", default="", help="Directory of real source files to use instead.")
+    parser.add_argument("--batch", type=int, default=100, help="Files per bundle read.")
+    parser.add_argument("--reads", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", choices=["redis", "mmap"], default="redis")
+    args = parser.parse_args()
+    run(args.files, args.body_lines, args.source, args.batch, args.reads, args.repeat, args.seed, args.backend)
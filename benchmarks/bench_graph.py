@@ -0,0 +1,97 @@
+"""
+Benchmark CompactGraph against the networkx DiGraph it replaced.
+
+Measures build + export time and the memory held by the built graph
+(tracemalloc), and checks that both produce the same dependency map.
+networkx is only needed for the baseline column.
+
+Usage:
+    python -m benchmarks.bench_graph [--sizes 10000 100000] [--degree 8]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from app.utils.compact_graph import CompactGraph
+
+
+def synthetic_dependencies(count: int, degree: int, rng: random.Random) -> dict:
+    paths = [f"src/pkg{i % 97}/module{i}.py" for i in range(count)]
+    return {path: rng.sample(paths, rng.randint(0, 2 * degree)) for path in paths}
+
+
+def build_networkx(dependencies: dict):
+    import networkx as nx
+
+    graph = nx.DiGraph()
+    for file_path, file_dependencies in dependencies.items():
+        for dependency in file_dependencies:
+            graph.add_edge(file_path, dependency)
+    return graph
+
+
+def export_networkx(graph) -> dict:
+    output = {}
+    for node in graph.nodes:
+        output[node] = {}
+        depends_on = list(graph.successors(node))
+        if depends_on:
+            output[node]["Depends On"] = depends_on
+        used_by = list(graph.predecessors(node))
+        if used_by:
+            output[node]["Used By"] = used_by
+    return output
+
+
+def measure(build, export, dependencies: dict):
+    """
+    Return (build seconds, export seconds, graph MB, exported map).
+    """
+    gc.collect()
+    start = time.perf_counter()
+    graph = build(dependencies)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    exported = export(graph)
+    export_time = time.perf_counter() - start
+
+    # Measured separately so tracing does not skew the timings
+    gc.collect()
+    tracemalloc.start()
+    graph = build(dependencies)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return build_time, export_time, size / 2 ** 20, exported
+
+
+def run(sizes: list, degree: int, seed: int, baseline: bool):
+    print(f"{'nodes':>8} {'edges':>9} {'graph':>9} {'build s':>8} {'export s':>9} {'MB':>8}")
+    for size in sizes:
+        dependencies = synthetic_dependencies(size, degree, random.Random(seed))
+        edges = sum(len(set(deps)) for deps in dependencies.values())
+
+        candidates = [("compact", CompactGraph.from_dependencies, CompactGraph.to_dependency_map)]
+        if baseline:
+            candidates.append(("networkx", build_networkx, export_networkx))
+
+        exports = []
+        for name, build, export in candidates:
+            build_time, export_time, megabytes, exported = measure(build, export, dependencies)
+            exports.append(exported)
+            print(f"{size:>8} {edges:>9} {name:>9} {build_time:>8.2f} {export_time:>9.2f} {megabytes:>8.1f}")
+
+        if len(exports) == 2 and exports[0] != exports[1]:
+            print("warning: exported maps differ")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--degree", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-baseline", action="store_true", help="Skip networkx (e.g. when it is not installed).")
+    args = parser.parse_args()
+    run(args.sizes, args.degree, args.seed, not args.no_baseline)
@@ -0,0 +1,108 @@
+"""
+Benchmark graph queries over the condensation index.
+
+Builds a layered synthetic graph, where files import files further down the
+order and a fraction of imports point back to create small cycles, then reports
+the index build, encode and decode times and the latency of transitive
+dependents, transitive dependencies and shortest paths between nearby and
+random files, next to a plain breadth-first search over the file graph.
+
+Usage:
+    python -m benchmarks.bench_graph_queries [--sizes 10000 100000] [--degree 6] [--back-edges 0.005]
+"""
+import argparse
+import random
+import time
+
+from app.utils.compact_graph import CompactGraph, GraphIndex
+from app.utils.graph_codec import decode_graph_index, encode_graph_index
+
+
+def layered_dependencies(count: int, degree: int, back_edges: float, rng: random.Random) -> dict:
+    """
+    Return dependencies where file i imports files among the next 200, except
+    for a `back_edges` fraction of imports pointing back to one of the previous
+    20, which create cycles between neighbouring files.
+    """
+    paths = [f"src/pkg{i % 97}/module{i}.py" for i in range(count)]
+    dependencies = {}
+    for i, path in enumerate(paths):
+        targets = []
+        for _ in range(rng.randint(0, 2 * degree)):
+            if rng.random() < back_edges and i > 0:
+                targets.append(paths[rng.randint(max(i - 20, 0), i - 1)])
+            elif i + 1 < count:
+                targets.append(paths[rng.randint(i + 1, min(i + 200, count - 1))])
+        dependencies[path] = targets
+    return dependencies
+
+
+def breadth_first(graph: CompactGraph, path: str, neighbours) -> list:
+    found = {path}
+    queue = [path]
+    for current in queue:
+        for neighbour in neighbours(current):
+            if neighbour not in found:
+                found.add(neighbour)
+                queue.append(neighbour)
+    return sorted(found - {path})
+
+
+def timed(queries: list, function) -> float:
+    """
+    Return the mean milliseconds of `function` over the queries.
+    """
+    start = time.perf_counter()
+    for query in queries:
+        function(*query)
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def run(sizes: list, degree: int, back_edges: float, queries: int, seed: int):
+    for size in sizes:
+        rng = random.Random(seed)
+        graph = CompactGraph.from_dependencies(layered_dependencies(size, degree, back_edges, rng))
+
+        start = time.perf_counter()
+        graph_index = GraphIndex.build(graph)
+        build_time = time.perf_counter() - start
+        encoded = encode_graph_index(graph_index, "zlib")
+        start = time.perf_counter()
+        decode_graph_index(encoded)
+        decode_time = time.perf_counter() - start
+        print(
+            f"{len(graph)} files, {graph.number_of_edges()} edges, {graph_index.component_count} components, "
+            f"{len(graph_index.cycles())} cycles: build {build_time:.2f}s, "
+            f"index {len(encoded) / 2 ** 20:.1f} MB, decode {decode_time:.2f}s"
+        )
+
+        # Files late in the order have few dependencies, early ones few dependents
+        late = [(path,) for path in rng.sample(graph.paths[-len(graph) // 10:], queries)]
+        early = [(path,) for path in rng.sample(graph.paths[:len(graph) // 10], queries)]
+        starts = [rng.randrange(len(graph) - 1000) for _ in range(queries)]
+        near = [(graph.paths[i], graph.paths[i + rng.randint(1, 1000)]) for i in starts]
+        pairs = [tuple(rng.sample(graph.paths, 2)) for _ in range(queries)]
+        rows = [
+            ("dependents", late, graph_index.dependents, lambda path: breadth_first(graph, path, graph.predecessors)),
+            ("dependencies", late, graph_index.dependencies, lambda path: breadth_first(graph, path, graph.successors)),
+            ("dependents", early, graph_index.dependents, lambda path: breadth_first(graph, path, graph.predecessors)),
+            ("path (near)", near, graph_index.shortest_path, None),
+            ("path (random)", pairs, graph_index.shortest_path, None),
+        ]
+        print(f"{'query':>14} {'files':>6} {'index ms':>9} {'bfs ms':>8}")
+        for name, inputs, indexed, baseline in rows:
+            results = sum(len(indexed(*query) or []) for query in inputs) / len(inputs)
+            baseline_ms = f"{timed(inputs, baseline):>8.3f}" if baseline else f"{'-':>8}"
+            print(f"{name:>14} {results:>6.0f} {timed(inputs, indexed):>9.3f} {baseline_ms}")
+        print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--degree", type=int, default=6)
+    parser.add_argument("--back-edges", type=float, default=0.005, help="Fraction of imports that may create cycles.")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.degree, args.back_edges, args.queries, args.seed)
@@ -0,0 +1,54 @@
+"""
+Benchmark the stored size and decode time of dependency maps, JSON vs binary.
+
+"decode s" is what a reader pays before it can index the map (json.loads, or
+decode_dependency_map); "export s" adds materializing the full JSON-shaped map.
+
+Usage:
+    python -m benchmarks.bench_map_format [--sizes 10000 100000] [--degree 8]
+"""
+import argparse
+import json
+import random
+import time
+
+from app.utils.compact_graph import CompactGraph
+from app.utils.graph_codec import available_compressions, decode_dependency_map, encode_dependency_map
+from benchmarks.bench_graph import synthetic_dependencies
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(sizes: list, degree: int, seed: int):
+    print(f"{'nodes':>8} {'format':>12} {'MB':>8} {'ratio':>7} {'decode s':>9} {'export s':>9}")
+    for size in sizes:
+        dependency_map = CompactGraph.from_dependencies(
+            synthetic_dependencies(size, degree, random.Random(seed))
+        ).to_dependency_map()
+
+        data = json.dumps(dependency_map).encode()
+        json_size = len(data)
+        _, decode_time = timed(json.loads, data)
+        print(f"{size:>8} {'json':>12} {json_size / 2 ** 20:>8.2f} {1:>7.1f} {decode_time:>9.3f} {decode_time:>9.3f}")
+
+        for compression in available_compressions():
+            data = encode_dependency_map(dependency_map, compression)
+            graph, decode_time = timed(decode_dependency_map, data)
+            _, export_time = timed(graph.to_dependency_map)
+            print(
+                f"{size:>8} {'binary/' + compression:>12} {len(data) / 2 ** 20:>8.2f} "
+                f"{json_size / len(data):>7.1f} {decode_time:>9.3f} {decode_time + export_time:>9.3f}"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--degree", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.degree, args.seed)
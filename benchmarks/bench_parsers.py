@@ -0,0 +1,81 @@
+"""
+Benchmark the parsers per language against their previous implementation.
+
+"baseline" is the previous implementation: splitlines() plus re.match per
+line for the line-based languages, a full ast walk for Python. "text" is the
+current parser over the decoded file and "bytes" the same over the raw UTF-8
+content. Every variant must return the same imports.
+
+Usage:
+    python -m benchmarks.bench_parsers [--files 5000] [--body-lines 200]
+"""
+import argparse
+import re
+import time
+
+from app.utils.parsing_utils import PARSERS, PythonParser
+from benchmarks.synthetic_repo import EXTENSIONS, generate_repo
+
+# Patterns of the previous line-by-line parsers, kept as the reference
+BASELINE_PATTERNS = {
+    "cs": r"^\s*using\s+([\w.]+);",
+    "ts": r"^\s*import\s+.*\s+from\s+['\"](.+)['\"]",
+    "js": r"^\s*import\s+.*\s+from\s+['\"](.+)['\"]",
+    "java": r"^\s*import\s+([\w.]+);",
+    "cpp": r"^\s*#include\s+[<\"]([^\">]+)[\">]",
+}
+
+
+def parse_lines(pattern: str, content: str):
+    imports = []
+    for line in content.splitlines():
+        match = re.match(pattern, line)
+        if match:
+            imports.append(match.group(1))
+    return imports
+
+
+def baseline(language: str):
+    if language == "py":
+        return PythonParser()._parse_ast
+    return lambda content: parse_lines(BASELINE_PATTERNS[language], content)
+
+
+def best_of(repeat: int, function, contents):
+    seconds, results = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        results = [function(content) for content in contents]
+        seconds = min(seconds, time.perf_counter() - start)
+    return seconds, results
+
+
+def run(files: int, body_lines: int, repeat: int, seed: int):
+    print(f"{'language':>8} {'files':>6} {'MB':>6} {'base MB/s':>10} {'text MB/s':>10} {'bytes MB/s':>11} {'speedup':>8}")
+    for language in ["py", *BASELINE_PATTERNS]:
+        repo = generate_repo(files, mix=f"{language}=1", body_lines=body_lines, seed=seed)
+        contents = [content for path, content in repo.files.items() if path.startswith("src/")]
+        encoded = [content.encode() for content in contents]
+        megabytes = sum(len(content) for content in encoded) / 2 ** 20
+        parser = PARSERS[EXTENSIONS[language]]
+
+        base_time, expected = best_of(repeat, baseline(language), contents)
+        text_time, text_results = best_of(repeat, parser.parse, contents)
+        bytes_time, bytes_results = best_of(repeat, parser.parse, encoded)
+        if text_results != expected or bytes_results != expected:
+            raise AssertionError(f"{language}: parser output differs from the baseline")
+
+        print(
+            f"{language:>8} {len(contents):>6} {megabytes:>6.1f} {megabytes / base_time:>10.1f} "
+            f"{megabytes / text_time:>10.1f} {megabytes / bytes_time:>11.1f} {base_time / text_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--body-lines", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.files, args.body_lines, args.repeat, args.seed)
@@ -0,0 +1,200 @@
+"""
+End-to-end benchmark of the analysis pipeline on a synthetic repository.
+
+Each stage is timed as the best of --repeat runs and, unless --no-memory is
+given, run once more under tracemalloc for its peak allocation. Loads go
+through RepositoryLoader with a stubbed GitHub and fakeredis, so no network or
+Redis server is needed (pip install -r benchmarks/requirements.txt).
+Results are written as JSON; pass a previous result with --compare to flag
+stages that got slower than --threshold (ignoring changes under --min-delta
+seconds, which are timer noise).
+
+Usage:
+    python -m benchmarks.bench_pipeline --files 5000 --output before.json
+    python -m benchmarks.bench_pipeline --files 5000 --compare before.json
+"""
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Optional
+
+from app.services.bundling_service import BundleService
+from app.services.dependency_analysis_service import DependencyAnalyzer
+from app.services.redis_service import RedisService
+from app.services.repository_loader import RepositoryLoader
+from app.utils.filtering import TreeFilter
+from app.utils.parallel_parsing import parse_files
+from benchmarks.stubs import StubGitHubService, fake_redis_client, used_memory
+from benchmarks.synthetic_repo import DEFAULT_MIX, generate_repo
+
+
+def measure(run: Callable[[], object], repeat: int, memory: bool) -> Dict[str, Optional[float]]:
+    """
+    Time `run` (best of `repeat`), then optionally re-run it under tracemalloc
+    for its peak allocation.
+    """
+    seconds = float("inf")
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        seconds = min(seconds, time.perf_counter() - start)
+
+    peak_mb = None
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        run()
+        peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        tracemalloc.stop()
+    return {"seconds": seconds, "peak_mb": peak_mb}
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args) -> Dict:
+    repo = generate_repo(
+        args.files, fan_out=args.fan_out, mix=args.mix, external_ratio=args.external_ratio, seed=args.seed
+    )
+    tree_filter = TreeFilter()
+    source_paths, _ = tree_filter.select(repo.tree)
+    sources = {path: repo.files[path] for path in source_paths}
+    raw_dependencies = parse_files(sources, threshold=len(sources) + 1)
+    analyzer = DependencyAnalyzer({}, source_paths)
+    analyzer.raw_dependencies.update(raw_dependencies)
+    analyzer.resolve_dependencies()
+    edges = sum(len(set(deps)) for deps in analyzer.resolved_dependencies.values())
+
+    def resolve():
+        resolver = DependencyAnalyzer({}, source_paths)
+        resolver.raw_dependencies.update(raw_dependencies)
+        resolver.resolve_dependencies()
+
+    def load():
+        async def main():
+            redis_client = fake_redis_client()
+            loader = RepositoryLoader(StubGitHubService(repo), RedisService(redis_client))
+            await loader.load("owner", "repo", "main", "owner_repo")
+            return redis_client
+        return asyncio.run(main())
+
+    redis_client = load()
+    targets = random.Random(args.seed).sample(sorted(analyzer.resolved_dependencies), min(args.bundles, len(sources)))
+
+    def bundles(max_depth=None):
+        async def main():
+            service = BundleService("owner_repo", redis_client)
+            for target in targets:
+                try:
+                    await service.generate_bundle(target, max_depth=max_depth)
+                except ValueError:
+                    pass  # files without resolved edges are not in the graph
+        asyncio.run(main())
+
+    stages = {
+        "filter": (len(repo.tree), lambda: tree_filter.select(repo.tree)),
+        "parse": (len(sources), lambda: parse_files(sources, threshold=len(sources) + 1)),
+        "resolve": (len(sources), resolve),
+        "graph": (edges, lambda: (analyzer.build_graph(), analyzer.export_graph(), analyzer.export_components())),
+        "load": (len(sources), load),
+        "bundle": (len(targets), bundles),
+        "bundle_depth_2": (len(targets), lambda: bundles(max_depth=2)),
+    }
+
+    results = {}
+    for name, (items, stage) in stages.items():
+        if args.stages and name not in args.stages:
+            continue
+        result = measure(stage, args.repeat, not args.no_memory)
+        result.update(items=items, per_second=items / result["seconds"] if result["seconds"] else None)
+        results[name] = result
+
+    return {
+        "meta": {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "timestamp": time.time(),
+            "params": {
+                "files": args.files, "fan_out": args.fan_out, "mix": args.mix,
+                "external_ratio": args.external_ratio, "seed": args.seed, "bundles": args.bundles,
+                "repeat": args.repeat,
+            },
+            "repo": {
+                "files": len(repo.files), "source_files": len(sources), "bytes": repo.total_bytes, "edges": edges,
+                "redis_bytes": asyncio.run(used_memory(redis_client)),
+            },
+        },
+        "stages": results,
+    }
+
+
+def print_results(results: Dict, baseline: Optional[Dict], threshold: float, min_delta: float) -> bool:
+    """
+    Print a result table, with the change against `baseline` if given.
+
+    Returns:
+        bool: Whether any stage regressed by more than `threshold`.
+    """
+    regressed = False
+    print(f"{'stage':>15} {'items':>9} {'seconds':>9} {'items/s':>11} {'peak MB':>9} {'vs base':>9}")
+    for name, stage in results["stages"].items():
+        change = ""
+        base = (baseline or {}).get("stages", {}).get(name)
+        if base and base["seconds"]:
+            ratio = stage["seconds"] / base["seconds"] - 1
+            change = f"{ratio:+.0%}"
+            if ratio > threshold and stage["seconds"] - base["seconds"] > min_delta:
+                change += " !"
+                regressed = True
+        peak = f"{stage['peak_mb']:.1f}" if stage["peak_mb"] is not None else "-"
+        per_second = f"{stage['per_second']:.0f}" if stage["per_second"] else "-"
+        print(f"{name:>15} {stage['items']:>9} {stage['seconds']:>9.3f} {per_second:>11} {peak:>9} {change:>9}")
+    print(f"repo: {results['meta']['repo']}")
+    if baseline and baseline["meta"]["params"] != results["meta"]["params"]:
+        print("warning: baseline was produced with different parameters")
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=2000)
+    parser.add_argument("--fan-out", type=int, default=6)
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--external-ratio", type=float, default=0.3)
+    parser.add_argument("--bundles", type=int, default=50, help="Number of bundle targets.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", nargs="+", help="Only run these stages.")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per stage; the fastest is kept.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc runs.")
+    parser.add_argument("--output", help="Write the results as JSON to this file.")
+    parser.add_argument("--compare", help="JSON results of a previous run to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Slowdown flagged as a regression.")
+    parser.add_argument("--min-delta", type=float, default=0.01, help="Slowdowns below this many seconds are ignored.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    results = run(args)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    regressed = print_results(results, baseline, args.threshold, args.min_delta)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    sys.exit(1 if regressed else 0)
@@ -0,0 +1,89 @@
+"""
+Benchmark NamespaceResolver against the original per-import difflib scan.
+
+Usage:
+    python -m benchmarks.bench_resolver [--sizes 1000 5000 20000] [--baseline-max 5000]
+"""
+import argparse
+import random
+import time
+from difflib import get_close_matches
+
+from app.services.dependency_analysis_service import DependencyAnalyzer
+from app.utils.namespace_resolver import NamespaceResolver
+
+WORDS = (
+    "app utils core models services api routes config auth user order payment client "
+    "server common helpers data io net http parser graph index cache store view"
+).split()
+EXTENSIONS = [".py", ".ts", ".js", ".cs", ".java", ".h", ".cpp"]
+EXTERNAL_IMPORTS = [
+    "os", "sys", "json", "typing", "collections", "react", "lodash", "numpy",
+    "System", "System.Collections.Generic", "java.util.List", "iostream", "vector",
+]
+
+
+def synthetic_paths(count: int, rng: random.Random) -> list:
+    paths = set()
+    while len(paths) < count:
+        depth = rng.randint(1, 5)
+        directory = "/".join(rng.choice(WORDS) for _ in range(depth))
+        name = rng.choice(WORDS) + rng.choice(WORDS).capitalize() + str(rng.randint(0, 99))
+        paths.add(f"{directory}/{name}{rng.choice(EXTENSIONS)}")
+    return sorted(paths)
+
+
+def synthetic_imports(paths: list, count: int, rng: random.Random) -> list:
+    imports = []
+    for _ in range(count):
+        if rng.random() < 0.5:
+            imports.append(rng.choice(EXTERNAL_IMPORTS))
+        else:
+            parts = rng.choice(paths).rsplit(".", 1)[0].split("/")
+            imports.append(".".join(parts[rng.randint(0, len(parts) - 1):]))
+    return imports
+
+
+def difflib_resolve(mapping: dict, dependency: str):
+    if dependency in mapping:
+        return mapping[dependency]
+    candidates = get_close_matches(dependency, mapping.keys())
+    return mapping[candidates[0]] if candidates else None
+
+
+def run(sizes: list, baseline_max: int, imports_per_file: int, seed: int):
+    print(f"{'files':>8} {'keys':>9} {'imports':>8} {'index s':>8} {'resolve s':>10} {'difflib s':>10}")
+    for size in sizes:
+        rng = random.Random(seed)
+        paths = synthetic_paths(size, rng)
+        imports = synthetic_imports(paths, size * imports_per_file, rng)
+        mapping = DependencyAnalyzer({}, paths).namespace_mapping
+
+        start = time.perf_counter()
+        resolver = NamespaceResolver(mapping)
+        index_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        resolved = [resolver.resolve(dep) for dep in imports]
+        resolve_time = time.perf_counter() - start
+
+        baseline = "-"
+        if size <= baseline_max:
+            start = time.perf_counter()
+            expected = [difflib_resolve(mapping, dep) for dep in imports]
+            baseline = f"{time.perf_counter() - start:10.2f}"
+            mismatches = sum(1 for a, b in zip(expected, resolved) if a != b)
+            if mismatches:
+                print(f"warning: {mismatches} results differ from difflib")
+
+        print(f"{size:>8} {len(mapping):>9} {len(imports):>8} {index_time:>8.2f} {resolve_time:>10.2f} {baseline:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 2000, 10000, 40000])
+    parser.add_argument("--baseline-max", type=int, default=2000)
+    parser.add_argument("--imports-per-file", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    run(args.sizes, args.baseline_max, args.imports_per_file, args.seed)
@@ -0,0 +1,55 @@
+"""
+Local stand-ins for GitHub and Redis used by the benchmarks.
+"""
+import asyncio
+
+import fakeredis
+
+from app.infrastructure.redis_client import RedisClient
+from benchmarks.synthetic_repo import SyntheticRepo
+
+
+class StubGitHubService:
+    """
+    Serves a SyntheticRepo through the GitHubService interface, with an optional
+    per-request latency to mimic the network.
+    """
+
+    def __init__(self, repo: SyntheticRepo, latency: float = 0.0):
+        self.repo = repo
+        self.latency = latency
+
+    async def fetch_repo_tree(self, owner: str, repo: str, branch: str = "main"):
+        await asyncio.sleep(self.latency)
+        return self.repo.tree
+
+    async def fetch_file_content(self, owner: str, repo: str, path: str, branch: str = "main") -> str:
+        await asyncio.sleep(self.latency)
+        return self.repo.files[path]
+
+
+def fake_redis_client() -> RedisClient:
+    """
+    Create a RedisClient whose connections talk to an in-process fakeredis server.
+    """
+    server = fakeredis.FakeServer()
+    client = RedisClient()
+    client.client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    client.binary_client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=False)
+    return client
+
+
+async def used_memory(client: RedisClient) -> int:
+    """
+    Approximate the bytes held by the fake server: the sum of key and value sizes.
+    """
+    total = 0
+    async for key in client.binary_client.scan_iter(count=1000):
+        total += len(key)
+        key_type = await client.binary_client.type(key)
+        if key_type == b"string":
+            total += await client.binary_client.strlen(key)
+        elif key_type == b"hash":
+            for field, value in (await client.binary_client.hgetall(key)).items():
+                total += len(field) + len(value)
+    return total
@@ -0,0 +1,166 @@
+"""
+Deterministic generator of synthetic multi-language repositories.
+
+Files import each other with a configurable fan-out, mostly within nearby
+modules of the same language, plus a share of external imports that never
+resolve. Each language uses the import syntax its parser expects.
+"""
+import hashlib
+import posixpath
+import random
+from typing import Dict, List
+
+WORDS = (
+    "core api models services utils config auth users orders billing search "
+    "storage cache events jobs http db views widgets reports admin"
+).split()
+
+EXTENSIONS = {"py": ".py", "ts": ".ts", "js": ".js", "cs": ".cs", "java": ".java", "cpp": ".cpp"}
+DEFAULT_MIX = "py=4,ts=2,js=1,cs=1,java=1,cpp=1"
+
+EXTERNAL_IMPORTS = {
+    "py": ["os", "sys", "json", "typing", "collections", "numpy"],
+    "ts": ["react", "lodash", "rxjs", "@angular/core"],
+    "js": ["react", "lodash", "express", "axios"],
+    "cs": ["System", "System.Linq", "System.Collections.Generic", "Microsoft.Extensions.Logging"],
+    "java": ["java.util.List", "java.util.Map", "java.io.File", "org.slf4j.Logger"],
+    "cpp": ["vector", "string", "memory", "iostream"],
+}
+NOISE_FILES = ["README.md", "docs/guide.md", "assets/logo.png", "package.json", "setup.cfg", "Makefile"]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """
+    Parse a language mix such as "py=4,ts=2,cpp=1" into normalized weights.
+    """
+    weights = {}
+    for part in mix.split(","):
+        language, _, weight = part.partition("=")
+        if language not in EXTENSIONS:
+            raise ValueError(f"Unknown language {language!r}; expected one of {sorted(EXTENSIONS)}")
+        weights[language] = float(weight or 1)
+    total = sum(weights.values())
+    return {language: weight / total for language, weight in weights.items()}
+
+
+class SyntheticRepo:
+    """
+    Generated repository: file contents plus a GitHub-style recursive tree.
+    """
+
+    def __init__(self, files: Dict[str, str]):
+        self.files = files
+        self.tree = [
+            {"path": path, "type": "blob", "sha": hashlib.sha1(content.encode()).hexdigest(), "size": len(content)}
+            for path, content in files.items()
+        ]
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(content) for content in self.files.values())
+
+
+def _module_path(language: str, index: int, rng: random.Random) -> str:
+    depth = rng.randint(1, 3)
+    directory = "/".join(rng.choice(WORDS) for _ in range(depth))
+    name = f"{rng.choice(WORDS)}_{index}"
+    if language in ("cs", "java"):
+        name = "".join(part.capitalize() for part in name.split("_"))
+    if language == "cpp" and index % 2:
+        return f"src/{language}/{directory}/{name}.h"
+    return f"src/{language}/{directory}/{name}{EXTENSIONS[language]}"
+
+
+def _import_line(language: str, source: str, target: str) -> str:
+    stem = target.rsplit(".", 1)[0]
+    if language == "py":
+        module = stem.replace("/", ".")
+        package, _, name = module.rpartition(".")
+        return f"from {package} import {name}" if len(name) % 2 else f"import {module}"
+    if language in ("ts", "js"):
+        relative = posixpath.relpath(stem, posixpath.dirname(source))
+        if not relative.startswith("."):
+            relative = f"./{relative}"
+        return f"import {posixpath.basename(stem).replace('-', '_')} from '{relative}';"
+    if language == "cs":
+        return f"using {stem.replace('/', '.')};"
+    if language == "java":
+        return f"import {stem.replace('/', '.')};"
+    return f'#include "{target}"'
+
+
+def _external_line(language: str, name: str) -> str:
+    if language == "py":
+        return f"import {name}"
+    if language in ("ts", "js"):
+        return f"import {name.split('/')[-1].replace('-', '_')} from '{name}';"
+    if language == "cs":
+        return f"using {name};"
+    if language == "java":
+        return f"import {name};"
+    return f"#include <{name}>"
+
+
+def _body(language: str, index: int, lines: int) -> List[str]:
+    if language == "py":
+        return [f"def function_{index}_{i}(value):\n    return value + {i}\n" for i in range(lines // 2)]
+    return [f"// line {i} of generated module {index}" for i in range(lines)]
+
+
+def generate_repo(
+    file_count: int,
+    fan_out: int = 6,
+    mix: str = DEFAULT_MIX,
+    external_ratio: float = 0.3,
+    locality: int = 50,
+    noise_ratio: float = 0.1,
+    body_lines: int = 40,
+    seed: int = 0,
+) -> SyntheticRepo:
+    """
+    Generate a synthetic repository.
+
+    Args:
+        file_count (int): Number of source files.
+        fan_out (int): Average number of imports per file.
+        mix (str): Language weights, e.g. "py=4,ts=2,cpp=1".
+        external_ratio (float): Share of imports pointing outside the repository.
+        locality (int): Imports target one of the `locality` closest files of the same language.
+        noise_ratio (float): Non-source files added per source file.
+        body_lines (int): Lines of filler code per file.
+        seed (int): Random seed; the same arguments always produce the same repository.
+
+    Returns:
+        SyntheticRepo: The generated files and tree.
+    """
+    rng = random.Random(seed)
+    weights = parse_mix(mix)
+    languages = rng.choices(list(weights), weights=list(weights.values()), k=file_count)
+
+    paths_by_language: Dict[str, List[str]] = {language: [] for language in weights}
+    seen = set()
+    for index, language in enumerate(languages):
+        path = _module_path(language, index, rng)
+        if path not in seen:
+            seen.add(path)
+            paths_by_language[language].append(path)
+
+    files = {}
+    for language, paths in paths_by_language.items():
+        for position, path in enumerate(paths):
+            lines = []
+            for _ in range(max(0, round(rng.gauss(fan_out, fan_out / 3)))):
+                if rng.random() < external_ratio or len(paths) < 2:
+                    lines.append(_external_line(language, rng.choice(EXTERNAL_IMPORTS[language])))
+                    continue
+                low, high = max(0, position - locality), min(len(paths) - 1, position + locality)
+                target = paths[rng.randint(low, high)]
+                if target != path:
+                    lines.append(_import_line(language, path, target))
+            files[path] = "\n".join(lines + [""] + _body(language, position, body_lines)) + "\n"
+
+    for i in range(int(file_count * noise_ratio)):
+        name = NOISE_FILES[i % len(NOISE_FILES)]
+        files[name if i < len(NOISE_FILES) else f"extra/{i}/{name}"] = "generated\n"
+
+    return SyntheticRepo(files)
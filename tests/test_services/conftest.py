@@ -0,0 +1,113 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+import pytest
+
+
+class InMemoryRedisClient:
+    """
+    Dictionary-backed stand-in for RedisClient.
+    """
+
+    def __init__(self):
+        self.store = {}
+        self.hash_reads = 0
+        self.locks = {}
+
+    async def set_data(self, key, value):
+        self.store[key] = json.dumps(value)
+
+    async def get_data(self, key):
+        data = self.store.get(key)
+        return json.loads(data) if data else None
+
+    async def set_text(self, key, value, ttl=None):
+        self.store[key] = value
+
+    async def get_text(self, key):
+        return self.store.get(key)
+
+    async def set_bytes(self, key, value):
+        self.store[key] = value
+
+    async def get_bytes(self, key):
+        data = self.store.get(key)
+        return data.encode() if isinstance(data, str) else data
+
+    async def set_many(self, items):
+        for key, value in items.items():
+            await self.set_data(key, value)
+
+    async def get_many(self, keys):
+        return [await self.get_data(key) for key in keys]
+
+    async def set_many_text(self, items):
+        self.store.update(items)
+
+    async def get_many_text(self, keys):
+        return [self.store.get(key) for key in keys]
+
+    async def set_many_bytes(self, items):
+        self.store.update(items)
+
+    async def get_many_bytes(self, keys):
+        return [await self.get_bytes(key) for key in keys]
+
+    async def replace_hash(self, key, fields):
+        self.store[key] = {field: json.dumps(value) for field, value in fields.items()}
+        if not fields:
+            del self.store[key]
+
+    async def get_hash_fields(self, key, fields):
+        self.hash_reads += 1
+        values = self.store.get(key, {})
+        return [json.loads(values[field]) if field in values else None for field in fields]
+
+    async def increment(self, key):
+        self.store[key] = str(int(self.store.get(key, 0)) + 1)
+        return int(self.store[key])
+
+    async def increment_many(self, deltas):
+        for key, delta in deltas.items():
+            self.store[key] = str(int(self.store.get(key, 0)) + delta)
+        return [int(self.store[key]) for key in deltas]
+
+    async def get_hash(self, key):
+        return {field: json.loads(data) for field, data in self.store.get(key, {}).items()}
+
+    async def add_scored(self, key, scores, only_existing=False):
+        members = self.store.setdefault(key, {})
+        members.update({member: score for member, score in scores.items() if member in members or not only_existing})
+
+    async def get_scored_below(self, key, max_score):
+        return sorted(member for member, score in self.store.get(key, {}).items() if score <= max_score)
+
+    async def remove_scored(self, key, members):
+        for member in members:
+            self.store.get(key, {}).pop(member, None)
+
+    async def exists_many(self, keys):
+        return [key in self.store for key in keys]
+
+    async def exists(self, key):
+        return key in self.store
+
+    async def delete_data(self, key):
+        self.store.pop(key, None)
+
+    async def delete_many(self, keys):
+        for key in keys:
+            await self.delete_data(key)
+
+    @asynccontextmanager
+    async def lock(self, name, timeout=None):
+        async with self.locks.setdefault(name, asyncio.Lock()):
+            yield
+
+
+@pytest.fixture
+def redis_client():
+    """
+    Fixture providing an empty in-memory Redis stand-in.
+    """
+    return InMemoryRedisClient()
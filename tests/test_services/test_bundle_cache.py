@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+from app.services.bundle_cache import BundleCache, bundle_etag, etag_matches
+from app.services.bundling_service import BundleService
+from app.services.graph_query_service import GraphQueryService
+from app.services.redis_service import RedisService
+from app.utils.metrics import BUNDLE_CACHE_REQUESTS
+
+
+@pytest.fixture
+def loaded_redis(redis_client):
+    """
+    Fixture storing a small dependency map a -> b and the content of both files.
+    """
+    async def setup():
+        redis_service = RedisService(redis_client)
+        await redis_service.save_dependency_map("repo", {"a.py": {"Depends On": ["b.py"]}, "b.py": {"Used By": ["a.py"]}})
+        await redis_service.bump_graph_version("repo")
+        await redis_service.save_blobs({"sha-a": "# a", "sha-b": "# b"})
+        await redis_service.save_file_manifest("repo", "main", {"a.py": "sha-a", "b.py": "sha-b"})
+        await redis_service.set_current_ref("repo", "main")
+
+    GraphQueryService._index_cache.clear()
+    asyncio.run(setup())
+    return redis_client
+
+
+def bundle(redis_client, cache, target="a.py", **options):
+    return asyncio.run(BundleService("repo", redis_client, cache).generate_bundle(target, **options))
+
+
+def test_repeated_bundles_are_served_from_the_local_tier(loaded_redis):
+    """
+    Test that a second request does not read the graph or the contents again.
+    """
+    cache = BundleCache(loaded_redis)
+    hits = BUNDLE_CACHE_REQUESTS.value(tier="local", result="hit")
+
+    first = bundle(loaded_redis, cache)
+    loaded_redis.store["blob:sha-a"] = "# changed without a new graph version"
+    assert bundle(loaded_redis, cache) == first == {"a.py": "# a", "b.py": "# b"}
+    assert BUNDLE_CACHE_REQUESTS.value(tier="local", result="hit") == hits + 1
+
+    # Other options are other entries
+    assert bundle(loaded_redis, cache, direction="dependents") == {"a.py": "# changed without a new graph version"}
+
+
+def test_redis_tier_is_shared_between_processes(loaded_redis):
+    """
+    Test that a bundle cached by one process is found in Redis by another.
+    """
+    bundle(loaded_redis, BundleCache(loaded_redis))
+    hits = BUNDLE_CACHE_REQUESTS.value(tier="redis", result="hit")
+
+    loaded_redis.store["blob:sha-a"] = "# changed"
+    assert bundle(loaded_redis, BundleCache(loaded_redis))["a.py"] == "# a"
+    assert BUNDLE_CACHE_REQUESTS.value(tier="redis", result="hit") == hits + 1
+
+
+def test_saving_a_dependency_map_invalidates_bundles(loaded_redis):
+    """
+    Test that a new graph version makes both tiers miss and changes the ETag.
+    """
+    cache = BundleCache(loaded_redis)
+    service = BundleService("repo", loaded_redis, cache)
+    etag = bundle_etag(asyncio.run(service.bundle_key("a.py")))
+    bundle(loaded_redis, cache)
+
+    async def reload():
+        redis_service = RedisService(loaded_redis)
+        await redis_service.save_blobs({"sha-new-a": "# new a"})
+        await redis_service.save_file_manifest("repo", "main", {"a.py": "sha-new-a"})
+        await redis_service.save_dependency_map("repo", {"a.py": {}, "b.py": {}})
+        await redis_service.bump_graph_version("repo")
+
+    asyncio.run(reload())
+    service = BundleService("repo", loaded_redis, cache)
+    assert bundle_etag(asyncio.run(service.bundle_key("a.py"))) != etag
+    assert bundle(loaded_redis, cache) == {"a.py": "# new a"}
+    assert all(key[1] == 2 for key in cache._entries)
+
+
+def test_local_tier_evicts_least_recently_used():
+    """
+    Test that the local tier stays within its byte budget and skips oversized bundles.
+    """
+    cache = BundleCache(None, max_bytes=40, max_entry_bytes=30)
+    keys = [("repo", 1, f"{name}.py", "both", None) for name in "abc"]
+
+    async def fill():
+        await cache.set(keys[0], {"a": "x" * 10})
+        await cache.set(keys[1], {"b": "x" * 10})
+        await cache.get(keys[0])
+        await cache.set(keys[2], {"c": "x" * 10})
+        await cache.set(("repo", 1, "big.py", "both", None), {"big": "x" * 40})
+
+    asyncio.run(fill())
+    assert list(cache._entries) == [keys[0], keys[2]]
+    assert cache._size <= 40
+
+
+@pytest.mark.parametrize(
+    "header, expected",
+    [(None, False), ('"abc"', True), ('W/"abc"', True), ('"x", W/"abc"', True), ("*", True), ('"x"', False)],
+)
+def test_etag_matches(header, expected):
+    """
+    Test weak If-None-Match comparison.
+    """
+    assert etag_matches(header, 'W/"abc"') is expected
@@ -0,0 +1,196 @@
+import asyncio
+import pytest
+from app.services.bundling_service import BundleService
+from app.services.graph_query_service import GraphQueryService
+from app.services.redis_service import RedisService
+
+
+@pytest.fixture
+def dependency_map():
+    """
+    Fixture providing two disconnected components: a -> b -> c <- d, and x -> y.
+    """
+    return {
+        "a.py": {"Depends On": ["b.py"]},
+        "b.py": {"Depends On": ["c.py"], "Used By": ["a.py"]},
+        "c.py": {"Used By": ["b.py", "d.py"]},
+        "d.py": {"Depends On": ["c.py"]},
+        "x.py": {"Depends On": ["y.py"]},
+        "y.py": {"Used By": ["x.py"]},
+    }
+
+
+@pytest.fixture(params=["binary", "json"])
+def map_format(request):
+    """
+    Fixture running each bundle test against both dependency map formats.
+    """
+    return request.param
+
+
+@pytest.fixture
+def loaded_redis(redis_client, dependency_map, map_format):
+    """
+    Fixture storing the dependency map, its components and the content of every file but d.py.
+    """
+    async def setup():
+        redis_service = RedisService(redis_client, map_format=map_format)
+        await redis_service.save_dependency_map("repo", dependency_map)
+        await redis_service.save_components("repo", [["a.py", "b.py", "c.py", "d.py"], ["x.py", "y.py"]])
+        await redis_service.save_blobs({f"sha-{f}": f"# {f}" for f in dependency_map if f != "d.py"})
+        await redis_service.save_file_manifest("repo", "main", {f: f"sha-{f}" for f in dependency_map})
+        await redis_service.set_current_ref("repo", "main")
+
+    GraphQueryService._index_cache.clear()
+    asyncio.run(setup())
+    return redis_client
+
+
+def test_get_all_related_files_is_the_weak_component(dependency_map):
+    """
+    Test the in-memory traversal over Depends On and Used By edges.
+    """
+    service = BundleService("repo", None)
+    assert service.get_all_related_files(dependency_map, "a.py") == {"a.py", "b.py", "c.py", "d.py"}
+    assert service.get_all_related_files(dependency_map, "x.py") == {"x.py", "y.py"}
+    with pytest.raises(ValueError):
+        service.get_all_related_files(dependency_map, "missing.py")
+
+
+def test_generate_bundle_uses_component_index(loaded_redis):
+    """
+    Test that an unrestricted bundle is two component lookups, independent of its size.
+    """
+    bundle = asyncio.run(BundleService("repo", loaded_redis).generate_bundle("a.py"))
+
+    assert sorted(bundle) == ["a.py", "b.py", "c.py", "d.py"]
+    # Two component lookups, then the manifest read for the blob SHAs
+    assert loaded_redis.hash_reads == 3
+
+
+@pytest.mark.parametrize("map_format", ["json"])
+def test_generate_bundle_reads_only_traversed_nodes(loaded_redis):
+    """
+    Test that depth-limited bundles walk the adjacency hash, one read per BFS level.
+    """
+    bundle = asyncio.run(BundleService("repo", loaded_redis).generate_bundle("a.py", max_depth=2))
+
+    assert sorted(bundle) == ["a.py", "b.py", "c.py"]
+    assert loaded_redis.hash_reads == 3
+
+
+@pytest.mark.parametrize("map_format", ["binary"])
+def test_binary_map_is_decoded_once_per_graph_version(loaded_redis):
+    """
+    Test that depth-limited bundles of a binary map walk a graph decoded once,
+    until a new graph version is saved.
+    """
+    reads = []
+    get_bytes = loaded_redis.get_bytes
+
+    async def counting_get_bytes(key):
+        reads.append(key)
+        return await get_bytes(key)
+
+    loaded_redis.get_bytes = counting_get_bytes
+
+    def bundle(target):
+        return sorted(asyncio.run(BundleService("repo", loaded_redis).generate_bundle(target, max_depth=1)))
+
+    assert bundle("a.py") == ["a.py", "b.py"]
+    assert bundle("c.py") == ["b.py", "c.py", "d.py"]
+    assert reads.count("dependency_map:repo") == 1
+
+    asyncio.run(RedisService(loaded_redis).bump_graph_version("repo"))
+    assert bundle("a.py") == ["a.py", "b.py"]
+    assert reads.count("dependency_map:repo") == 2
+
+
+@pytest.mark.parametrize(
+    "target, direction, max_depth, expected",
+    [
+        ("a.py", "dependencies", None, ["a.py", "b.py", "c.py"]),
+        ("c.py", "dependents", None, ["a.py", "b.py", "c.py", "d.py"]),
+        ("c.py", "dependents", 1, ["b.py", "c.py", "d.py"]),
+        ("d.py", "dependents", None, ["d.py"]),
+        ("b.py", "both", 1, ["a.py", "b.py", "c.py"]),
+        ("b.py", "both", 0, ["b.py"]),
+    ],
+)
+def test_generate_bundle_direction_and_depth(loaded_redis, dependency_map, target, direction, max_depth, expected):
+    """
+    Test directed and depth-limited bundles, and that the legacy in-memory traversal agrees.
+    """
+    service = BundleService("repo", loaded_redis)
+    bundle = asyncio.run(service.generate_bundle(target, direction, max_depth))
+    assert sorted(bundle) == expected
+
+    legacy = service.get_all_related_files(dependency_map, target, service.DIRECTIONS[direction], max_depth)
+    assert sorted(legacy | {target}) == expected
+
+
+def test_generate_bundle_reports_missing_content(loaded_redis):
+    """
+    Test that files without stored content are flagged in the bundle.
+    """
+    bundle = asyncio.run(BundleService("repo", loaded_redis).generate_bundle("a.py"))
+
+    assert sorted(bundle) == ["a.py", "b.py", "c.py", "d.py"]
+    assert bundle["d.py"] == "Error: Content for d.py not found."
+
+
+def test_generate_bundle_unknown_target(loaded_redis, redis_client):
+    """
+    Test that unknown targets and unknown repositories raise ValueError.
+    """
+    with pytest.raises(ValueError, match="not found in the dependency graph"):
+        asyncio.run(BundleService("repo", loaded_redis).generate_bundle("missing.py"))
+    with pytest.raises(ValueError, match="not found in Redis"):
+        asyncio.run(BundleService("other", loaded_redis).generate_bundle("a.py"))
+
+
+def collect(records):
+    async def consume():
+        return [record async for record in await records]
+    return asyncio.run(consume())
+
+
+def test_stream_bundle_sends_metadata_then_files(loaded_redis):
+    """
+    Test that a streamed bundle starts with its metadata and ends with a complete end record.
+    """
+    records = collect(BundleService("repo", loaded_redis).stream_bundle("a.py", batch_size=3))
+
+    assert records[0]["type"] == "metadata"
+    assert records[0]["related_files"] == ["a.py", "b.py", "c.py", "d.py"]
+    assert [(record["path"], record["missing"]) for record in records[1:-1]] == [
+        ("a.py", False), ("b.py", False), ("c.py", False), ("d.py", True),
+    ]
+    assert records[-1] == {"type": "end", "files_sent": 4, "bytes_sent": 18, "truncated": False, "next_offset": None}
+
+
+def test_stream_bundle_pages_by_limit_and_byte_budget(loaded_redis):
+    """
+    Test that limit and max_bytes end a page early with the offset of the next one.
+    """
+    service = BundleService("repo", loaded_redis)
+
+    records = collect(service.stream_bundle("a.py", offset=1, limit=2))
+    assert [record["path"] for record in records[1:-1]] == ["b.py", "c.py"]
+    assert records[-1]["next_offset"] == 3
+
+    records = collect(service.stream_bundle("a.py", max_bytes=12))
+    assert [record["path"] for record in records[1:-1]] == ["a.py", "b.py"]
+    assert records[-1]["truncated"] is True
+    assert records[-1]["next_offset"] == 2
+
+    records = collect(service.stream_bundle("a.py", max_bytes=1))
+    assert [record["path"] for record in records[1:-1]] == ["a.py"]
+
+
+def test_stream_bundle_unknown_target_raises_before_streaming(loaded_redis):
+    """
+    Test that unknown targets fail when the stream is prepared, not while it is consumed.
+    """
+    with pytest.raises(ValueError):
+        asyncio.run(BundleService("repo", loaded_redis).stream_bundle("missing.py"))
@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.services.dependency_analysis_service import DependencyAnalyzer, analyze_and_export_dependencies
+
+
+@pytest.fixture
+def python_files():
+    """
+    Fixture providing a small Python package using relative imports.
+    """
+    return {
+        "app/__init__.py": "",
+        "app/core/__init__.py": "from .models import User\n",
+        "app/core/models.py": "from .. import settings\n",
+        "app/settings.py": "import os\n",
+        "app/api/views.py": "from ..core import models\nfrom ..core.models import User\nfrom ... import outside\n",
+    }
+
+
+def test_relative_imports_resolve_against_importer(python_files):
+    """
+    Test that relative Python imports resolve from the importing file's package.
+    """
+    analyzer = DependencyAnalyzer(python_files, list(python_files))
+    analyzer.analyze()
+
+    assert analyzer.resolved_dependencies["app/core/__init__.py"] == ["app/core/models.py"]
+    assert analyzer.resolved_dependencies["app/core/models.py"] == ["app/settings.py"]
+    assert analyzer.resolved_dependencies["app/api/views.py"] == ["app/core/__init__.py", "app/core/models.py"]
+
+
+def test_dependencies_parsed_upstream_are_not_parsed_again(python_files, redis_client):
+    """
+    Test that files passed with raw dependencies are resolved from them rather than re-parsed.
+    """
+    raw_dependencies = {"app/settings.py": ["app.core.models"]}
+    dependency_map = asyncio.run(
+        analyze_and_export_dependencies(python_files, list(python_files), "repo", redis_client, raw_dependencies=raw_dependencies)
+    )
+
+    assert dependency_map["app/settings.py"]["Depends On"] == ["app/core/models.py"]
+    assert dependency_map["app/core/models.py"]["Depends On"] == ["app/settings.py"]
+
+
+def test_package_imports_without_a_tsconfig_produce_no_edge():
+    """
+    Test that bare JS/TS specifiers of packages are not matched by name to repository files.
+    """
+    files = {
+        "web/app.js": "import React from 'react';\nimport fp from 'lodash/fp';\nimport Local from './react';\n",
+        "web/react.js": "",
+        "web/lodash/fp.js": "",
+    }
+    analyzer = DependencyAnalyzer(files, list(files))
+    analyzer.analyze()
+
+    assert analyzer.resolved_dependencies["web/app.js"] == ["web/react.js"]
@@ -0,0 +1,177 @@
+import asyncio
+import io
+import tarfile
+from aiohttp import web
+from app.infrastructure.github_client import GitHubClient
+from app.services.github_service import GitHubService
+
+
+async def run_with_stub_server(handler, scenario):
+    """
+    Serve `handler` on a local port and run `scenario(service, hits)` against it.
+    """
+    hits = {}
+
+    async def counting_handler(request):
+        hits[request.path] = hits.get(request.path, 0) + 1
+        return await handler(request, hits[request.path])
+
+    app = web.Application()
+    app.router.add_get("/{tail:.*}", counting_handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+
+    client = GitHubClient(token="dummy_token", max_concurrency=4, backoff_base=0.01)
+    client.BASE_URL = client.RAW_BASE_URL = f"http://127.0.0.1:{port}"
+    try:
+        return await scenario(GitHubService(client), hits)
+    finally:
+        await client.close()
+        await runner.cleanup()
+
+
+async def fetch_files(service, paths):
+    """
+    Fetch files concurrently, returning their contents and the paths that failed.
+    """
+    results = await asyncio.gather(
+        *(service.fetch_file_content("owner", "repo", path) for path in paths), return_exceptions=True
+    )
+    contents = {path: result for path, result in zip(paths, results) if not isinstance(result, Exception)}
+    return contents, [path for path, result in zip(paths, results) if isinstance(result, Exception)]
+
+
+def test_fetch_retries_rate_limits_and_reports_failures():
+    """
+    Test that rate-limited and failing requests are retried and permanent failures reported.
+    """
+    async def handler(request, attempt):
+        name = request.path.rsplit("/", 1)[-1]
+        if name == "limited.py" and attempt == 1:
+            return web.Response(status=429, headers={"Retry-After": "0"})
+        if name == "quota.py" and attempt == 1:
+            return web.Response(status=403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0"})
+        if name == "flaky.py" and attempt < 3:
+            return web.Response(status=502)
+        if name == "missing.py":
+            return web.Response(status=404)
+        return web.Response(text=f"# {name}")
+
+    async def scenario(service, hits):
+        paths = ["ok.py", "limited.py", "quota.py", "flaky.py", "missing.py"]
+        contents, failures = await fetch_files(service, paths)
+        return contents, failures, hits
+
+    contents, failures, hits = asyncio.run(run_with_stub_server(handler, scenario))
+
+    assert contents == {
+        "ok.py": "# ok.py",
+        "limited.py": "# limited.py",
+        "quota.py": "# quota.py",
+        "flaky.py": "# flaky.py",
+    }
+    assert failures == ["missing.py"]
+    assert hits["/owner/repo/main/flaky.py"] == 3
+    assert hits["/owner/repo/main/missing.py"] == 1
+
+
+def test_fetch_respects_concurrency_cap():
+    """
+    Test that no more than max_concurrency requests are in flight at once.
+    """
+    in_flight = {"current": 0, "peak": 0}
+
+    async def handler(request, attempt):
+        in_flight["current"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        return web.Response(text="x")
+
+    async def scenario(service, hits):
+        paths = [f"file{i}.py" for i in range(40)]
+        return await fetch_files(service, paths)
+
+    contents, failures = asyncio.run(run_with_stub_server(handler, scenario))
+
+    assert len(contents) == 40 and not failures
+    assert in_flight["peak"] <= 4
+
+
+def build_tarball(files):
+    """
+    Build a gzipped tarball laid out like a GitHub archive.
+    """
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode="w:gz") as archive:
+        for path, content in files.items():
+            data = content.encode("utf-8")
+            info = tarfile.TarInfo(f"owner-repo-abc123/{path}")
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return buffer.getvalue()
+
+
+def test_stream_archive_files_extracts_selected_files():
+    """
+    Test that a streamed tarball yields only the wanted files, with the top-level directory stripped.
+    """
+    files = {f"pkg/module{i}.py": f"import pkg.module{i + 1}\n" * 200 for i in range(50)}
+    files["assets/logo.png"] = "binary"
+    tarball = build_tarball(files)
+
+    async def handler(request, attempt):
+        assert request.path == "/repos/owner/repo/tarball/main"
+        return web.Response(body=tarball)
+
+    async def scenario(service, hits):
+        wanted = lambda path: path.endswith(".py")
+        return {path: content async for path, content in service.stream_archive_files("owner", "repo", wanted)}
+
+    extracted = asyncio.run(run_with_stub_server(handler, scenario))
+
+    assert extracted == {path: content for path, content in files.items() if path.endswith(".py")}
+
+
+def test_stream_retries_connection_failures_before_the_response():
+    """
+    Test that an archive download survives connections dropped before its response starts.
+    """
+    files = {"pkg/a.py": "import pkg.b\n", "pkg/b.py": ""}
+    tarball = build_tarball(files)
+
+    async def handler(request, attempt):
+        if attempt <= 2:
+            request.transport.close()
+        return web.Response(body=tarball)
+
+    async def scenario(service, hits):
+        extracted = {path: content async for path, content in service.stream_archive_files("owner", "repo", bool)}
+        return extracted, hits
+
+    extracted, hits = asyncio.run(run_with_stub_server(handler, scenario))
+
+    assert extracted == files
+    assert hits["/repos/owner/repo/tarball/main"] == 3
+
+
+def test_stream_archive_files_stops_early():
+    """
+    Test that closing the stream early releases the download and extraction workers.
+    """
+    tarball = build_tarball({f"file{i}.py": "x" * 10000 for i in range(200)})
+
+    async def handler(request, attempt):
+        return web.Response(body=tarball)
+
+    async def scenario(service, hits):
+        stream = service.stream_archive_files("owner", "repo", lambda path: True)
+        first = await stream.__anext__()
+        await stream.aclose()
+        return first
+
+    path, _ = asyncio.run(run_with_stub_server(handler, scenario))
+    assert path == "file0.py"
@@ -0,0 +1,76 @@
+import asyncio
+import pytest
+from app.services.dependency_analysis_service import analyze_and_export_dependencies
+from app.services.graph_query_service import GraphQueryService
+from app.services.redis_service import RedisService
+
+
+@pytest.fixture
+def analyzed_redis(redis_client):
+    """
+    Fixture analyzing a package where a and b import each other and both reach c.
+    """
+    files = {
+        "pkg/a.py": "import pkg.b\n",
+        "pkg/b.py": "import pkg.a\nimport pkg.c\n",
+        "pkg/c.py": "import os\n",
+        "main.py": "import pkg.a\n",
+    }
+    GraphQueryService._index_cache.clear()
+    asyncio.run(analyze_and_export_dependencies(files, list(files), "repo", redis_client))
+    return redis_client
+
+
+def test_queries_use_the_stored_index(analyzed_redis):
+    """
+    Test every query against the index saved at analysis time.
+    """
+    service = GraphQueryService("repo", analyzed_redis)
+
+    async def run():
+        return (
+            await service.dependents("pkg/c.py"),
+            await service.dependencies("main.py"),
+            await service.cycles(),
+            await service.shortest_path("main.py", "pkg/c.py"),
+            await service.shortest_path("pkg/c.py", "main.py"),
+        )
+
+    dependents, dependencies, cycles, path, no_path = asyncio.run(run())
+    assert "graph_index:repo" in analyzed_redis.store
+    assert dependents == ["main.py", "pkg/a.py", "pkg/b.py"]
+    assert dependencies == ["pkg/a.py", "pkg/b.py", "pkg/c.py"]
+    assert cycles == [["pkg/a.py", "pkg/b.py"]]
+    assert path == ["main.py", "pkg/a.py", "pkg/b.py", "pkg/c.py"]
+    assert no_path is None
+
+
+def test_index_is_reloaded_for_a_new_graph_version(analyzed_redis):
+    """
+    Test that the cached index is reused until the repository is analyzed again,
+    each analysis starting exactly one new graph version.
+    """
+    service = GraphQueryService("repo", analyzed_redis)
+    first = asyncio.run(service.get_index())
+    assert asyncio.run(GraphQueryService("repo", analyzed_redis).get_index()) is first
+
+    files = {"pkg/a.py": "import pkg.c\n", "pkg/c.py": ""}
+    asyncio.run(analyze_and_export_dependencies(files, list(files), "repo", analyzed_redis))
+    assert asyncio.run(service.cycles()) == []
+    assert asyncio.run(RedisService(analyzed_redis).get_graph_version("repo")) == 2
+    assert [key for key in GraphQueryService._index_cache if key[0] == "repo"] == [("repo", 2)]
+
+
+def test_index_is_computed_for_maps_stored_without_one(analyzed_redis):
+    """
+    Test that repositories analyzed before indexes existed are still queried,
+    and that unknown repositories and files raise ValueError.
+    """
+    del analyzed_redis.store["graph_index:repo"]
+    asyncio.run(RedisService(analyzed_redis).bump_graph_version("repo"))
+
+    assert asyncio.run(GraphQueryService("repo", analyzed_redis).cycles()) == [["pkg/a.py", "pkg/b.py"]]
+    with pytest.raises(ValueError):
+        asyncio.run(GraphQueryService("repo", analyzed_redis).dependents("missing.py"))
+    with pytest.raises(ValueError):
+        asyncio.run(GraphQueryService("other", analyzed_redis).cycles())
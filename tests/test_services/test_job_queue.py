@@ -0,0 +1,156 @@
+import asyncio
+import pytest
+from app.services.job_queue import JobQueue
+from app.utils.filtering import TreeFilter
+
+
+def run_queue(handler, scenario, **options):
+    """
+    Run `scenario(queue)` against a started queue, then stop it.
+    """
+    async def main():
+        queue = JobQueue(handler, **options)
+        queue.start()
+        try:
+            return await scenario(queue)
+        finally:
+            await queue.stop()
+
+    return asyncio.run(main())
+
+
+async def wait_finished(*jobs):
+    while not all(job.finished for job in jobs):
+        await asyncio.sleep(0.01)
+
+
+def test_submit_deduplicates_active_loads():
+    """
+    Test that a repo/branch already queued or running reuses its job, and a
+    finished one does not.
+    """
+    gate = []
+    runs = []
+
+    async def handler(job):
+        runs.append(job.job_id)
+        job.progress["files_fetched"] = 3
+        await gate[0].wait()
+
+    async def scenario(queue):
+        gate.append(asyncio.Event())
+        first, created = queue.submit("owner_repo", "owner", "repo", "main")
+        again, created_again = queue.submit("owner_repo", "owner", "repo", "main")
+        other_branch, _ = queue.submit("owner_repo", "owner", "repo", "dev")
+        assert created and not created_again and again is first
+        assert other_branch is not first
+
+        gate[0].set()
+        await wait_finished(first, other_branch)
+        later, created_later = queue.submit("owner_repo", "owner", "repo", "main")
+        await wait_finished(later)
+        return first, later, created_later
+
+    first, later, created_later = run_queue(handler, scenario)
+
+    assert first.status == "completed" and first.progress == {"files_fetched": 3}
+    assert created_later and later is not first
+    assert len(runs) == 3
+
+
+def test_submit_with_other_options_is_a_new_job():
+    """
+    Test that a load with another ingestion mode or filter is not merged into the active one.
+    """
+    async def handler(job):
+        await asyncio.sleep(0.01)
+
+    async def scenario(queue):
+        first, _ = queue.submit("owner_repo", "owner", "repo", "main", tree_filter=TreeFilter(include=["src/**"]))
+        same, created_same = queue.submit(
+            "owner_repo", "owner", "repo", "main", tree_filter=TreeFilter(include=["src/**"])
+        )
+        archive, created_archive = queue.submit(
+            "owner_repo", "owner", "repo", "main", "archive", TreeFilter(include=["src/**"])
+        )
+        unfiltered, created_unfiltered = queue.submit("owner_repo", "owner", "repo", "main")
+        await wait_finished(first, archive, unfiltered)
+        return first, same, created_same, created_archive, created_unfiltered
+
+    first, same, created_same, created_archive, created_unfiltered = run_queue(handler, scenario)
+    assert same is first and not created_same
+    assert created_archive and created_unfiltered
+
+
+def test_loads_of_one_repo_id_run_one_at_a_time():
+    """
+    Test that branches of one repo_id run in submission order, one at a time,
+    while other repositories use the remaining workers.
+    """
+    running = {}
+    peaks = {}
+    order = []
+
+    async def handler(job):
+        running[job.repo_id] = running.get(job.repo_id, 0) + 1
+        peaks[job.repo_id] = max(peaks.get(job.repo_id, 0), running[job.repo_id])
+        peaks["all"] = max(peaks.get("all", 0), sum(running.values()))
+        order.append((job.repo_id, job.branch))
+        await asyncio.sleep(0.02)
+        running[job.repo_id] -= 1
+
+    async def scenario(queue):
+        jobs = [
+            queue.submit("owner_repo", "owner", "repo", branch)[0] for branch in ("main", "dev", "feature")
+        ] + [queue.submit("owner_other", "owner", "other", "main")[0]]
+        await wait_finished(*jobs)
+        return jobs
+
+    jobs = run_queue(handler, scenario, worker_count=3)
+    assert all(job.status == "completed" for job in jobs)
+    assert peaks["owner_repo"] == 1 and peaks["all"] == 2
+    assert [branch for repo_id, branch in order if repo_id == "owner_repo"] == ["main", "dev", "feature"]
+
+
+def test_failed_job_records_error_and_unknown_job_raises():
+    """
+    Test that handler errors mark the job failed and that lookups validate IDs.
+    """
+    async def handler(job):
+        raise RuntimeError("tree not found")
+
+    async def scenario(queue):
+        job, _ = queue.submit("owner_repo", "owner", "repo", "main")
+        await wait_finished(job)
+        assert queue.get(job.job_id) is job
+        with pytest.raises(ValueError):
+            queue.get("missing")
+        return job
+
+    job = run_queue(handler, scenario)
+    assert job.status == "failed"
+    assert job.error == "tree not found"
+
+
+def test_worker_count_bounds_concurrent_loads():
+    """
+    Test that no more than `worker_count` jobs run at once and old jobs are evicted.
+    """
+    running, peak = 0, 0
+
+    async def handler(job):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.02)
+        running -= 1
+
+    async def scenario(queue):
+        jobs = [queue.submit(f"owner_repo{i}", "owner", f"repo{i}", "main")[0] for i in range(6)]
+        await wait_finished(*jobs)
+        return queue, jobs
+
+    queue, jobs = run_queue(handler, scenario, worker_count=2, history_size=4)
+    assert peak == 2
+    assert all(job.status == "completed" for job in jobs)
+    assert sorted(queue.jobs) == sorted(job.job_id for job in jobs[2:])
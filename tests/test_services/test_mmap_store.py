@@ -0,0 +1,182 @@
+import asyncio
+import os
+import pytest
+from app.infrastructure.mmap_store import MmapStore
+from app.infrastructure.storage import create_storage
+from app.services.bundling_service import BundleService
+from app.services.redis_service import RedisService
+from app.services.repository_loader import RepositoryLoader
+from tests.test_services.test_repository_loader import FakeGitHubService
+
+
+@pytest.fixture
+def store(tmp_path):
+    """
+    Fixture providing an empty store in a temporary directory, closed afterwards.
+    """
+    store = MmapStore(str(tmp_path))
+    yield store
+    if not store._file.closed:
+        asyncio.run(store.close())
+
+
+def reopen(store):
+    asyncio.run(store.close())
+    return MmapStore(store.path)
+
+
+def test_values_survive_reopening(store):
+    """
+    Test that strings, bytes, hashes, counters and scored sets are replayed from the segment.
+    """
+    async def write():
+        await store.set_data("json", {"a": [1, 2]})
+        await store.set_many_bytes({"blob:1": b"\0Z binary", "blob:2": b"two"})
+        await store.set_text("blob:2", "overwritten")
+        await store.replace_hash("manifest", {"a.py": "sha-1", "b.py": "sha-2"})
+        await store.increment_many({"refs": 2})
+        await store.increment("refs")
+        await store.add_scored("gc", {"x": 2.0, "y": 1.0, "z": 3.0})
+        await store.remove_scored("gc", ["z"])
+        await store.delete_data("blob:1")
+
+    asyncio.run(write())
+    store = reopen(store)
+
+    async def read():
+        return (
+            await store.get_data("json"),
+            await store.get_many_bytes(["blob:1", "blob:2"]),
+            await store.get_hash_fields("manifest", ["b.py", "c.py"]),
+            await store.get_text("refs"),
+            await store.get_scored_below("gc", 5),
+        )
+
+    json_value, blobs, fields, refs, scored = asyncio.run(read())
+    assert json_value == {"a": [1, 2]}
+    assert blobs[0] is None and bytes(blobs[1]) == b"overwritten"
+    assert fields == ["sha-2", None]
+    assert refs == "3"
+    assert scored == ["y", "x"]
+    asyncio.run(store.close())
+
+
+def test_expired_values_are_missing(store):
+    """
+    Test that a value past its TTL reads as missing.
+    """
+    async def run():
+        await store.set_text("short", "x", ttl=-1)
+        await store.set_text("long", "y", ttl=60)
+        return await store.get_many_text(["short", "long"]), await store.exists("short")
+
+    assert asyncio.run(run()) == ([None, "y"], False)
+
+
+def test_torn_tail_is_truncated(store):
+    """
+    Test that an incomplete last record, as left by a crash mid-write, is dropped on open.
+    """
+    asyncio.run(store.set_many_text({"a": "1", "b": "2"}))
+    size = store._size
+    asyncio.run(store.set_text("c", "3" * 100))
+    asyncio.run(store.close())
+    segment = os.path.join(store.path, MmapStore.SEGMENT_NAME)
+    with open(segment, "r+b") as file:
+        file.truncate(size + 30)
+
+    store = MmapStore(store.path)
+    assert asyncio.run(store.get_many_text(["a", "b", "c"])) == ["1", "2", None]
+    assert os.path.getsize(segment) == size
+    asyncio.run(store.set_text("c", "again"))
+    assert asyncio.run(reopen(store).get_text("c")) == "again"
+
+
+def test_compaction_keeps_only_live_records(store):
+    """
+    Test that compacting drops overwritten and deleted records and keeps every live value.
+    """
+    async def write():
+        for version in range(20):
+            await store.set_text("value", str(version) * 1000)
+        await store.set_text("deleted", "x" * 1000)
+        await store.delete_data("deleted")
+        await store.replace_hash("hash", {"field": [1]})
+        await store.add_scored("scored", {"member": 1.5})
+
+    asyncio.run(write())
+    view = asyncio.run(store.get_many_bytes(["value"]))[0]
+    size = store._size
+    store.compact()
+
+    assert store._size < size / 10
+    assert bytes(view) == b"19" * 1000
+    assert asyncio.run(store.get_text("value")) == "19" * 1000
+    store = reopen(store)
+    assert asyncio.run(store.get_hash("hash")) == {"field": [1]}
+    assert asyncio.run(store.get_scored_below("scored", 2)) == ["member"]
+    asyncio.run(store.close())
+
+
+def test_overwrites_are_compacted_while_open(store):
+    """
+    Test that rewriting the same hash keeps the segment bounded without reopening.
+    """
+    store.COMPACT_MIN_BYTES = 64 * 1024
+    fields = {f"file{i}.py": f"sha-{i}" for i in range(200)}
+
+    async def write():
+        for version in range(200):
+            await store.replace_hash("manifest", {**fields, "version": version})
+            await store.add_scored("gc", {"member": float(version)})
+
+    asyncio.run(write())
+    assert store._size < 3 * store.COMPACT_MIN_BYTES
+    assert asyncio.run(store.get_hash_fields("manifest", ["version"])) == [199]
+    assert asyncio.run(store.get_scored_below("gc", 1000)) == ["member"]
+    store = reopen(store)
+    assert asyncio.run(store.get_hash_fields("manifest", ["file7.py", "version"])) == ["sha-7", 199]
+    asyncio.run(store.close())
+
+
+def test_views_survive_flush(store):
+    """
+    Test that values read before flush_db stay readable and the store starts empty.
+    """
+    asyncio.run(store.set_many_bytes({"blob:1": b"one", "blob:2": b"two" * 1000}))
+    views = asyncio.run(store.get_many_bytes(["blob:1", "blob:2"]))
+    asyncio.run(store.flush_db())
+
+    assert [bytes(view) for view in views] == [b"one", b"two" * 1000]
+    assert asyncio.run(store.get_many_bytes(["blob:1", "blob:2"])) == [None, None]
+    assert store._size == 0
+    asyncio.run(store.set_text("after", "flush"))
+    assert asyncio.run(reopen(store).get_text("after")) == "flush"
+
+
+def test_store_is_locked_to_one_process(store):
+    """
+    Test that a second store on the same directory is refused.
+    """
+    with pytest.raises(RuntimeError):
+        MmapStore(store.path)
+
+
+def test_load_and_bundle_on_the_mmap_backend(tmp_path, redis_client):
+    """
+    Test that a repository loaded into the mmap store bundles the same as in
+    memory, before and after reopening the store.
+    """
+    files = {f"pkg/module{i}.py": f"import pkg.module{i + 1}\n" for i in range(20)}
+    store = create_storage("mmap", str(tmp_path))
+
+    async def load_and_bundle(storage):
+        loader = RepositoryLoader(FakeGitHubService(files), RedisService(storage, blob_compression="zlib"), chunk_size=5)
+        await loader.load("owner", "repo", "main", "owner_repo")
+        return await BundleService("owner_repo", storage).generate_bundle("pkg/module17.py")
+
+    expected = asyncio.run(load_and_bundle(redis_client))
+    assert asyncio.run(load_and_bundle(store)) == expected
+    store = reopen(store)
+    assert asyncio.run(BundleService("owner_repo", store).generate_bundle("pkg/module17.py")) == expected
+    asyncio.run(store.close())
@@ -0,0 +1,97 @@
+import asyncio
+from app.services.redis_service import RedisService
+
+
+def test_manifests_share_blobs(redis_client):
+    """
+    Test that refs holding the same content read the same blob through their
+    own manifests, and that bundles read through the current ref by default.
+    """
+    async def run():
+        redis_service = RedisService(redis_client)
+        await redis_service.save_blobs({"sha-1": "print(1)", "sha-2": "print(2)"})
+        await redis_service.save_file_manifest("repo", "main", {"a.py": "sha-1", "b.py": "sha-2"})
+        await redis_service.save_file_manifest("repo", "fork", {"moved/a.py": "sha-1"})
+        unset = await redis_service.get_file_content("repo", "a.py")
+        await redis_service.set_current_ref("repo", "main")
+        return (
+            unset,
+            await RedisService(redis_client).get_file_contents("repo", ["a.py", "b.py", "missing.py"]),
+            await redis_service.get_file_content("repo", "moved/a.py", ref="fork"),
+        )
+
+    unset, main, fork = asyncio.run(run())
+    assert unset is None
+    assert main == {"a.py": "print(1)", "b.py": "print(2)", "missing.py": None}
+    assert fork == "print(1)"
+    assert redis_client.store["blob_refs:sha-1"] == "2"
+
+
+def test_concurrent_manifest_saves_keep_reference_counts_exact(redis_client):
+    """
+    Test that two saves of one ref racing each other leave the reference counts
+    of the manifest saved last.
+    """
+    get_hash = redis_client.get_hash
+
+    async def slow_get_hash(key):
+        fields = await get_hash(key)
+        await asyncio.sleep(0.01)
+        return fields
+
+    redis_client.get_hash = slow_get_hash
+
+    async def run():
+        redis_service = RedisService(redis_client)
+        await asyncio.gather(
+            redis_service.save_file_manifest("repo", "main", {"a.py": "sha-1"}),
+            redis_service.save_file_manifest("repo", "main", {"a.py": "sha-2"}),
+        )
+
+    asyncio.run(run())
+    assert redis_client.store["blob_refs:sha-1"] == "0"
+    assert redis_client.store["blob_refs:sha-2"] == "1"
+
+
+def test_unreferenced_blobs_are_collected_after_the_grace_period(redis_client):
+    """
+    Test that blobs dropped by every manifest are deleted once the grace period
+    has passed, and that blobs referenced again are kept.
+    """
+    async def run():
+        redis_service = RedisService(redis_client)
+        await redis_service.save_blobs({"sha-1": "one", "sha-2": "two", "sha-3": "three"})
+        await redis_service.save_file_manifest("repo", "main", {"a.py": "sha-1", "b.py": "sha-2", "c.py": "sha-3"})
+        await redis_service.save_file_manifest("repo", "main", {"a.py": "sha-1"})
+        await redis_service.save_file_manifest("fork", "main", {"c.py": "sha-3"})
+
+        kept = await redis_service.collect_garbage()
+        collected = await redis_service.collect_garbage(grace=-1)
+        return kept, collected
+
+    assert asyncio.run(run()) == (0, 1)
+    assert "blob:sha-2" not in redis_client.store
+    assert "blob:sha-1" in redis_client.store and "blob:sha-3" in redis_client.store
+    assert redis_client.store["blob_gc"] == {}
+
+
+def test_blobs_are_compressed_with_the_repository_dictionary(redis_client):
+    """
+    Test that blobs are stored compressed with a dictionary trained from the first
+    batch, and that contents stored uncompressed are still readable.
+    """
+    contents = {f"sha-{i}": f"import os\nimport json\n\n\ndef view_{i}(request):\n    return json.dumps(request)\n" for i in range(32)}
+
+    async def run():
+        redis_service = RedisService(redis_client, blob_compression="zlib")
+        await redis_service.save_blobs(contents, "repo")
+        await RedisService(redis_client, blob_compression="none").save_blobs({"sha-old": "legacy text"})
+        await redis_service.save_file_manifest("repo", "main", {f"{sha}.py": sha for sha in [*contents, "sha-old"]})
+        paths = [f"{sha}.py" for sha in [*contents, "sha-old"]]
+        return await RedisService(redis_client).get_file_contents("repo", paths, ref="main")
+
+    read = asyncio.run(run())
+    assert list(read.values()) == [*contents.values(), "legacy text"]
+    assert "blob_dictionary:repo" in redis_client.store
+    assert sum(len(redis_client.store[f"blob:{sha}"]) for sha in contents) < sum(map(len, contents.values())) * 0.7
+    assert redis_client.store["blob:sha-old"] == "legacy text"
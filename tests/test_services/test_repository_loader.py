@@ -0,0 +1,293 @@
+import asyncio
+import pytest
+from app.services.redis_service import RedisService
+from app.services.repository_loader import RepositoryLoader
+from app.utils.filtering import TreeFilter
+from app.utils.path_resolver import RESOLVER_VERSION
+
+
+class FakeGitHubService:
+    """
+    Serves a mutable in-memory repository and counts content fetches.
+    """
+
+    def __init__(self, files):
+        self.files = dict(files)
+        self.fetched = []
+
+    async def fetch_repo_tree(self, owner, repo, branch="main"):
+        return [
+            {"path": path, "type": "blob", "sha": str(hash(content)), "size": len(content)}
+            for path, content in self.files.items()
+        ]
+
+    async def fetch_file_content(self, owner, repo, path, branch="main"):
+        self.fetched.append(path)
+        return self.files[path]
+
+
+@pytest.fixture
+def repo_files():
+    """
+    Fixture providing a small Python package with a chain of imports.
+    """
+    files = {f"pkg/module{i}.py": f"import pkg.module{i + 1}\nimport os\n" for i in range(10)}
+    files["README.md"] = "# docs"
+    return files
+
+
+def normalized(graph):
+    return {node: {kind: sorted(files) for kind, files in edges.items()} for node, edges in graph.items()}
+
+
+def load(github_service, redis_client):
+    loader = RepositoryLoader(github_service, RedisService(redis_client), chunk_size=3)
+    return asyncio.run(loader.load("owner", "repo", "main", "owner_repo"))
+
+
+def test_reload_fetches_only_changed_blobs(repo_files, redis_client):
+    """
+    Test that a reload fetches only modified and added files and matches a full load.
+    """
+    github_service = FakeGitHubService(repo_files)
+    load(github_service, redis_client)
+    assert sorted(github_service.fetched) == sorted(p for p in repo_files if p.endswith(".py"))
+
+    github_service.files["pkg/module3.py"] = "import pkg.module7\n"
+    github_service.files["pkg/extra.py"] = "import pkg.module0\n"
+    del github_service.files["pkg/module9.py"]
+    github_service.fetched.clear()
+    incremental_graph = load(github_service, redis_client)
+
+    assert sorted(github_service.fetched) == ["pkg/extra.py", "pkg/module3.py"]
+    assert redis_client.store["blob_refs:" + str(hash(repo_files["pkg/module9.py"]))] == "0"
+
+    full_graph = load(FakeGitHubService(github_service.files), type(redis_client)())
+    assert normalized(incremental_graph) == normalized(full_graph)
+    assert incremental_graph["pkg/module3.py"]["Depends On"] == ["pkg/module7.py"]
+
+    github_service.fetched.clear()
+    assert normalized(load(github_service, redis_client)) == normalized(incremental_graph)
+    assert github_service.fetched == []
+
+
+def test_load_reports_progress(repo_files, redis_client):
+    """
+    Test that the progress dict ends with every source file fetched, parsed and
+    resolved, and that every stage was timed.
+    """
+    progress = {}
+    loader = RepositoryLoader(FakeGitHubService(repo_files), RedisService(redis_client), progress=progress)
+    asyncio.run(loader.load("owner", "repo", "main", "owner_repo"))
+
+    assert progress == {
+        "stage": "done",
+        "files_total": 10,
+        "files_skipped": 1,
+        "files_reused": 0,
+        "files_fetched": 10,
+        "files_parsed": 10,
+        "files_resolved": 10,
+    }
+    assert set(loader.timings) == {
+        "tree_fetch", "filter", "content_fetch", "blob_write", "parse", "resolve", "graph_build", "export",
+        "redis_write",
+    }
+
+
+def test_tree_filter_skips_blobs_before_fetching(repo_files, redis_client):
+    """
+    Test that excluded, non-included and oversized blobs are never downloaded.
+    """
+    repo_files["node_modules/lib/index.js"] = "import x from './x';"
+    repo_files["pkg/generated.py"] = "import os\n" * 1000
+    repo_files["scripts/tool.py"] = "import pkg.module0\n"
+    github_service = FakeGitHubService(repo_files)
+    loader = RepositoryLoader(
+        github_service,
+        RedisService(redis_client),
+        tree_filter=TreeFilter(include=["pkg/**", "node_modules/**"], max_blob_size=1000),
+    )
+    asyncio.run(loader.load("owner", "repo", "main", "owner_repo"))
+
+    assert sorted(github_service.fetched) == sorted(f"pkg/module{i}.py" for i in range(10))
+    assert loader.progress["files_skipped"] == 4
+
+
+def test_second_ref_reuses_stored_blobs(repo_files, redis_client):
+    """
+    Test that loading another ref stores each shared blob once and does not download it again.
+    """
+    load(FakeGitHubService(repo_files), redis_client)
+    blobs = sorted(key for key in redis_client.store if key.startswith("blob:"))
+
+    branch_files = dict(repo_files, **{"pkg/module0.py": "import pkg.module2\n"})
+    github_service = FakeGitHubService(branch_files)
+    loader = RepositoryLoader(github_service, RedisService(redis_client))
+    graph = asyncio.run(loader.load("owner", "repo", "feature", "owner_repo_feature"))
+
+    assert github_service.fetched == ["pkg/module0.py"]
+    assert loader.progress["files_reused"] == 9
+    assert len([key for key in redis_client.store if key.startswith("blob:")]) == len(blobs) + 1
+    assert graph["pkg/module0.py"]["Depends On"] == ["pkg/module2.py"]
+    assert redis_client.store["blob_refs:" + str(hash(repo_files["pkg/module5.py"]))] == "2"
+
+
+def test_branches_of_one_repository_keep_their_own_manifests(repo_files, redis_client):
+    """
+    Test that loading a second branch of a repo_id neither overwrites the
+    manifest of the first nor releases its blobs, and that bundles read the
+    branch loaded last.
+    """
+    load(FakeGitHubService(repo_files), redis_client)
+    feature_files = dict(repo_files, **{"pkg/module0.py": "import pkg.module2\n"})
+    feature_loader = RepositoryLoader(FakeGitHubService(feature_files), RedisService(redis_client))
+    asyncio.run(feature_loader.load("owner", "repo", "feature", "owner_repo"))
+
+    github_service = FakeGitHubService(repo_files)
+    loader = RepositoryLoader(github_service, RedisService(redis_client))
+    graph = asyncio.run(loader.load("owner", "repo", "main", "owner_repo"))
+
+    assert github_service.fetched == []
+    assert graph["pkg/module0.py"]["Depends On"] == ["pkg/module1.py"]
+    assert redis_client.store["blob_refs:" + str(hash(repo_files["pkg/module0.py"]))] == "1"
+    assert redis_client.store["blob_refs:" + str(hash(repo_files["pkg/module5.py"]))] == "2"
+    content = asyncio.run(RedisService(redis_client).get_file_content("owner_repo", "pkg/module0.py"))
+    assert content == repo_files["pkg/module0.py"]
+
+
+def test_reload_after_a_resolver_change_resolves_every_file(repo_files, redis_client, monkeypatch):
+    """
+    Test that resolved dependencies stored by another resolver version are not
+    patched but resolved again, from the cached parse results.
+    """
+    load(FakeGitHubService(repo_files), redis_client)
+
+    def reload():
+        github_service = FakeGitHubService(repo_files)
+        loader = RepositoryLoader(github_service, RedisService(redis_client))
+        asyncio.run(loader.load("owner", "repo", "main", "owner_repo"))
+        return github_service.fetched, loader.progress["files_resolved"]
+
+    assert reload() == ([], 0)
+    monkeypatch.setattr("app.services.redis_service.RESOLVER_VERSION", RESOLVER_VERSION + 1)
+    assert reload() == ([], 10)
+    assert reload() == ([], 0)
+
+
+class SlowRedisService(RedisService):
+    """
+    Writes content batches slowly, so the fetchers outrun the consumer; fails
+    every write once `fail` is set.
+    """
+
+    fail = False
+
+    async def save_blobs(self, blobs, repo_id=None):
+        await asyncio.sleep(0.002)
+        if self.fail:
+            raise ConnectionError("storage unavailable")
+        await super().save_blobs(blobs, repo_id)
+
+
+class ArchiveGitHubService(FakeGitHubService):
+    """
+    Streams the repository as an archive, failing after `fail_after` files if set.
+    """
+
+    def __init__(self, files, fail_after=None):
+        super().__init__(files)
+        self.fail_after = fail_after
+
+    async def stream_archive_files(self, owner, repo, wanted, branch="main"):
+        for count, (path, content) in enumerate(self.files.items()):
+            if count == self.fail_after:
+                raise ConnectionError("archive stream reset")
+            if wanted(path):
+                yield path, content
+
+
+@pytest.fixture
+def queue_sizes(monkeypatch):
+    """
+    Fixture recording the size of every bounded asyncio queue after each put.
+    """
+    sizes = []
+
+    class RecordingQueue(asyncio.Queue):
+        def put_nowait(self, item):
+            super().put_nowait(item)
+            if self.maxsize:
+                sizes.append(self.qsize())
+
+    monkeypatch.setattr(asyncio, "Queue", RecordingQueue)
+    return sizes
+
+
+def stream(loader, files, redis_client):
+    blob_shas = {path: str(hash(content)) for path, content in files.items()}
+    contents = loader.stream_contents("owner", "repo", "main", "owner_repo", blob_shas)
+    # A hung producer or consumer fails the test instead of blocking it
+    return asyncio.run(asyncio.wait_for(contents, timeout=10))
+
+
+@pytest.mark.parametrize("ingestion_mode", ["raw", "archive"])
+def test_pipeline_delivers_every_file_within_the_queue_bound(ingestion_mode, redis_client, queue_sizes):
+    """
+    Test that every fetched file is stored and parsed while no more than
+    `queue_size` files wait for the slower consumer.
+    """
+    files = {f"pkg/module{i}.py": f"import pkg.module{i + 1}\n" for i in range(40)}
+    github_service = (ArchiveGitHubService if ingestion_mode == "archive" else FakeGitHubService)(files)
+    loader = RepositoryLoader(
+        github_service, SlowRedisService(redis_client), queue_size=3, chunk_size=4, write_batch_size=2,
+        ingestion_mode=ingestion_mode,
+    )
+    raw_dependencies = stream(loader, files, redis_client)
+
+    assert sorted(raw_dependencies) == sorted(files)
+    assert raw_dependencies["pkg/module7.py"] == ["pkg.module8"]
+    assert all(f"blob:{hash(content)}" in redis_client.store for content in files.values())
+    assert not loader.failures
+    assert max(queue_sizes) == 3
+
+
+def test_pipeline_records_files_that_fail_to_fetch(repo_files, redis_client):
+    """
+    Test that a file failing to fetch is reported while every other file arrives.
+    """
+    github_service = FakeGitHubService(repo_files)
+    del github_service.files["pkg/module4.py"]
+    files = {path: content for path, content in repo_files.items() if path.endswith(".py")}
+    raw_dependencies = stream(RepositoryLoader(github_service, RedisService(redis_client)), files, redis_client)
+
+    assert sorted(raw_dependencies) == sorted(path for path in files if path != "pkg/module4.py")
+
+
+def test_pipeline_aborts_cleanly_when_the_archive_stream_fails(repo_files, redis_client):
+    """
+    Test that a failing archive download aborts the load without a hung consumer
+    or anything saved.
+    """
+    loader = RepositoryLoader(
+        ArchiveGitHubService(repo_files, fail_after=5), SlowRedisService(redis_client), queue_size=1,
+        ingestion_mode="archive",
+    )
+    with pytest.raises(ConnectionError):
+        asyncio.run(asyncio.wait_for(loader.load("owner", "repo", "main", "owner_repo"), timeout=10))
+    assert "dependency_map:owner_repo" not in redis_client.store
+
+
+def test_pipeline_aborts_cleanly_when_writes_fail(redis_client):
+    """
+    Test that a failing write stops the fetchers blocked on a full queue.
+    """
+    files = {f"pkg/module{i}.py": f"import pkg.module{i + 1}\n" for i in range(20)}
+    redis_service = SlowRedisService(redis_client)
+    redis_service.fail = True
+    loader = RepositoryLoader(
+        FakeGitHubService(files), redis_service, fetch_concurrency=2, queue_size=1, write_batch_size=1
+    )
+    with pytest.raises(ConnectionError):
+        stream(loader, files, redis_client)
+    assert loader.progress["files_fetched"] < len(files)
@@ -0,0 +1,88 @@
+import pytest
+from app.utils import blob_codec
+from app.utils.blob_codec import (
+    COMPRESSION_IDS,
+    check_compression,
+    decode_blobs,
+    dictionary_id,
+    dictionary_ids,
+    encode_blobs,
+    is_encoded,
+    train_dictionary,
+)
+
+
+@pytest.fixture
+def contents():
+    """
+    Fixture providing small files sharing their imports and boilerplate.
+    """
+    return {
+        f"sha-{i}": (
+            "import os\nimport sys\nfrom app.services.redis_service import RedisService\n\n\n"
+            f"def handler_{i}(request):\n    \"\"\"\n    Handle request {i}.\n    \"\"\"\n    return RedisService(request)\n"
+        )
+        for i in range(40)
+    }
+
+
+@pytest.mark.parametrize("compression", list(COMPRESSION_IDS))
+@pytest.mark.parametrize("with_dictionary", [False, True])
+def test_round_trip(contents, compression, with_dictionary):
+    """
+    Test that every compression decodes back to the same text, with or without a dictionary.
+    """
+    dictionary = train_dictionary(list(contents.values()), 4096, compression) if with_dictionary else None
+    encoded = encode_blobs(contents, compression, dictionary)
+
+    assert all(is_encoded(value) for value in encoded.values())
+    dictionaries = {dictionary_id(dictionary): dictionary} if dictionary else {}
+    assert dictionary_ids(encoded.values()) == set(dictionaries)
+    assert decode_blobs(list(encoded.values()), dictionaries) == list(contents.values())
+
+
+def test_dictionary_shrinks_small_files(contents):
+    """
+    Test that a dictionary trained on the repository beats compressing each small file alone.
+    """
+    dictionary = train_dictionary(list(contents.values()), 4096, "zlib")
+    plain = sum(map(len, encode_blobs(contents, "zlib").values()))
+    trained = sum(map(len, encode_blobs(contents, "zlib", dictionary).values()))
+
+    assert dictionary and trained < plain * 0.7
+
+
+def test_plain_text_and_missing_values_coexist(contents):
+    """
+    Test that values stored before compression, and missing ones, decode alongside compressed ones.
+    """
+    encoded = encode_blobs({"sha-0": contents["sha-0"], "tiny": "x"}, "zlib")
+
+    assert decode_blobs([encoded["sha-0"], "plain ü".encode(), None, encoded["tiny"]], {}) == [
+        contents["sha-0"], "plain ü", None, "x",
+    ]
+
+
+def test_missing_dictionary_raises(contents):
+    """
+    Test that a value compressed with an unknown dictionary is reported rather than garbled.
+    """
+    dictionary = train_dictionary(list(contents.values()), 4096, "zlib")
+    encoded = encode_blobs(contents, "zlib", dictionary)
+
+    with pytest.raises(ValueError, match="dictionary"):
+        decode_blobs(list(encoded.values()), {})
+
+
+def test_missing_codec_fails_the_check(monkeypatch):
+    """
+    Test that a configured codec whose library is missing is rejected up front.
+    """
+    check_compression("zstd")
+    monkeypatch.setattr(blob_codec, "zstandard", None)
+    with pytest.raises(RuntimeError):
+        check_compression("zstd")
+    with pytest.raises(RuntimeError):
+        blob_codec.encode_blobs({"sha": "text"}, "zstd")
+    with pytest.raises(ValueError):
+        check_compression("brotli")
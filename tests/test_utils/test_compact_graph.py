@@ -0,0 +1,165 @@
+import random
+import pytest
+from app.utils.compact_graph import CompactGraph, GraphIndex
+
+
+@pytest.fixture
+def dependencies():
+    """
+    Fixture providing resolved dependencies with a duplicate edge, a self-loop,
+    a file without dependencies and two components.
+    """
+    return {
+        "a.py": ["b.py", "c.py", "b.py"],
+        "b.py": ["c.py"],
+        "d.py": ["c.py", "d.py"],
+        "e.py": [],
+        "x.py": ["y.py"],
+    }
+
+
+def test_dependency_map(dependencies):
+    """
+    Test the exported map, including neighbour order and skipped isolated files.
+    """
+    assert CompactGraph.from_dependencies(dependencies).to_dependency_map() == {
+        "a.py": {"Depends On": ["b.py", "c.py"]},
+        "b.py": {"Depends On": ["c.py"], "Used By": ["a.py"]},
+        "c.py": {"Used By": ["a.py", "b.py", "d.py"]},
+        "d.py": {"Depends On": ["c.py", "d.py"], "Used By": ["d.py"]},
+        "x.py": {"Depends On": ["y.py"]},
+        "y.py": {"Used By": ["x.py"]},
+    }
+
+
+def test_graph_queries(dependencies):
+    """
+    Test the DiGraph-style accessors.
+    """
+    graph = CompactGraph.from_dependencies(dependencies)
+
+    assert graph.nodes == ["a.py", "b.py", "c.py", "d.py", "x.py", "y.py"]
+    assert graph.number_of_edges() == 6
+    assert list(graph.successors("a.py")) == ["b.py", "c.py"]
+    assert list(graph.predecessors("c.py")) == ["a.py", "b.py", "d.py"]
+    assert graph.has_node("x.py") and "e.py" not in graph
+    assert sorted(map(sorted, graph.weakly_connected_components())) == [
+        ["a.py", "b.py", "c.py", "d.py"],
+        ["x.py", "y.py"],
+    ]
+
+
+def test_matches_networkx_on_random_graph():
+    """
+    Test that the export is identical, order included, to the networkx-based one.
+    """
+    nx = pytest.importorskip("networkx")
+    rng = random.Random(7)
+    paths = [f"pkg/module{i}.py" for i in range(300)]
+    dependencies = {path: rng.sample(paths, rng.randint(0, 6)) for path in paths}
+
+    digraph = nx.DiGraph()
+    for file_path, file_dependencies in dependencies.items():
+        for dependency in file_dependencies:
+            digraph.add_edge(file_path, dependency)
+    expected = {}
+    for node in digraph.nodes:
+        expected[node] = {}
+        if list(digraph.successors(node)):
+            expected[node]["Depends On"] = list(digraph.successors(node))
+        if list(digraph.predecessors(node)):
+            expected[node]["Used By"] = list(digraph.predecessors(node))
+
+    graph = CompactGraph.from_dependencies(dependencies)
+    assert graph.to_dependency_map() == expected
+    assert list(graph.to_dependency_map()) == list(expected)
+    assert sorted(map(sorted, graph.weakly_connected_components())) == sorted(
+        sorted(component) for component in nx.weakly_connected_components(digraph)
+    )
+
+
+@pytest.fixture
+def cyclic_graph():
+    """
+    Fixture providing a three-file cycle between an importer and a chain
+    ending in a self-loop, plus a separate two-file cycle.
+    """
+    return CompactGraph.from_dependencies({
+        "main.py": ["a.py"],
+        "a.py": ["b.py"],
+        "b.py": ["c.py"],
+        "c.py": ["a.py", "d.py"],
+        "d.py": ["e.py"],
+        "e.py": ["e.py"],
+        "x.py": ["y.py"],
+        "y.py": ["x.py"],
+    })
+
+
+def test_components_are_topologically_ordered(cyclic_graph):
+    """
+    Test that files in a cycle share a component and edges never go to an earlier component.
+    """
+    component_of = cyclic_graph.strongly_connected_components()
+    by_path = dict(zip(cyclic_graph.paths, component_of))
+
+    assert by_path["a.py"] == by_path["b.py"] == by_path["c.py"]
+    assert by_path["x.py"] == by_path["y.py"] != by_path["a.py"]
+    assert len(set(component_of)) == 5
+    offsets, targets = cyclic_graph.forward_csr()
+    for node_id in range(len(cyclic_graph)):
+        for target in targets[offsets[node_id]:offsets[node_id + 1]]:
+            assert component_of[node_id] <= component_of[target]
+
+
+def test_graph_index_queries(cyclic_graph):
+    """
+    Test cycles, transitive dependencies and dependents, and shortest paths.
+    """
+    graph_index = GraphIndex.build(cyclic_graph)
+
+    assert graph_index.cycles() == [["a.py", "b.py", "c.py"], ["x.py", "y.py"], ["e.py"]]
+    assert graph_index.members("b.py") == ["a.py", "b.py", "c.py"]
+    assert graph_index.dependencies("b.py") == ["a.py", "c.py", "d.py", "e.py"]
+    assert graph_index.dependents("d.py") == ["a.py", "b.py", "c.py", "main.py"]
+    assert graph_index.dependents("main.py") == []
+    assert graph_index.shortest_path("main.py", "e.py") == ["main.py", "a.py", "b.py", "c.py", "d.py", "e.py"]
+    assert graph_index.shortest_path("c.py", "b.py") == ["c.py", "a.py", "b.py"]
+    assert graph_index.shortest_path("e.py", "a.py") is None
+    assert graph_index.shortest_path("x.py", "a.py") is None
+    with pytest.raises(ValueError):
+        graph_index.dependencies("missing.py")
+
+
+def test_graph_index_matches_brute_force_on_random_graph():
+    """
+    Test closures and path lengths against plain breadth-first searches over the file graph.
+    """
+    rng = random.Random(11)
+    paths = [f"pkg/module{i}.py" for i in range(200)]
+    graph = CompactGraph.from_dependencies({path: rng.sample(paths, rng.randint(0, 3)) for path in paths})
+    graph_index = GraphIndex.build(graph)
+
+    def distances(path, neighbours):
+        found = {path: 0}
+        queue = [path]
+        for current in queue:
+            for neighbour in neighbours(current):
+                if neighbour not in found:
+                    found[neighbour] = found[current] + 1
+                    queue.append(neighbour)
+        return found
+
+    for path in rng.sample(graph.paths, 30):
+        forward = distances(path, graph.successors)
+        backward = distances(path, graph.predecessors)
+        assert graph_index.dependencies(path) == sorted(set(forward) - {path})
+        assert graph_index.dependents(path) == sorted(set(backward) - {path})
+        for target in rng.sample(graph.paths, 10):
+            shortest = graph_index.shortest_path(path, target)
+            if target not in forward:
+                assert shortest is None
+                continue
+            assert len(shortest) - 1 == forward[target]
+            assert shortest[0] == path and shortest[-1] == target
+            assert all(b in graph.successors(a) for a, b in zip(shortest, shortest[1:]))
@@ -0,0 +1,47 @@
+import pytest
+from app.utils.filtering import TreeFilter, compile_globs
+
+
+@pytest.mark.parametrize("glob, path, expected", [
+    ("node_modules/", "node_modules/react/index.js", True),
+    ("node_modules/", "web/node_modules/react/index.js", True),
+    ("node_modules/", "src/node_modules.js", False),
+    ("/build/", "build/out.js", True),
+    ("/build/", "src/build/out.js", False),
+    ("src/**/*.ts", "src/app.ts", True),
+    ("src/**/*.ts", "src/a/b/app.ts", True),
+    ("src/**/*.ts", "lib/src/app.ts", False),
+    ("*.min.js", "static/js/app.min.js", True),
+    ("test_?.py", "tests/test_a.py", True),
+    ("[!a]*.py", "b.py", True),
+    ("[!a]*.py", "a.py", False),
+])
+def test_glob_matching(glob, path, expected):
+    """
+    Test gitignore-style glob semantics over repository paths.
+    """
+    assert (compile_globs([glob]).fullmatch(path) is not None) == expected
+
+
+def test_tree_filter_select():
+    """
+    Test that tree entries are selected by extension, size, include and exclude rules.
+    """
+    tree = [
+        {"path": "src", "type": "tree"},
+        {"path": "src/app.py", "type": "blob", "size": 100},
+        {"path": "src/big.py", "type": "blob", "size": 5000},
+        {"path": "src/logo.png", "type": "blob", "size": 100},
+        {"path": "src/vendor/lib.py", "type": "blob", "size": 100},
+        {"path": "src/gen/schema.py", "type": "blob", "size": 100},
+        {"path": "docs/conf.py", "type": "blob", "size": 100},
+    ]
+    tree_filter = TreeFilter(include=["src/"], exclude=["gen/"], max_blob_size=1000)
+
+    assert tree_filter.select(tree) == (
+        ["src/app.py"],
+        {"size": 1, "extension": 1, "excluded": 2, "not_included": 1},
+    )
+    assert TreeFilter(default_excludes=False, max_blob_size=0).select(tree)[0] == [
+        "src/app.py", "src/big.py", "src/vendor/lib.py", "src/gen/schema.py", "docs/conf.py",
+    ]
@@ -0,0 +1,108 @@
+import json
+import pytest
+from app.utils.compact_graph import CompactGraph, GraphIndex
+from app.utils import graph_codec
+from app.utils.graph_codec import (
+    available_compressions,
+    check_compression,
+    decode_dependency_map,
+    decode_graph_index,
+    encode_dependency_map,
+    encode_graph_index,
+    is_encoded,
+    load_dependency_map,
+)
+
+
+@pytest.fixture
+def dependency_map():
+    """
+    Fixture providing an exported map with a self-loop and a cross-directory edge.
+    """
+    return CompactGraph.from_dependencies({
+        "src/app.py": ["src/models/user.py", "src/utils.py"],
+        "src/models/user.py": ["src/utils.py"],
+        "src/utils.py": ["src/utils.py"],
+        "tests/test_app.py": ["src/app.py", "src/models/user.py"],
+    }).to_dependency_map()
+
+
+@pytest.mark.parametrize("compression", [
+    "none", "zlib", "zstd",
+    pytest.param("lz4", marks=pytest.mark.skipif("lz4" not in available_compressions(), reason="lz4 not installed")),
+])
+def test_round_trip(dependency_map, compression):
+    """
+    Test that every compression setting decodes back to the same map.
+    """
+    encoded = encode_dependency_map(dependency_map, compression)
+
+    assert is_encoded(encoded)
+    assert decode_dependency_map(encoded).to_dependency_map() == dependency_map
+
+
+def test_decoded_graph_reads_like_the_map(dependency_map):
+    """
+    Test indexing the decoded graph without exporting it.
+    """
+    graph = decode_dependency_map(encode_dependency_map(dependency_map))
+
+    assert "src/utils.py" in graph and "missing.py" not in graph
+    assert graph["src/models/user.py"] == dependency_map["src/models/user.py"]
+    assert graph.get("missing.py") is None
+
+
+def test_binary_map_is_smaller_than_json():
+    """
+    Test the size reduction on a map where paths repeat across many edges.
+    """
+    paths = [f"src/package{i % 10}/module{i}.py" for i in range(200)]
+    dependency_map = CompactGraph.from_dependencies(
+        {path: paths[i + 1:i + 9] for i, path in enumerate(paths)}
+    ).to_dependency_map()
+
+    assert len(encode_dependency_map(dependency_map, "none")) * 10 < len(json.dumps(dependency_map))
+
+
+def test_load_accepts_json_and_rejects_unknown_versions(dependency_map):
+    """
+    Test the JSON fallback and the version check.
+    """
+    assert load_dependency_map(json.dumps(dependency_map).encode()) == dependency_map
+
+    encoded = bytearray(encode_dependency_map(dependency_map))
+    encoded[4] = 99
+    with pytest.raises(ValueError, match="version 99"):
+        decode_dependency_map(bytes(encoded))
+
+
+@pytest.mark.parametrize("compression", ["none", "zlib", "zstd"])
+def test_graph_index_round_trip(dependency_map, compression):
+    """
+    Test that a graph index decodes to the same graph, components and cycles.
+    """
+    graph_index = GraphIndex.build(CompactGraph.from_dependencies(
+        {path: edges.get("Depends On", []) for path, edges in dependency_map.items()}
+    ))
+    encoded = encode_graph_index(graph_index, compression)
+    decoded = decode_graph_index(encoded)
+
+    assert not is_encoded(encoded)
+    assert decoded.graph.to_dependency_map() == graph_index.graph.to_dependency_map()
+    assert decoded.component_of == graph_index.component_of
+    assert decoded.cycles() == [["src/utils.py"]]
+    assert decoded.dependents("src/utils.py") == ["src/app.py", "src/models/user.py", "tests/test_app.py"]
+    with pytest.raises(ValueError):
+        decode_dependency_map(encoded)
+
+
+def test_missing_codec_fails_the_check(dependency_map, monkeypatch):
+    """
+    Test that a codec whose library is missing is rejected instead of replaced by zlib.
+    """
+    check_compression("zstd")
+    monkeypatch.setattr(graph_codec, "zstandard", None)
+    with pytest.raises(RuntimeError):
+        check_compression("zstd")
+    with pytest.raises(RuntimeError):
+        encode_dependency_map(dependency_map, "zstd")
@@ -0,0 +1,46 @@
+import pytest
+from app.utils.metrics import Counter, Histogram, MetricsRegistry, STAGE_SECONDS, stage_timer
+
+
+def test_render_prometheus_text():
+    """
+    Test the exposition format of counters and cumulative histogram buckets.
+    """
+    registry = MetricsRegistry()
+    requests = registry.register(Counter("requests_total", "Requests.", ["route"]))
+    latency = registry.register(Histogram("latency_seconds", "Latency.", buckets=(0.1, 1)))
+
+    requests.inc(route='/a"b')
+    requests.inc(2, route='/a"b')
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(3)
+
+    assert registry.render().splitlines() == [
+        "# HELP requests_total Requests.",
+        "# TYPE requests_total counter",
+        'requests_total{route="/a\\"b"} 3',
+        "# HELP latency_seconds Latency.",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{le="0.1"} 1',
+        'latency_seconds_bucket{le="1"} 2',
+        'latency_seconds_bucket{le="+Inf"} 3',
+        "latency_seconds_sum 3.55",
+        "latency_seconds_count 3",
+    ]
+    with pytest.raises(ValueError):
+        requests.inc(method="GET")
+
+
+def test_stage_timer_accumulates_timings():
+    """
+    Test that repeated stages add up in the timings dict and the stage histogram.
+    """
+    timings = {}
+    before = STAGE_SECONDS.count(stage="test_stage")
+    for _ in range(2):
+        with stage_timer("test_stage", timings):
+            pass
+
+    assert list(timings) == ["test_stage"]
+    assert STAGE_SECONDS.count(stage="test_stage") == before + 2
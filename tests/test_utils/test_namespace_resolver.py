@@ -0,0 +1,70 @@
+import pytest
+from difflib import get_close_matches
+from app.utils.namespace_resolver import NamespaceResolver
+
+
+@pytest.fixture
+def namespace_mapping():
+    """
+    Fixture providing a namespace mapping shaped like DependencyAnalyzer's.
+    """
+    mapping = {}
+    for file_path in [
+        "app/services/github_service.py",
+        "app/services/redis_service.py",
+        "app/utils/parsing_utils.py",
+        "src/Orders/OrderService.cs",
+        "src/Orders/Entities/Order.cs",
+        "web/components/App.tsx",
+        "include/custom.h",
+    ]:
+        parts = file_path.replace("/", ".").split(".")
+        mapping[parts[-2]] = file_path
+        mapping[".".join(parts[:-1])] = file_path
+        for i in range(len(parts) - 1):
+            mapping[".".join(parts[i:])] = file_path
+    return mapping
+
+
+def difflib_resolve(mapping, dependency):
+    """
+    Reference implementation: the original exact-then-difflib lookup.
+    """
+    if dependency in mapping:
+        return mapping[dependency]
+    candidates = get_close_matches(dependency, mapping.keys())
+    return mapping[candidates[0]] if candidates else None
+
+
+@pytest.mark.parametrize(
+    "dependency",
+    [
+        "os",
+        "sys",
+        "react",
+        "System.Collections.Generic",
+        "app.services.github_service",
+        "services.redis_service",
+        "parsing_utils",
+        "Orders.Entities",
+        "custom.h",
+        "./components/App",
+    ],
+)
+def test_resolver_matches_difflib(namespace_mapping, dependency):
+    """
+    Test that the indexed resolver gives the same answer as a full difflib scan.
+    """
+    resolver = NamespaceResolver(namespace_mapping)
+    assert resolver.resolve(dependency) == difflib_resolve(namespace_mapping, dependency)
+
+
+def test_resolver_memoizes_fuzzy_lookups(namespace_mapping):
+    """
+    Test that repeated unresolved imports only run the fuzzy matcher once.
+    """
+    resolver = NamespaceResolver(namespace_mapping)
+    assert resolver.resolve("numpy") is None
+    assert resolver.resolve("numpy") is None
+    assert resolver.resolve("app.services.redis_service") == "app/services/redis_service.py"
+    assert resolver.fuzzy_calls == 1
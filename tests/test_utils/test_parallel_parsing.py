@@ -0,0 +1,42 @@
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from app.utils.parallel_parsing import parse_files, iter_chunks
+
+
+@pytest.fixture
+def sample_files():
+    """
+    Fixture providing a mix of supported, unsupported and unparsable files.
+    """
+    files = {}
+    for i in range(20):
+        files[f"pkg/module{i}.py"] = f"import os\nfrom pkg import module{i + 1}"
+        files[f"src/Service{i}.cs"] = "using System;\nusing System.Linq;"
+        files[f"web/view{i}.js"] = f"import x from './view{i + 1}';"
+    files["README.md"] = "# docs"
+    files["broken.py"] = "def broken(:\n"
+    return files
+
+
+def test_iter_chunks():
+    """
+    Test splitting an iterable into bounded chunks.
+    """
+    assert list(iter_chunks(range(5), 2)) == [[0, 1], [2, 3], [4]]
+
+
+def test_parallel_parsing_matches_serial(sample_files):
+    """
+    Test that the process pool produces the same raw dependencies as serial
+    parsing, and that the time spent in workers is recorded.
+    """
+    serial = parse_files(sample_files, threshold=len(sample_files) + 1)
+    timings = {}
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        parallel = parse_files(sample_files, executor=pool, threshold=0, chunk_size=7, timings=timings)
+
+    assert parallel == serial
+    assert timings["parse"] > 0
+    assert "README.md" not in serial
+    assert serial["broken.py"] == []
+    assert serial["pkg/module3.py"] == ["os", "pkg"]
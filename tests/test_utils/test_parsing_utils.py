@@ -0,0 +1,104 @@
+import re
+import pytest
+from app.utils.parsing_utils import CppParser, DotNetParser, JavaParser, JavaScriptParser, PythonParser
+
+SAMPLES = {
+    DotNetParser: (
+        "using System;\r\n  using System.Linq;\n// using Commented;\nvar x = 1; using Inline;\n\n\tusing Ünï.Côde;",
+        r"^\s*using\s+([\w.]+);",
+    ),
+    JavaScriptParser: (
+        "import a from 'x'\rimport b from \"y\" ; import c from 'z'\nconst d = 1;\n  import {e, f} from '../e';\n",
+        r"^\s*import\s+.*\s+from\s+['\"](.+)['\"]",
+    ),
+    JavaParser: (
+        "package a;\nimport java.util.List;\nimport static b.C;\n   import é.ü;\nimport broken",
+        r"^\s*import\s+([\w.]+);",
+    ),
+    CppParser: (
+        '#include <vector>\n  #include "a/b.h"\n#include "unterminated\n#include <c>d>\n#define X\n',
+        r"^\s*#include\s+[<\"]([^\">]+)[\">]",
+    ),
+}
+
+
+def parse_lines(pattern, content):
+    """
+    Reference behaviour: match the pattern at the start of every line.
+    """
+    matches = (re.match(pattern, line) for line in content.splitlines())
+    return [match.group(1) for match in matches if match]
+
+
+@pytest.mark.parametrize("parser_class", list(SAMPLES))
+def test_single_pass_matches_line_by_line(parser_class):
+    """
+    Test that the single-pass patterns find the same dependencies as matching each line.
+    """
+    content, pattern = SAMPLES[parser_class]
+    expected = parse_lines(pattern, content)
+
+    assert expected
+    assert parser_class().parse(content) == expected
+
+
+@pytest.mark.parametrize("parser_class", list(SAMPLES))
+def test_bytes_input(parser_class):
+    """
+    Test that bytes and memoryviews are parsed like the decoded text.
+    """
+    content, _ = SAMPLES[parser_class]
+    parser = parser_class()
+    encoded = content.encode()
+
+    assert parser.parse(encoded) == parser.parse(content)
+    assert parser.parse(memoryview(encoded)) == parser.parse(content)
+
+
+def test_javascript_greedy_match():
+    """
+    Test that a line with several imports yields only the last one, as with per-line matching.
+    """
+    assert JavaScriptParser().parse("import a from 'x'; import b from 'y';") == ["y"]
+
+
+def test_python_parser_accepts_bytes():
+    """
+    Test that the Python parser accepts raw UTF-8 content.
+    """
+    content = "import os\nfrom pkg import módulo\n"
+    assert PythonParser().parse(memoryview(content.encode())) == PythonParser().parse(content) == ["os", "pkg"]
+
+
+def test_python_scanner_finds_nested_and_relative_imports():
+    """
+    Test that the scanner finds imports in functions, try blocks and one-line
+    statements, skips strings and comments, and keeps relative levels.
+    """
+    content = (
+        '"""\nimport not_an_import\n"""\n'
+        "import os, sys as system  # import comment\n"
+        "from ..core import base\n"
+        "from . import (views,\n    models as m)\n"
+        "def load():\n    try:\n        import yaml\n    except ImportError:\n        pass\n"
+        "if True: import json; from .util import helper\n"
+    )
+    parser = PythonParser()
+    assert parser.parse(content) == ["os", "sys", "..core", ".views", ".models", "yaml", "json", ".util"]
+    assert parser.parse(content) == parser._parse_ast(content)
+
+
+def test_python_parser_falls_back_to_ast():
+    """
+    Test that statements the scanner cannot read are parsed with ast.
+    """
+    content = "import os, \\\n    sys\nfrom . import *\n"
+    assert PythonParser()._scan(content)[1] is False
+    assert PythonParser().parse(content) == ["os", "sys", "."]
+
+
+def test_python_parser_recovers_imports_from_invalid_files():
+    """
+    Test that files with syntax errors still report the imports found.
+    """
+    assert PythonParser().parse("import os\ndef broken(:\n    from .models import User\n") == ["os", ".models"]
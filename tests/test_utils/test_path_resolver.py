@@ -0,0 +1,88 @@
+import pytest
+from app.utils.path_resolver import PathResolver, TsConfig, parse_ts_config
+
+FILES = [
+    "web/src/app.ts",
+    "web/src/utils/format.ts",
+    "web/src/utils/index.ts",
+    "web/src/components/Button.tsx",
+    "web/src/legacy/helpers.js",
+    "web/lib/shared/api.ts",
+    "native/include/engine/core.h",
+    "native/src/engine/core.cpp",
+    "native/src/engine/detail.h",
+    "third_party/zlib/zlib.h",
+    "pkg/__init__.py",
+    "pkg/core/models.py",
+    "pkg/api/views.py",
+]
+
+TS_CONFIGS = {
+    "tsconfig.base.json": """{
+        // shared options
+        "compilerOptions": {"baseUrl": "web/src", "paths": {"@lib/*": ["../lib/*"], "config": ["app"],},},
+    }""",
+    "web/tsconfig.json": '{"extends": "../tsconfig.base.json", /* no overrides */ "compilerOptions": {}}',
+}
+
+
+@pytest.fixture
+def resolver():
+    """
+    Fixture providing a resolver over a mixed JS/TS, C++ and Python tree.
+    """
+    return PathResolver(FILES, TsConfig.load_all(TS_CONFIGS), include_dirs=["native/include"])
+
+
+@pytest.mark.parametrize("specifier, expected, path_based", [
+    ("./utils/format", "web/src/utils/format.ts", True),
+    ("./utils", "web/src/utils/index.ts", True),
+    ("./components/Button", "web/src/components/Button.tsx", True),
+    ("./utils/format.js", "web/src/utils/format.ts", True),
+    ("./legacy/helpers.js", "web/src/legacy/helpers.js", True),
+    ("./missing", None, True),
+    ("@lib/shared/api", "web/lib/shared/api.ts", True),
+    ("@lib/missing", None, True),
+    ("config", "web/src/app.ts", True),
+    ("utils/format", "web/src/utils/format.ts", True),
+    ("react", None, True),
+])
+def test_resolve_js(resolver, specifier, expected, path_based):
+    """
+    Test relative, index, extension, tsconfig paths and baseUrl resolution of JS/TS specifiers.
+    """
+    assert resolver.resolve(specifier, "web/src/app.ts") == (expected, path_based)
+
+
+@pytest.mark.parametrize("include, importer, expected", [
+    ("detail.h", "native/src/engine/core.cpp", "native/src/engine/detail.h"),
+    ("engine/core.h", "native/src/engine/core.cpp", "native/include/engine/core.h"),
+    ("zlib.h", "native/src/engine/core.cpp", "third_party/zlib/zlib.h"),
+    ("vector", "native/src/engine/core.cpp", None),
+])
+def test_resolve_include(resolver, include, importer, expected):
+    """
+    Test C++ includes against the importer's directory, include directories and path suffixes.
+    """
+    assert resolver.resolve(include, importer) == (expected, True)
+
+
+@pytest.mark.parametrize("dependency, expected, path_based", [
+    ("..core.models", "pkg/core/models.py", True),
+    ("..", "pkg/__init__.py", True),
+    ("..helper", "pkg/__init__.py", True),
+    ("....outside", None, True),
+    ("os", None, False),
+])
+def test_resolve_python(resolver, dependency, expected, path_based):
+    """
+    Test relative Python imports against the importer's package.
+    """
+    assert resolver.resolve(dependency, "pkg/api/views.py") == (expected, path_based)
+
+
+def test_parse_ts_config_keeps_comment_markers_in_strings():
+    """
+    Test that comment and trailing comma stripping leaves string values alone.
+    """
+    assert parse_ts_config('{"a": "http://x/*y*/", "b": [1, 2,],}') == {"a": "http://x/*y*/", "b": [1, 2]}